@@ -0,0 +1,112 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Firefox instances allowed at once in this process, across all accounts
+DEFAULT_MAX_BROWSERS = 2
+
+
+def profile_dir(account_id):
+    """Dedicated Firefox profile directory of an account (cookies and cache stay separate)"""
+    safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', account_id)
+    path = Path.home() / ".freework_app" / "profiles" / safe_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class BrowserSlots:
+    """
+    Global cap on concurrently running browsers.
+
+    Every session takes a slot before starting Firefox and gives it back
+    after quitting it, whoever started the session (interface, CLI,
+    account scheduler), so the host is never asked for more browsers
+    than it can run.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def set_capacity(self, capacity):
+        with self._condition:
+            self.capacity = max(1, capacity)
+            self._condition.notify_all()
+
+    def acquire(self, logger=None):
+        with self._condition:
+            if self.in_use >= self.capacity and logger:
+                logger.info(f"Waiting for a free browser slot ({self.in_use}/{self.capacity} in use)")
+            while self.in_use >= self.capacity:
+                self._condition.wait()
+            self.in_use += 1
+
+    def release(self):
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+
+_shared_slots = None
+_shared_lock = threading.Lock()
+
+
+def get_browser_slots():
+    """Return the process-wide browser cap (FREEWORK_MAX_BROWSERS overrides the default)"""
+    global _shared_slots
+    with _shared_lock:
+        if _shared_slots is None:
+            _shared_slots = BrowserSlots(int(os.environ.get('FREEWORK_MAX_BROWSERS', DEFAULT_MAX_BROWSERS)))
+        return _shared_slots
+
+
+def run_account(account_id, config_manager, headless=True, dry_run=False, search_config=None, control=None):
+    """Run one session for a named account in its own browser profile; returns the outcome"""
+    import main as automation
+    from logger import SecureLogger
+    email, password, stored_config = config_manager.load_account(account_id)
+    if not email or not password:
+        return automation.SESSION_NO_CREDENTIALS
+    logger = SecureLogger(email)
+    try:
+        return automation.main(
+            email, password, search_config or stored_config, config_manager, logger,
+            headless=headless, dry_run=dry_run, control=control,
+            account=account_id, profile=profile_dir(account_id)
+        )
+    except Exception as e:
+        logger.error(f"Account {account_id} failed: {e}")
+        return automation.SESSION_ERROR
+
+
+def run_accounts(account_ids, config_manager, headless=True, dry_run=False, max_browsers=None):
+    """
+    Run sessions for several accounts concurrently.
+
+    Each account gets its own thread, Firefox profile and statistics (keyed
+    by its email); how many browsers actually run at once is bounded by the
+    global BrowserSlots. Returns {account_id: outcome}.
+    """
+    if max_browsers is not None:
+        get_browser_slots().set_capacity(max_browsers)
+    if not account_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(account_ids), thread_name_prefix='account') as executor:
+        futures = {
+            account_id: executor.submit(run_account, account_id, config_manager, headless, dry_run)
+            for account_id in account_ids
+        }
+    outcomes = {}
+    for account_id, future in futures.items():
+        try:
+            outcomes[account_id] = future.result()
+        except Exception as e:
+            # Raised before the account's session had a logger (its settings could not be loaded)
+            import main as automation
+            from logger import SecureLogger
+            SecureLogger().error(f"Account {account_id} failed: {e}")
+            outcomes[account_id] = automation.SESSION_ERROR
+    return outcomes
@@ -1,18 +1,27 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 import uvicorn
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import json
 import os
 
 # Import existing modules
 import sys
 sys.path.append('..')
-from config import SecureConfig
+from config import get_secure_config, validate_search_config
 from logger import SecureLogger
-from main import main as run_automation
+from history import get_history_store, as_list, InvalidCursor, WindowTooLarge, GRANULARITIES, SERIES_DIMENSIONS, SORT_FIELDS
+from scheduler import ScheduleError, ScheduleStore, add_schedule, get_scheduler
+from export import FORMATS, MEDIA_TYPES, export_chunks, export_filename
+from offer_index import get_offer_index
+from outcomes import is_attempt, merge_outcomes, normalize_status
+from snapshots import get_snapshot_store
+from serialization import (
+    CompressionMiddleware, FastJSONResponse, etag_matches, make_etag, not_modified, parse_fields, select_fields
+)
 
 app = FastAPI(
     title="FreeWork Job Application Assistant API",
@@ -27,8 +36,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compress JSON responses above 1 KB (brotli when available, else gzip)
+app.add_middleware(CompressionMiddleware)
+
 # Pydantic models
 class Credentials(BaseModel):
     email: str
@@ -43,6 +56,10 @@ class SearchConfig(BaseModel):
     application_message: str
     max_applications_per_session: int
     delay_between_applications: int = 2
+    company_rules: Optional[Dict[str, List[str]]] = None
+    message_templates: Optional[List[dict]] = None
+    skills: Optional[List[str]] = None
+    total_application_budget: Optional[int] = None
 
 class JobApplication(BaseModel):
     job_title: str
@@ -95,6 +112,29 @@ class GlobalStatistics(BaseModel):
     per_contract_type: Dict[str, int]
     per_remote_type: Dict[str, int]
     per_day: Dict[str, int]
+    outcomes: Dict[str, int] = {}
+
+class ScheduleRequest(BaseModel):
+    name: str
+    cron: str
+    account: Optional[str] = None
+    search_config: Optional[SearchConfig] = None
+    jitter: int = 300
+    headless: bool = True
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationDetail]
+    next_cursor: Optional[str] = None
+
+@app.on_event("startup")
+async def start_scheduler():
+    """Run recurring sessions in this server when FREEWORK_SCHEDULER is enabled"""
+    if os.environ.get('FREEWORK_SCHEDULER', '').lower() in ('1', 'true', 'yes'):
+        get_scheduler(get_secure_config()).start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    get_scheduler().stop()
 
 @app.get("/")
 async def root():
@@ -117,13 +157,20 @@ async def get_configuration(
 
 @app.get("/statistics")
 async def get_statistics(
+    request: Request,
+    response: Response,
     email: str = Query(..., min_length=1),
     password: str = Query(..., min_length=1)
 ):
-    """Get user statistics"""
+    """Get user statistics (conditional GET via ETag / If-None-Match)"""
     try:
         # Load user statistics
-        config_manager = SecureConfig()
+        config_manager = get_secure_config()
+        etag = make_etag(config_manager.statistics_version(email), 'statistics', email)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
         stats = config_manager.load_statistics(email)
         if not stats:
             return Statistics(
@@ -158,9 +205,13 @@ async def save_configuration(
     password: str
 ):
     """Save configuration"""
+    # Omitted optional settings (company rules, templates, skills) keep their stored value
+    config_dict = config.dict(exclude_none=True)
+    errors = validate_search_config(config_dict)
+    if errors:
+        raise HTTPException(status_code=400, detail='; '.join(errors))
     try:
-        config_dict = config.dict()
-        config_manager = SecureConfig()
+        config_manager = get_secure_config()
         config_manager.save_search_config(config_dict)
         logger = SecureLogger(email)
         logger.success("Configuration saved via API")
@@ -168,127 +219,336 @@ async def save_configuration(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/statistics/advanced")
+ADVANCED_FIELDS = tuple(GlobalStatistics.__fields__)
+APPLICATION_FIELDS = tuple(ApplicationDetail.__fields__)
+
+def application_record(app_data):
+    """Plain ApplicationDetail-shaped dict from a stored application"""
+    return {
+        'job_title': app_data.get('job_title', 'Unknown'),
+        'company': app_data.get('company', 'Unknown'),
+        'status': normalize_status(app_data.get('status', 'unknown')),
+        'timestamp': app_data.get('timestamp') or datetime.now().isoformat(),
+        'search_term': app_data.get('search_term', 'unknown'),
+        'contract_type': as_list(app_data.get('contract_type', [])),
+        'remote_type': as_list(app_data.get('remote_type', [])),
+        'reason': app_data.get('reason')
+    }
+
+TERM_COUNTERS = ('jobs_found', 'jobs_submitted', 'jobs_already_applied', 'jobs_excluded',
+                 'jobs_company_skipped', 'jobs_failed')
+
+def term_statistics(per_search_term, search_term):
+    """Running per-term counters of a search term, created on first use"""
+    term_stats = per_search_term.get(search_term)
+    if term_stats is None:
+        term_stats = per_search_term[search_term] = {'search_term': search_term, **dict.fromkeys(TERM_COUNTERS, 0)}
+    return term_stats
+
+def build_advanced_statistics(stats, fields=None):
+    """
+    Aggregate stored statistics into the GlobalStatistics layout as plain data.
+
+    statistics.json is written by the automation itself, so rows are copied
+    as dicts instead of being validated into models one by one. Only the
+    parts named in fields are built. Per-term counts come from the counters
+    each session stored; sessions saved before outcomes were recorded are
+    counted from their application rows. Contract type, remote type and day
+    breakdowns count submit attempts only.
+    """
+    wanted = set(fields or ADVANCED_FIELDS)
+    total = stats.get('total_applications', 0)
+    result = {
+        'total_applications': total,
+        'successful_applications': stats.get('successful_applications', 0),
+        'failed_applications': stats.get('failed_applications', 0),
+        'success_rate': (stats.get('successful_applications', 0) / total * 100) if total > 0 else 0.0,
+    }
+    include_sessions = 'sessions' in wanted
+    aggregate = bool(wanted & {'per_search_term', 'per_contract_type', 'per_remote_type', 'per_day', 'outcomes'})
+    sessions = []
+    per_search_term = {}
+    per_contract_type = {}
+    per_remote_type = {}
+    per_day = {}
+    outcomes = {}
+
+    for session_data in stats.get('sessions', []):
+        applications = [application_record(app_data) for app_data in session_data.get('applications', [])]
+        if include_sessions:
+            sessions.append({
+                'session_id': session_data.get('session_id', 'unknown'),
+                'date': session_data.get('date') or datetime.now().isoformat(),
+                'applications': applications,
+                'total': session_data.get('total', 0),
+                'successful': session_data.get('successful', 0),
+                'failed': session_data.get('failed', 0),
+                'success_rate': session_data.get('success_rate', 0.0),
+                'per_search_term': None
+            })
+        if not aggregate:
+            continue
+        term_counters = [t for t in session_data.get('per_search_term') or [] if 'outcomes' in t]
+        for counters in term_counters:
+            term_stats = term_statistics(per_search_term, counters['search_term'])
+            for key in TERM_COUNTERS:
+                term_stats[key] += counters.get(key, 0)
+            merge_outcomes(outcomes, counters['outcomes'])
+        for application in applications:
+            if not term_counters:
+                # Legacy session: only submit attempts were stored
+                term_stats = term_statistics(per_search_term, application['search_term'])
+                term_stats['jobs_found'] += 1
+                status = application['status']
+                if status == 'submitted':
+                    term_stats['jobs_submitted'] += 1
+                elif status == 'already_applied':
+                    term_stats['jobs_already_applied'] += 1
+                elif status == 'excluded':
+                    term_stats['jobs_excluded'] += 1
+                elif status == 'failed':
+                    term_stats['jobs_failed'] += 1
+            if not is_attempt(application):
+                continue
+            for contract_type in application['contract_type']:
+                per_contract_type[contract_type] = per_contract_type.get(contract_type, 0) + 1
+            for remote_type in application['remote_type']:
+                per_remote_type[remote_type] = per_remote_type.get(remote_type, 0) + 1
+
+            # ISO timestamps start with the day
+            app_date = application['timestamp'][:10]
+            per_day[app_date] = per_day.get(app_date, 0) + 1
+
+    result['sessions'] = sessions
+    # A list for frontend compatibility
+    result['per_search_term'] = list(per_search_term.values())
+    result['per_contract_type'] = per_contract_type
+    result['per_remote_type'] = per_remote_type
+    result['per_day'] = per_day
+    result['outcomes'] = outcomes
+    return select_fields(result, fields)
+
+@app.get("/statistics/advanced", response_model=GlobalStatistics)
 async def get_advanced_statistics(
+    request: Request,
     email: str = Query(..., min_length=1),
-    password: str = Query(..., min_length=1)
+    password: str = Query(..., min_length=1),
+    fields: Optional[str] = None
 ):
-    """Get enhanced user statistics"""
+    """Get enhanced user statistics; ?fields=a,b returns only those top-level fields"""
     try:
-        # Load user statistics
-        config_manager = SecureConfig()
-        stats = config_manager.load_statistics(email)
-        
-        if not stats:
-            return GlobalStatistics(
-                total_applications=0,
-                successful_applications=0,
-                failed_applications=0,
-                success_rate=0.0,
-                sessions=[],
-                per_search_term=[],  # Return as list
-                per_contract_type={},
-                per_remote_type={},
-                per_day={}
-            )
-        
-        # Calculate success rate
-        success_rate = (
-            (stats['successful_applications'] / stats['total_applications'] * 100)
-            if stats['total_applications'] > 0 else 0.0
+        selected = parse_fields(fields, ADVANCED_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        config_manager = get_secure_config()
+        # Checked before aggregating, so an unchanged dashboard costs a version lookup
+        etag = make_etag(config_manager.statistics_version(email), 'statistics/advanced', email, selected)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        stats = config_manager.load_statistics(email) or {}
+        return FastJSONResponse(
+            build_advanced_statistics(stats, selected),
+            headers={'ETag': etag, 'Cache-Control': 'no-cache'}
         )
-        
-        # Process sessions data
-        sessions = []
-        per_search_term_dict = {}
-        per_contract_type = {}
-        per_remote_type = {}
-        per_day = {}
-        
-        for session_data in stats.get('sessions', []):
-            # Convert session data to SessionStatistics format
-            session_stats = SessionStatistics(
-                session_id=session_data.get('session_id', 'unknown'),
-                date=datetime.fromisoformat(session_data.get('date', datetime.now().isoformat())),
-                applications=[],
-                total=session_data.get('total', 0),
-                successful=session_data.get('successful', 0),
-                failed=session_data.get('failed', 0),
-                success_rate=session_data.get('success_rate', 0.0)
-            )
-            
-            # Process applications in this session
-            for app_data in session_data.get('applications', []):
-                app_detail = ApplicationDetail(
-                    job_title=app_data.get('job_title', 'Unknown'),
-                    company=app_data.get('company', 'Unknown'),
-                    status=app_data.get('status', 'unknown'),
-                    timestamp=datetime.fromisoformat(app_data.get('timestamp', datetime.now().isoformat())),
-                    search_term=app_data.get('search_term', 'unknown'),
-                    contract_type=ensure_list(app_data.get('contract_type', [])),
-                    remote_type=ensure_list(app_data.get('remote_type', [])),
-                    reason=app_data.get('reason')
-                )
-                session_stats.applications.append(app_detail)
-                
-                # Aggregate statistics by search term
-                search_term = app_data.get('search_term', 'unknown')
-                if search_term not in per_search_term_dict:
-                    per_search_term_dict[search_term] = {
-                        'search_term': search_term,
-                        'jobs_found': 0,
-                        'jobs_submitted': 0,
-                        'jobs_already_applied': 0,
-                        'jobs_excluded': 0,
-                        'jobs_failed': 0
-                    }
-                per_search_term_dict[search_term]['jobs_found'] += 1
-                if app_data.get('status') == 'submitted':
-                    per_search_term_dict[search_term]['jobs_submitted'] += 1
-                elif app_data.get('status') == 'already_applied':
-                    per_search_term_dict[search_term]['jobs_already_applied'] += 1
-                elif app_data.get('status') == 'excluded':
-                    per_search_term_dict[search_term]['jobs_excluded'] += 1
-                elif app_data.get('status') == 'failed':
-                    per_search_term_dict[search_term]['jobs_failed'] += 1
-                
-                # Aggregate by contract type
-                for contract_type in ensure_list(app_data.get('contract_type', [])):
-                    per_contract_type[contract_type] = per_contract_type.get(contract_type, 0) + 1
-                
-                # Aggregate by remote type
-                for remote_type in ensure_list(app_data.get('remote_type', [])):
-                    per_remote_type[remote_type] = per_remote_type.get(remote_type, 0) + 1
-                
-                # Aggregate by day
-                app_date = datetime.fromisoformat(app_data.get('timestamp', datetime.now().isoformat())).strftime('%Y-%m-%d')
-                per_day[app_date] = per_day.get(app_date, 0) + 1
-            
-            sessions.append(session_stats)
-        
-        # Convert per_search_term_dict to a list for frontend compatibility
-        per_search_term = list(per_search_term_dict.values())
-        
-        return GlobalStatistics(
-            total_applications=stats['total_applications'],
-            successful_applications=stats['successful_applications'],
-            failed_applications=stats['failed_applications'],
-            success_rate=success_rate,
-            sessions=sessions,
-            per_search_term=per_search_term,
-            per_contract_type=per_contract_type,
-            per_remote_type=per_remote_type,
-            per_day=per_day
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/statistics/timeseries")
+async def get_time_series(
+    request: Request,
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1),
+    granularity: str = 'day',
+    group_by: str = 'status',
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Pre-bucketed application counts per day/week/month for a window (dates inclusive)"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if group_by not in SERIES_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(SERIES_DIMENSIONS)}")
+    try:
+        config_manager = get_secure_config()
+        etag = make_etag(config_manager.statistics_version(email), 'statistics/timeseries', email,
+                         granularity, group_by, date_from, date_to)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        store = get_history_store()
+        store.sync_statistics(config_manager)
+        series = store.time_series(email, granularity, group_by, date_from, date_to)
+        return FastJSONResponse(series, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+    except WindowTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/applications", response_model=ApplicationPage)
+async def list_applications(
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    search_term: Optional[str] = None,
+    company: Optional[str] = None,
+    status: Optional[str] = None,
+    contract_type: Optional[str] = None,
+    remote_type: Optional[str] = None,
+    sort: str = 'timestamp',
+    order: str = 'desc',
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Page through the application history with server-side filters (dates inclusive)"""
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_FIELDS)}")
+    if order not in ('asc', 'desc'):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    try:
+        selected = parse_fields(fields, APPLICATION_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        store = get_history_store()
+        store.sync_statistics(get_secure_config())
+        items, next_cursor = store.query_applications(
+            email,
+            date_from=date_from.isoformat() if date_from else None,
+            date_to=(date_to + timedelta(days=1)).isoformat() if date_to else None,
+            search_term=search_term,
+            company=company,
+            status=status,
+            contract_type=contract_type,
+            remote_type=remote_type,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor
         )
+        return FastJSONResponse({
+            'items': [select_fields(item, selected) for item in items],
+            'next_cursor': next_cursor
+        })
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/applications/export")
+async def export_applications(
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1),
+    format: str = 'ndjson',
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    compress: bool = False
+):
+    """Stream the application history as NDJSON or CSV (dates inclusive)"""
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    try:
+        store = get_history_store()
+        store.sync_statistics(get_secure_config())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    chunks = export_chunks(
+        store,
+        email,
+        export_format=format,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=(date_to + timedelta(days=1)).isoformat() if date_to else None,
+        compress=compress
+    )
+    filename = export_filename(email, format, compress)
+    return StreamingResponse(
+        chunks,
+        media_type='application/gzip' if compress else MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/offers/search")
+async def search_offers(
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1),
+    q: str = Query(..., min_length=1),
+    decision: Optional[str] = None,
+    search_term: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Ranked full-text search over archived offers, with highlighted snippets (dates inclusive)"""
+    try:
+        results = get_offer_index().search(
+            email,
+            q,
+            decision=decision,
+            search_term=search_term,
+            date_from=date_from.isoformat() if date_from else None,
+            date_to=(date_to + timedelta(days=1)).isoformat() if date_to else None,
+            limit=limit,
+            snapshot_store=get_snapshot_store()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse({'query': q, 'items': results})
+
+@app.get("/schedules")
+async def list_schedules(
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1)
+):
+    """Recurring sessions with their next and last run"""
+    return ScheduleStore().load()
+
+@app.post("/schedules")
+async def save_schedule(
+    schedule: ScheduleRequest,
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1)
+):
+    """Create or replace a recurring session"""
+    search_config = None
+    if schedule.search_config:
+        # Checked now, so a bad config fails here and not when the schedule fires
+        search_config = schedule.search_config.dict(exclude_none=True)
+        errors = validate_search_config(search_config)
+        if errors:
+            raise HTTPException(status_code=400, detail='; '.join(errors))
+    try:
+        return add_schedule(
+            ScheduleStore(),
+            schedule.name,
+            schedule.cron,
+            account=schedule.account,
+            search_config=search_config,
+            jitter=schedule.jitter,
+            headless=schedule.headless
+        )
+    except ScheduleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/schedules/{name}")
+async def delete_schedule(
+    name: str,
+    email: str = Query(..., min_length=1),
+    password: str = Query(..., min_length=1)
+):
+    """Delete a recurring session"""
+    if not ScheduleStore().remove(name):
+        raise HTTPException(status_code=404, detail=f"Unknown schedule: {name}")
+    return {"message": f"Schedule {name} removed"}
 
 @app.delete("/data")
 async def clear_data(email: str, password: str):
     """Clear all stored data"""
     try:
         import shutil
-        config_manager = SecureConfig()
+        config_manager = get_secure_config()
         config_dir = config_manager.config_dir
         if config_dir.exists():
             shutil.rmtree(config_dir)
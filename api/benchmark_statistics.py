@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark /statistics/advanced serialization on a synthetic history.
+
+Compares the previous path (nested Pydantic models + jsonable_encoder +
+json.dumps) with the plain-dict path and FastJSONResponse encoder, and
+reports payload sizes with and without compression. Runs against a
+throwaway HOME, so real data is never touched.
+
+    python api/benchmark_statistics.py --applications 50000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def synthetic_statistics(applications, per_session=100):
+    """Statistics record with the given number of applications"""
+    start = datetime(2024, 1, 1)
+    terms = ['python', 'java', 'devops', 'data engineer', 'react']
+    sessions = []
+    for first in range(0, applications, per_session):
+        count = min(per_session, applications - first)
+        day = start + timedelta(hours=first)
+        sessions.append({
+            'session_id': f"session_{day.strftime('%Y%m%d_%H%M%S')}",
+            'date': day.isoformat(),
+            'total': count,
+            'successful': count,
+            'failed': 0,
+            'success_rate': 100.0,
+            'applications': [
+                {
+                    'job_title': f"Senior Engineer {first + i}",
+                    'company': f"Company {(first + i) % 97}",
+                    'status': 'submitted' if i % 4 else 'failed',
+                    'timestamp': (day + timedelta(seconds=30 * i)).isoformat(),
+                    'search_term': terms[i % len(terms)],
+                    'contract_type': ['permanent', 'contractor'][:1 + i % 2],
+                    'remote_type': ['full'],
+                    'reason': None,
+                }
+                for i in range(count)
+            ],
+        })
+    return {
+        'total_applications': applications,
+        'successful_applications': applications,
+        'failed_applications': 0,
+        'sessions': sessions,
+        'last_session': sessions[-1]['date'] if sessions else None,
+    }
+
+
+def model_path(api_main, stats):
+    """The previous endpoint: validate every row into models, then encode"""
+    from fastapi.encoders import jsonable_encoder
+    plain = api_main.build_advanced_statistics(stats)
+    model = api_main.GlobalStatistics(**plain)
+    return json.dumps(jsonable_encoder(model)).encode('utf-8')
+
+
+def fast_path(api_main, stats):
+    from serialization import dumps
+    return dumps(api_main.build_advanced_statistics(stats))
+
+
+def timed(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--applications', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = home
+        import api_main
+        from serialization import brotli, compress, dumps
+
+        stats = synthetic_statistics(args.applications)
+        before, before_body = timed(lambda: model_path(api_main, stats), args.repeat)
+        after, after_body = timed(lambda: fast_path(api_main, stats), args.repeat)
+        gzip_time, gzip_body = timed(lambda: compress(after_body, 'gzip'), args.repeat)
+
+        print(f"Synthetic history: {args.applications} applications in {len(stats['sessions'])} sessions")
+        print(f"{'path':<28}{'latency':>12}{'payload':>14}")
+        print(f"{'models + json.dumps':<28}{before * 1000:>10.1f}ms{len(before_body):>14,}")
+        print(f"{'plain dicts + fast encoder':<28}{after * 1000:>10.1f}ms{len(after_body):>14,}")
+        print(f"{'  + gzip':<28}{(after + gzip_time) * 1000:>10.1f}ms{len(gzip_body):>14,}")
+        if brotli is not None:
+            br_time, br_body = timed(lambda: compress(after_body, 'br'), args.repeat)
+            print(f"{'  + brotli':<28}{(after + br_time) * 1000:>10.1f}ms{len(br_body):>14,}")
+        selected, selected_body = timed(
+            lambda: dumps(api_main.build_advanced_statistics(stats, ('per_search_term',))), args.repeat)
+        print(f"{'?fields=per_search_term':<28}{selected * 1000:>10.1f}ms{len(selected_body):>14,}")
+        if json.loads(before_body) != json.loads(after_body):
+            print("warning: the two paths produced different documents", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import math
+import threading
+
+# Pseudo-observations blended into every estimate, so a term seen once is not judged on one session
+PRIOR_JOBS = 5.0
+PRIOR_SESSIONS = 1.0
+# Rates assumed for terms without history
+DEFAULT_ELIGIBLE_RATE = 0.5
+DEFAULT_SUCCESS_RATE = 0.9
+# Every term keeps a little weight so dead terms are still re-checked now and then
+MIN_SCORE = 0.05
+
+
+def term_score(history, prior_supply, prior_eligible, prior_success):
+    """
+    Expected submissions per session of a term from its decayed history.
+
+    supply (jobs found per session) x eligible rate (not excluded or
+    already applied) x success rate (submits that went through), each
+    smoothed toward the session-wide priors.
+    """
+    if not history or not history.get('sessions'):
+        return max(MIN_SCORE, prior_supply * prior_eligible * prior_success)
+    found = history['jobs_found']
+    eligible = max(0.0, found - history['jobs_excluded'] - history['jobs_already_applied'])
+    attempted = history['jobs_submitted'] + history['jobs_failed']
+    supply = (found + PRIOR_SESSIONS * prior_supply) / (history['sessions'] + PRIOR_SESSIONS)
+    eligible_rate = (eligible + PRIOR_JOBS * prior_eligible) / (found + PRIOR_JOBS)
+    success_rate = (history['jobs_submitted'] + PRIOR_JOBS * prior_success) / (attempted + PRIOR_JOBS)
+    return max(MIN_SCORE, supply * eligible_rate * success_rate)
+
+
+def _priors(histories):
+    """Session-wide supply, eligible and success rates over all terms with history"""
+    sessions = sum(history['sessions'] for history in histories)
+    found = sum(history['jobs_found'] for history in histories)
+    if not sessions or not found:
+        return 1.0, DEFAULT_ELIGIBLE_RATE, DEFAULT_SUCCESS_RATE
+    eligible = sum(max(0.0, h['jobs_found'] - h['jobs_excluded'] - h['jobs_already_applied']) for h in histories)
+    submitted = sum(history['jobs_submitted'] for history in histories)
+    attempted = submitted + sum(history['jobs_failed'] for history in histories)
+    return (found / sessions, eligible / found,
+            submitted / attempted if attempted else DEFAULT_SUCCESS_RATE)
+
+
+class BudgetAllocator:
+    """
+    Splits a session's application budget across its search terms.
+
+    Terms run highest expected yield first. Each term's share is computed
+    when it starts, from the budget still left and the scores of the terms
+    not run yet, so budget a term did not spend (it ran out of offers)
+    flows to the terms after it.
+    """
+
+    def __init__(self, terms, total, scores):
+        self.total = total
+        self.scores = {term: scores.get(term, MIN_SCORE) for term in terms}
+        # Stable: equal scores keep the configured order
+        self.order = sorted(dict.fromkeys(terms), key=lambda term: -self.scores[term])
+        self.remaining = total
+        self.allocated = {}
+        self.used = {}
+        self._pending = list(self.order)
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def start(self, term):
+        """Budget of a term that is about to run (0 when the session budget is spent)"""
+        with self._lock:
+            if term in self._pending:
+                self._pending.remove(term)
+            weight = sum(self.scores[pending] for pending in self._pending) + self.scores[term]
+            if self.remaining <= 0:
+                share = 0
+            else:
+                share = max(1, min(self.remaining, math.ceil(self.remaining * self.scores[term] / weight)))
+            self.allocated[term] = share
+            return share
+
+    def finish(self, term, used):
+        """Record what a term actually spent; the rest goes back to the pool"""
+        with self._lock:
+            self.used[term] = used
+            self.remaining -= used
+
+    def summary(self):
+        """{term: {'score', 'allocated', 'used'}} in run order"""
+        with self._lock:
+            return {
+                term: {
+                    'score': round(self.scores[term], 3),
+                    'allocated': self.allocated.get(term, 0),
+                    'used': self.used.get(term, 0),
+                }
+                for term in self.order
+            }
+
+
+def plan_budget(search_config, yields):
+    """
+    Allocator for a session's search terms from the per-term yields in history.
+
+    The global budget is search_config['total_application_budget'], by
+    default max_applications_per_session for each term (the same total as
+    before, split by yield instead of evenly).
+    """
+    terms = list(dict.fromkeys(search_config['search_terms']))
+    total = search_config.get('total_application_budget')
+    if total is None:
+        total = search_config['max_applications_per_session'] * len(terms)
+    priors = _priors([history for term, history in yields.items() if history.get('sessions')])
+    scores = {term: term_score(yields.get(term), *priors) for term in terms}
+    return BudgetAllocator(terms, int(total), scores)
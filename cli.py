@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+FreeWork Job Application Assistant - Headless command line runner
+
+Intended for cron jobs and containers. Only the standard library is
+imported at startup: selenium, cryptography and yaml are loaded by the
+commands that need them, so --help, validate, status and run --dry-run
+return in milliseconds.
+
+export streams the indexed history, so it runs in constant memory.
+snapshot shows an archived job description and every decision taken on it;
+search queries the full-text index of archived offers.
+
+Exit codes:
+    0  success
+    1  the session failed with an unexpected error
+    2  invalid usage or configuration
+    3  no credentials available
+    4  login failed
+    5  session aborted (site down or browser lost)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NO_CREDENTIALS = 3
+EXIT_LOGIN_FAILED = 4
+EXIT_ABORTED = 5
+
+
+class ConfigFileError(Exception):
+    """The search configuration file is missing or invalid"""
+
+
+def load_config_file(path):
+    """Load a JSON or YAML search configuration file"""
+    path = Path(path)
+    if not path.exists():
+        raise ConfigFileError(f"Config file not found: {path}")
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yml', '.yaml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ConfigFileError("PyYAML is required to read YAML config files (pip install pyyaml)")
+        data = yaml.safe_load(text)
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ConfigFileError(f"Invalid JSON in {path}: {e}")
+    if not isinstance(data, dict):
+        raise ConfigFileError(f"{path} must contain a mapping of settings")
+    # Accept both a bare search config and the {"search_config": {...}} layout of config.json
+    return data.get('search_config', data)
+
+
+def resolve_search_config(args, config_manager):
+    """Merge the config file (if any) over the stored or default search config"""
+    if args.config:
+        search_config = config_manager.get_default_search_config()
+        search_config.update(load_config_file(args.config))
+    else:
+        search_config = config_manager.load_search_config()
+    if getattr(args, 'term', None):
+        search_config['search_terms'] = args.term
+    if isinstance(search_config.get('publication_timeframes'), str):
+        search_config['publication_timeframes'] = [search_config['publication_timeframes']]
+    return search_config
+
+
+def print_plan(search_config, headless, no_submit=False):
+    """Print what a run would do"""
+    print(f"Search terms: {', '.join(search_config['search_terms'])}")
+    print(f"Contract types: {', '.join(search_config['contract_types']) or 'any'}")
+    print(f"Remote types: {', '.join(search_config['remote_types']) or 'any'}")
+    print(f"Publication timeframe: {search_config['publication_timeframes'][0]}")
+    print(f"Excluded keywords: {', '.join(search_config['excluded_keywords']) or 'none'}")
+    company_rules = search_config.get('company_rules') or {}
+    if company_rules.get('deny') or company_rules.get('allow'):
+        print(f"Company rules: {len(company_rules.get('deny') or [])} deny, {len(company_rules.get('allow') or [])} allow")
+    if search_config.get('total_application_budget') is not None:
+        print(f"Application budget: {search_config['total_application_budget']} across terms, highest yield first")
+    else:
+        print(f"Application budget: {search_config['max_applications_per_session']} per term, split by yield")
+    print(f"Browser: {'headless' if headless else 'visible'}")
+    if no_submit:
+        print("Mode: classify only, nothing will be submitted")
+
+
+def cmd_validate(args):
+    """Validate a search configuration without starting a browser"""
+    from config import get_secure_config, validate_search_config
+    try:
+        search_config = resolve_search_config(args, get_secure_config())
+    except ConfigFileError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    errors = validate_search_config(search_config)
+    for error in errors:
+        print(f"❌ {error}", file=sys.stderr)
+    if errors:
+        return EXIT_USAGE
+    print("✅ Configuration is valid")
+    return EXIT_OK
+
+
+def cmd_run(args):
+    """Run an application session"""
+    from config import get_secure_config, validate_search_config
+    config_manager = get_secure_config()
+    try:
+        search_config = resolve_search_config(args, config_manager)
+    except ConfigFileError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    errors = validate_search_config(search_config)
+    if errors:
+        for error in errors:
+            print(f"❌ {error}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.dry_run:
+        print_plan(search_config, args.headless, args.no_submit)
+        return EXIT_OK
+
+    if args.account or args.all_accounts:
+        return run_named_accounts(args, config_manager)
+
+    email = os.environ.get('FREEWORK_EMAIL')
+    password = os.environ.get('FREEWORK_PASSWORD')
+    if not email or not password:
+        email, password = config_manager.load_credentials()
+    if not email or not password:
+        print("❌ No credentials: set FREEWORK_EMAIL/FREEWORK_PASSWORD or save them from the interface", file=sys.stderr)
+        return EXIT_NO_CREDENTIALS
+
+    from logger import SecureLogger
+    import main as automation
+    outcome = automation.main(email, password, search_config, config_manager, SecureLogger(email), headless=args.headless,
+                              dry_run=args.no_submit, decisions_file=args.decisions_file)
+    return outcome_exit_code(automation, outcome)
+
+
+# Most severe first: the exit code of a multi-account run is the worst one
+EXIT_SEVERITY = (EXIT_ERROR, EXIT_ABORTED, EXIT_LOGIN_FAILED, EXIT_NO_CREDENTIALS, EXIT_OK)
+
+
+def outcome_exit_code(automation, outcome):
+    return {
+        automation.SESSION_COMPLETED: EXIT_OK,
+        automation.SESSION_NO_CREDENTIALS: EXIT_NO_CREDENTIALS,
+        automation.SESSION_LOGIN_FAILED: EXIT_LOGIN_FAILED,
+        automation.SESSION_ABORTED: EXIT_ABORTED,
+        automation.SESSION_STOPPED: EXIT_ABORTED,
+    }.get(outcome, EXIT_ERROR)
+
+
+def run_named_accounts(args, config_manager):
+    """Run stored accounts concurrently, each with its own profile and search config"""
+    known = config_manager.list_accounts()
+    account_ids = known if args.all_accounts else args.account
+    unknown = [account_id for account_id in account_ids if account_id not in known]
+    if unknown:
+        print(f"❌ Unknown account(s): {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_USAGE
+    if not account_ids:
+        print("❌ No accounts stored: add one with 'cli.py accounts add'", file=sys.stderr)
+        return EXIT_NO_CREDENTIALS
+
+    import main as automation
+    from accounts import run_accounts
+    outcomes = run_accounts(account_ids, config_manager, headless=args.headless, dry_run=args.no_submit,
+                            max_browsers=args.max_browsers)
+    codes = set()
+    for account_id, outcome in outcomes.items():
+        print(f"{account_id}: {outcome}")
+        codes.add(outcome_exit_code(automation, outcome))
+    return next(code for code in EXIT_SEVERITY if code in codes)
+
+
+def cmd_accounts(args):
+    """Add, list or remove named accounts"""
+    from config import get_secure_config
+    config_manager = get_secure_config()
+    if args.action == 'list':
+        for account_id in config_manager.list_accounts():
+            print(account_id)
+        return EXIT_OK
+    if args.action == 'remove':
+        if not config_manager.remove_account(args.name):
+            print(f"❌ Unknown account: {args.name}", file=sys.stderr)
+            return EXIT_USAGE
+        print(f"✅ Account {args.name} removed")
+        return EXIT_OK
+
+    search_config = None
+    if args.config:
+        try:
+            search_config = config_manager.get_default_search_config()
+            search_config.update(load_config_file(args.config))
+        except ConfigFileError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return EXIT_USAGE
+        from config import validate_search_config
+        errors = validate_search_config(search_config)
+        for error in errors:
+            print(f"❌ {error}", file=sys.stderr)
+        if errors:
+            return EXIT_USAGE
+    password = None
+    if args.email:
+        password = os.environ.get('FREEWORK_PASSWORD')
+        if not password:
+            import getpass
+            password = getpass.getpass(f"Password for {args.email}: ")
+    elif args.name not in config_manager.list_accounts():
+        print("❌ A new account needs --email", file=sys.stderr)
+        return EXIT_USAGE
+    config_manager.save_account(args.name, args.email, password, search_config)
+    print(f"✅ Account {args.name} saved")
+    return EXIT_OK
+
+
+def cmd_queue(args):
+    """Enqueue search terms for a shared crawl or show its progress"""
+    from work_queue import enqueue_search_terms, open_work_queue
+    try:
+        queue = open_work_queue(args.queue_url)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.action == 'status':
+        counts = queue.counts(args.crawl)
+        budget = counts.pop('budget')
+        print(', '.join(f"{state}: {count}" for state, count in counts.items()) if any(counts.values()) else 'no tasks')
+        print(f"Budget left: {'unlimited' if budget is None else budget}")
+        return EXIT_OK
+
+    from config import get_secure_config
+    try:
+        search_config = resolve_search_config(args, get_secure_config())
+    except ConfigFileError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    terms = list(dict.fromkeys(search_config['search_terms']))
+    queued = enqueue_search_terms(queue, terms, args.crawl, args.budget)
+    print(f"✅ {queued} search term(s) queued in crawl '{args.crawl}'")
+    if queued < len(terms):
+        print(f"{len(terms) - queued} search term(s) already pending or running")
+    return EXIT_OK
+
+
+def cmd_worker(args):
+    """Claim search terms from a shared crawl until the queue is empty"""
+    from config import get_secure_config, validate_search_config
+    from work_queue import QueueCrawl, open_work_queue
+    config_manager = get_secure_config()
+    try:
+        queue = open_work_queue(args.queue_url)
+        search_config = resolve_search_config(args, config_manager)
+    except (ConfigFileError, RuntimeError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    errors = validate_search_config(search_config)
+    for error in errors:
+        print(f"❌ {error}", file=sys.stderr)
+    if errors:
+        return EXIT_USAGE
+
+    profile = None
+    if args.account:
+        try:
+            email, password, _ = config_manager.load_account(args.account)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}", file=sys.stderr)
+            return EXIT_USAGE
+        from accounts import profile_dir
+        profile = profile_dir(args.account)
+    else:
+        email = os.environ.get('FREEWORK_EMAIL')
+        password = os.environ.get('FREEWORK_PASSWORD')
+        if not email or not password:
+            email, password = config_manager.load_credentials()
+    if not email or not password:
+        print("❌ No credentials: set FREEWORK_EMAIL/FREEWORK_PASSWORD, pass --account or save them from the interface", file=sys.stderr)
+        return EXIT_NO_CREDENTIALS
+
+    from logger import SecureLogger
+    import main as automation
+    work = QueueCrawl(queue, args.crawl, worker_id=args.worker_id)
+    outcome = automation.main(email, password, search_config, config_manager, SecureLogger(email), headless=args.headless,
+                              account=args.account, profile=profile, work=work)
+    print(f"Worker {work.worker_id} finished {work.completed} search term(s)")
+    return outcome_exit_code(automation, outcome)
+
+
+def cmd_schedule(args):
+    """Manage recurring sessions or run the scheduler in the foreground"""
+    from scheduler import ScheduleError, ScheduleStore, add_schedule
+    store = ScheduleStore()
+    if args.action == 'list':
+        schedules = store.load()
+        if not schedules:
+            print("No schedules.")
+        for name, schedule in sorted(schedules.items()):
+            print(f"{name}: '{schedule['cron']}' account={schedule.get('account') or 'default'} "
+                  f"next={schedule.get('next_run')} last={schedule.get('last_run') or 'never'} "
+                  f"({schedule.get('last_outcome') or '-'})")
+        return EXIT_OK
+    if args.action == 'remove':
+        if not store.remove(args.name):
+            print(f"❌ Unknown schedule: {args.name}", file=sys.stderr)
+            return EXIT_USAGE
+        print(f"✅ Schedule {args.name} removed")
+        return EXIT_OK
+    if args.action == 'add':
+        from config import get_secure_config, validate_search_config
+        config_manager = get_secure_config()
+        if args.account and args.account not in config_manager.list_accounts():
+            print(f"❌ Unknown account: {args.account}", file=sys.stderr)
+            return EXIT_USAGE
+        search_config = None
+        if args.config or args.term:
+            try:
+                search_config = resolve_search_config(args, config_manager)
+            except ConfigFileError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return EXIT_USAGE
+            errors = validate_search_config(search_config)
+            for error in errors:
+                print(f"❌ {error}", file=sys.stderr)
+            if errors:
+                return EXIT_USAGE
+        try:
+            schedule = add_schedule(store, args.name, args.cron, account=args.account, search_config=search_config,
+                                    jitter=args.jitter, headless=args.headless)
+        except ScheduleError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return EXIT_USAGE
+        print(f"✅ Schedule {args.name} saved, next run {schedule['next_run']}")
+        return EXIT_OK
+
+    # run: poll until interrupted
+    from scheduler import get_scheduler
+    scheduler = get_scheduler()
+    scheduler.poll_interval = args.poll_interval
+    scheduler.start()
+    print(f"Scheduler running with {len(store.load())} schedule(s), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return EXIT_OK
+
+
+def cmd_status(args):
+    """Print stored statistics without decrypting anything"""
+    stats_file = Path.home() / ".freework_app" / "statistics.json"
+    if not stats_file.exists():
+        print("No statistics available yet.")
+        return EXIT_OK
+    with open(stats_file, 'r') as f:
+        all_stats = json.load(f)
+    users = [args.email] if args.email else sorted(all_stats)
+    if args.json:
+        print(json.dumps({user: all_stats.get(user) for user in users}, indent=2))
+        return EXIT_OK
+    for user in users:
+        stats = all_stats.get(user)
+        if not stats:
+            print(f"{user}: no statistics")
+            continue
+        print(f"{user}: {stats.get('successful_applications', 0)} submitted, "
+              f"{stats.get('failed_applications', 0)} failed, "
+              f"last session {stats.get('last_session') or 'never'}")
+    return EXIT_OK
+
+
+def resolve_email(email):
+    """--email, then FREEWORK_EMAIL, then the saved credentials (None if none)"""
+    email = email or os.environ.get('FREEWORK_EMAIL')
+    if not email:
+        from config import get_secure_config
+        email, _ = get_secure_config().load_credentials()
+    return email
+
+
+def parse_date_range(date_from, date_to):
+    """Inclusive YYYY-MM-DD bounds to ISO strings, the upper one exclusive; raises ValueError"""
+    from datetime import date, timedelta
+    return (date.fromisoformat(date_from).isoformat() if date_from else None,
+            (date.fromisoformat(date_to) + timedelta(days=1)).isoformat() if date_to else None)
+
+
+def cmd_export(args):
+    """Stream the application history to a file or stdout"""
+    from export import export_chunks
+
+    email = resolve_email(args.email)
+    if not email:
+        print("❌ No account: pass --email, set FREEWORK_EMAIL or save credentials from the interface", file=sys.stderr)
+        return EXIT_NO_CREDENTIALS
+    try:
+        date_from, date_to = parse_date_range(args.date_from, args.date_to)
+    except ValueError as e:
+        print(f"❌ Invalid date: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from config import get_secure_config
+    from history import get_history_store
+    store = get_history_store()
+    store.sync_statistics(get_secure_config())
+    chunks = export_chunks(store, email, export_format=args.format, date_from=date_from,
+                           date_to=date_to, compress=args.gzip)
+    if args.output and args.output != '-':
+        with open(args.output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+    return EXIT_OK
+
+
+def cmd_snapshot(args):
+    """Print an archived job description with its sightings, or the archive sizes"""
+    from snapshots import get_snapshot_store
+    store = get_snapshot_store()
+    if args.key is None:
+        for kind, info in sorted(store.stats().items()):
+            ratio = info['stored_size'] / info['size'] * 100 if info['size'] else 0.0
+            print(f"{kind}: {info['blobs']} snapshot(s), {info['sightings']} sighting(s), "
+                  f"{info['size']} bytes stored as {info['stored_size']} ({ratio:.0f}%)")
+        return EXIT_OK
+    digest = store.resolve(args.key)
+    if digest is None:
+        print(f"❌ No snapshot for {args.key}", file=sys.stderr)
+        return EXIT_USAGE
+    sightings = store.sightings(digest)
+    if args.json:
+        print(json.dumps({'digest': digest, 'sightings': sightings, 'text': store.load(digest)}, indent=2, ensure_ascii=False))
+        return EXIT_OK
+    print(f"snapshot {digest}")
+    for sighting in sightings:
+        reason = f" ({sighting['reason']})" if sighting['reason'] else ''
+        print(f"  {sighting['seen_at']}  {sighting['decision'] or sighting['kind']}{reason}  "
+              f"{sighting['title'] or ''} @ {sighting['company'] or ''}  {sighting['url'] or ''}")
+    print()
+    print(store.load(digest))
+    return EXIT_OK
+
+
+def cmd_search(args):
+    """Full-text search over the archived offers of one account"""
+    from offer_index import get_offer_index
+    from snapshots import get_snapshot_store
+
+    index = get_offer_index()
+    if args.rebuild:
+        count = index.rebuild(get_snapshot_store())
+        print(f"Indexed {count} offer(s)")
+        if not args.query:
+            return EXIT_OK
+    if not args.query:
+        print("❌ Nothing to search: give a query or --rebuild", file=sys.stderr)
+        return EXIT_USAGE
+    email = resolve_email(args.email)
+    if not email:
+        print("❌ No account: pass --email, set FREEWORK_EMAIL or save credentials from the interface", file=sys.stderr)
+        return EXIT_NO_CREDENTIALS
+    try:
+        date_from, date_to = parse_date_range(args.date_from, args.date_to)
+        mark = ('\033[1m', '\033[0m') if sys.stdout.isatty() else ('[', ']')
+        started = time.perf_counter()
+        results = index.search(email, ' '.join(args.query), decision=args.decision, search_term=args.term,
+                               date_from=date_from, date_to=date_to, limit=args.limit,
+                               snapshot_store=get_snapshot_store(), mark=mark)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return EXIT_OK
+    for result in results:
+        print(f"{result['last_seen'][:10]}  {result['decision'] or '-'}  {result['title']} @ {result['company']}")
+        print(f"    {result['url']}")
+        if result.get('snippet'):
+            print(f"    {result['snippet']}")
+    print(f"{len(results)} result(s) in {elapsed:.1f} ms")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='Headless runner for the FreeWork Job Application Assistant',
+        epilog='Exit codes: 0 ok, 1 error, 2 usage/config, 3 no credentials, 4 login failed, 5 aborted',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run an application session')
+    run_parser.add_argument('-c', '--config', help='JSON or YAML search configuration (defaults to the saved one)')
+    run_parser.add_argument('--headless', action=argparse.BooleanOptionalAction, default=True,
+                            help='run Firefox without a window (default: on)')
+    run_parser.add_argument('--dry-run', action='store_true',
+                            help='validate the configuration and print the plan without starting a browser')
+    run_parser.add_argument('-t', '--term', action='append',
+                            help='search term to run instead of the configured ones (repeatable)')
+    run_parser.add_argument('--no-submit', action='store_true',
+                            help='crawl and classify offers without submitting any application')
+    run_parser.add_argument('--decisions-file',
+                            help='where --no-submit writes its JSON lines decisions (default: ~/.freework_app/dry_runs/)')
+    run_parser.add_argument('-a', '--account', action='append',
+                            help='run this stored account with its own search config and browser profile (repeatable)')
+    run_parser.add_argument('--all-accounts', action='store_true', help='run every stored account concurrently')
+    run_parser.add_argument('--max-browsers', type=int,
+                            help='browsers allowed at once across accounts (default: FREEWORK_MAX_BROWSERS or 2)')
+    run_parser.set_defaults(handler=cmd_run)
+
+    validate_parser = subparsers.add_parser('validate', help='validate a search configuration')
+    validate_parser.add_argument('-c', '--config', help='JSON or YAML search configuration (defaults to the saved one)')
+    validate_parser.set_defaults(handler=cmd_validate)
+
+    status_parser = subparsers.add_parser('status', help='show stored application statistics')
+    status_parser.add_argument('--email', help='only show this account')
+    status_parser.add_argument('--json', action='store_true', help='print raw statistics as JSON')
+    status_parser.set_defaults(handler=cmd_status)
+
+    export_parser = subparsers.add_parser('export', help='export application history as NDJSON or CSV')
+    export_parser.add_argument('--email', help='account to export (default: FREEWORK_EMAIL or the saved one)')
+    export_parser.add_argument('-f', '--format', choices=('ndjson', 'csv'), default='ndjson', help='output format (default: ndjson)')
+    export_parser.add_argument('-o', '--output', help='file to write (default: stdout)')
+    export_parser.add_argument('--gzip', action='store_true', help='gzip the output')
+    export_parser.add_argument('--from', dest='date_from', metavar='YYYY-MM-DD', help='first day to include')
+    export_parser.add_argument('--to', dest='date_to', metavar='YYYY-MM-DD', help='last day to include')
+    export_parser.set_defaults(handler=cmd_export)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='show an archived job description and its decisions')
+    snapshot_parser.add_argument('key', nargs='?', help='job URL or snapshot digest (prefix); omit for archive sizes')
+    snapshot_parser.add_argument('--json', action='store_true', help='print the snapshot as JSON')
+    snapshot_parser.set_defaults(handler=cmd_snapshot)
+
+    search_parser = subparsers.add_parser('search', help='full-text search over archived offers')
+    search_parser.add_argument('query', nargs='*', help='words that must all appear (word* for a prefix)')
+    search_parser.add_argument('--email', help='account to search (default: FREEWORK_EMAIL or the saved one)')
+    search_parser.add_argument('--decision', help='only offers with this last decision (e.g. success, excluded)')
+    search_parser.add_argument('-t', '--term', help='only offers found with this search term')
+    search_parser.add_argument('--from', dest='date_from', metavar='YYYY-MM-DD', help='last seen on or after this day')
+    search_parser.add_argument('--to', dest='date_to', metavar='YYYY-MM-DD', help='last seen on or before this day')
+    search_parser.add_argument('-n', '--limit', type=int, default=20, help='results to show (default: 20)')
+    search_parser.add_argument('--json', action='store_true', help='print results as JSON')
+    search_parser.add_argument('--rebuild', action='store_true', help='rebuild the index from the snapshot archive first')
+    search_parser.set_defaults(handler=cmd_search)
+
+    queue_parser = subparsers.add_parser('queue', help='queue search terms for workers sharing one crawl')
+    queue_subparsers = queue_parser.add_subparsers(dest='action', required=True)
+    enqueue_parser = queue_subparsers.add_parser('enqueue', help='queue the configured search terms')
+    enqueue_parser.add_argument('-c', '--config', help='JSON or YAML search configuration (defaults to the saved one)')
+    enqueue_parser.add_argument('-t', '--term', action='append', help='search term to queue instead of the configured ones (repeatable)')
+    enqueue_parser.add_argument('--budget', type=int, help='applications allowed across all workers of the crawl')
+    queue_status_parser = queue_subparsers.add_parser('status', help='show task counts and the remaining budget')
+    for sub in (enqueue_parser, queue_status_parser):
+        sub.add_argument('--crawl', default='default', help='crawl name (default: default)')
+        sub.add_argument('--queue-url', help='sqlite:///path or redis://host:port/db (default: FREEWORK_QUEUE_URL or ~/.freework_app/queue.db)')
+    queue_parser.set_defaults(handler=cmd_queue)
+
+    worker_parser = subparsers.add_parser('worker', help='process queued search terms until none are left')
+    worker_parser.add_argument('-c', '--config', help='JSON or YAML search configuration (defaults to the saved one)')
+    worker_parser.add_argument('--crawl', default='default', help='crawl name (default: default)')
+    worker_parser.add_argument('--queue-url', help='sqlite:///path or redis://host:port/db (default: FREEWORK_QUEUE_URL or ~/.freework_app/queue.db)')
+    worker_parser.add_argument('--worker-id', help='name reported in leases (default: host-pid)')
+    worker_parser.add_argument('-a', '--account', help='stored account to log in with')
+    worker_parser.add_argument('--headless', action=argparse.BooleanOptionalAction, default=True,
+                               help='run Firefox without a window (default: on)')
+    worker_parser.set_defaults(handler=cmd_worker)
+
+    schedule_parser = subparsers.add_parser('schedule', help='recurring sessions')
+    schedule_subparsers = schedule_parser.add_subparsers(dest='action', required=True)
+    schedule_add_parser = schedule_subparsers.add_parser('add', help='add or replace a schedule')
+    schedule_add_parser.add_argument('name', help='schedule name')
+    schedule_add_parser.add_argument('--cron', required=True,
+                                     help="five-field cron expression or @hourly/@daily/@weekly/@monthly, e.g. '0 */2 * * *'")
+    schedule_add_parser.add_argument('-a', '--account', help='stored account to run (default: the saved credentials)')
+    schedule_add_parser.add_argument('-c', '--config', help='JSON or YAML search configuration (default: the account\'s)')
+    schedule_add_parser.add_argument('-t', '--term', action='append', help='search term to run instead of the configured ones (repeatable)')
+    schedule_add_parser.add_argument('--jitter', type=int, default=300, help='random delay added to each run, in seconds (default: 300)')
+    schedule_add_parser.add_argument('--headless', action=argparse.BooleanOptionalAction, default=True,
+                                     help='run Firefox without a window (default: on)')
+    schedule_subparsers.add_parser('list', help='list schedules and their next run')
+    schedule_remove_parser = schedule_subparsers.add_parser('remove', help='delete a schedule')
+    schedule_remove_parser.add_argument('name', help='schedule name')
+    schedule_run_parser = schedule_subparsers.add_parser('run', help='run due schedules until interrupted')
+    schedule_run_parser.add_argument('--poll-interval', type=int, default=30, help='seconds between checks (default: 30)')
+    schedule_parser.set_defaults(handler=cmd_schedule)
+
+    accounts_parser = subparsers.add_parser('accounts', help='manage named accounts for multi-account runs')
+    accounts_subparsers = accounts_parser.add_subparsers(dest='action', required=True)
+    add_parser = accounts_subparsers.add_parser('add', help='add or update an account')
+    add_parser.add_argument('name', help='account name')
+    add_parser.add_argument('--email', help='login email (password from FREEWORK_PASSWORD or prompted)')
+    add_parser.add_argument('-c', '--config', help='JSON or YAML search configuration for this account')
+    accounts_subparsers.add_parser('list', help='list stored accounts')
+    remove_parser = accounts_subparsers.add_parser('remove', help='delete an account')
+    remove_parser.add_argument('name', help='account name')
+    accounts_parser.set_defaults(handler=cmd_accounts)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+EXACT = 'exact'
+NORMALIZED = 'normalized'
+FUZZY = 'fuzzy'
+MODES = (EXACT, NORMALIZED, FUZZY)
+# Minimum similarity of two normalized names for a fuzzy rule to match a typo'd name
+FUZZY_RATIO = 0.88
+# Legal forms and filler words ignored when comparing company names
+STOP_WORDS = frozenset((
+    'sa', 'sas', 'sasu', 'sarl', 'eurl', 'sci', 'inc', 'ltd', 'llc', 'gmbh', 'plc', 'bv', 'nv', 'ag',
+    'group', 'groupe', 'the', 'et', 'and', 'de', 'du', 'des', 'la', 'le', 'les',
+))
+
+
+class CompanyRuleError(ValueError):
+    """A company rule is malformed"""
+
+
+def normalize_company(name):
+    """Lowercase, accent- and punctuation-free company name without legal forms"""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(char for char in name if not unicodedata.combining(char)).lower()
+    tokens = re.findall(r'[a-z0-9]+', name.replace('&', ' and '))
+    return ' '.join(token for token in tokens if token not in STOP_WORDS)
+
+
+def parse_rule(rule):
+    """(mode, pattern) of a rule string: 'exact:ACME SAS', 'fuzzy:Alten' or a plain (normalized) name"""
+    if not isinstance(rule, str) or not rule.strip():
+        raise CompanyRuleError(f"Company rule must be a non-empty string: {rule!r}")
+    mode, separator, pattern = rule.partition(':')
+    if separator and mode.strip().lower() in MODES:
+        mode, pattern = mode.strip().lower(), pattern.strip()
+    else:
+        mode, pattern = NORMALIZED, rule.strip()
+    if not pattern:
+        raise CompanyRuleError(f"Company rule has an empty name: {rule!r}")
+    if mode != EXACT and not normalize_company(pattern):
+        raise CompanyRuleError(f"Company rule has nothing left to match once normalized: {rule!r}")
+    return mode, pattern
+
+
+class _RuleSet:
+    """
+    One list of rules compiled for constant-time lookups.
+
+    Exact and normalized rules are hash sets. Fuzzy rules go into a token
+    trie, so a rule matches any company name containing its tokens in order
+    ("alten" matches "Alten Sud Ouest"), with a similarity check on the
+    whole name as a fallback for spelling variants.
+    """
+
+    def __init__(self, rules):
+        self.exact = {}
+        self.normalized = {}
+        self.trie = {}
+        self.fuzzy = []
+        for rule in rules:
+            mode, pattern = parse_rule(rule)
+            if mode == EXACT:
+                self.exact.setdefault(pattern, rule)
+            elif mode == NORMALIZED:
+                self.normalized.setdefault(normalize_company(pattern), rule)
+            else:
+                normalized = normalize_company(pattern)
+                node = self.trie
+                for token in normalized.split():
+                    node = node.setdefault(token, {})
+                node.setdefault(None, rule)
+                self.fuzzy.append((normalized, rule))
+
+    def __bool__(self):
+        return bool(self.exact or self.normalized or self.fuzzy)
+
+    def _trie_match(self, tokens):
+        for start in range(len(tokens)):
+            node = self.trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                if None in node:
+                    return node[None]
+        return None
+
+    def match(self, company):
+        """The rule matching a company name, or None"""
+        rule = self.exact.get(company.strip())
+        if rule is not None:
+            return rule
+        normalized = normalize_company(company)
+        rule = self.normalized.get(normalized)
+        if rule is not None or not self.fuzzy or not normalized:
+            return rule
+        rule = self._trie_match(normalized.split())
+        if rule is not None:
+            return rule
+        for pattern, rule in self.fuzzy:
+            if SequenceMatcher(None, pattern, normalized).ratio() >= FUZZY_RATIO:
+                return rule
+        return None
+
+
+class CompanyRules:
+    """
+    Per-account company deny/allow lists from search_config['company_rules'].
+
+    A company matching a deny rule is skipped; when allow rules exist, only
+    companies matching one of them are kept. Deny wins over allow. Unknown
+    companies (None) are let through so the job page can decide. Skips are
+    counted per rule.
+    """
+
+    def __init__(self, deny=(), allow=()):
+        self.deny = _RuleSet(deny)
+        self.allow = _RuleSet(allow)
+        self.skips = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, search_config):
+        rules = search_config.get('company_rules') or {}
+        return cls(rules.get('deny') or (), rules.get('allow') or ())
+
+    def __bool__(self):
+        return bool(self.deny or self.allow)
+
+    def blocking_rule(self, company):
+        """Label of the rule that excludes a company ('deny:<rule>' or 'not-allowed'), or None to keep it"""
+        if not company or not self:
+            return None
+        rule = self.deny.match(company)
+        if rule is not None:
+            return f"deny:{rule}"
+        if self.allow and self.allow.match(company) is None:
+            return 'not-allowed'
+        return None
+
+    def check(self, company):
+        """Like blocking_rule, counting the skip against the rule"""
+        label = self.blocking_rule(company)
+        if label is not None:
+            with self._lock:
+                self.skips[label] += 1
+        return label
+
+
+def validate_company_rules(rules):
+    """Problems found in a company_rules setting"""
+    if rules is None:
+        return []
+    if not isinstance(rules, dict) or set(rules) - {'deny', 'allow'}:
+        return ["'company_rules' must be a mapping with 'deny' and/or 'allow' lists"]
+    errors = []
+    for kind in ('deny', 'allow'):
+        value = rules.get(kind) or []
+        if not isinstance(value, list):
+            errors.append(f"'company_rules.{kind}' must be a list of strings")
+            continue
+        for rule in value:
+            try:
+                parse_rule(rule)
+            except CompanyRuleError as e:
+                errors.append(str(e))
+    return errors
@@ -1,28 +1,180 @@
 import os
 import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from cryptography.fernet import Fernet
 import base64
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Settings only edited in config files or through the API: saving a search
+# config without them (as the desktop interface does) keeps the stored ones
+PRESERVED_FIELDS = ('company_rules', 'message_templates', 'skills', 'total_application_budget')
+
+
+def _keep_preserved(search_config, stored):
+    """Copy of search_config with the preserved fields it leaves out taken from the stored config"""
+    stored = stored or {}
+    search_config = dict(search_config)
+    for field in PRESERVED_FIELDS:
+        if field not in search_config and field in stored:
+            search_config[field] = stored[field]
+    return search_config
+
+
+def file_stamp(path):
+    """Identity of a file's current contents: (inode, mtime, size), or None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on <path>.lock, held across threads and processes"""
+    with open(f"{path}.lock", 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write(path, data):
+    """Write bytes to a temporary file next to path, fsync it and rename it over path"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data):
+    """Atomically replace path with the JSON encoding of data"""
+    atomic_write(path, json.dumps(data, indent=2).encode('utf-8'))
+
+
 class SecureConfig:
+    # Shared by every instance in the process: key file path -> (stamp, key, cipher)
+    _ciphers = {}
+    _ciphers_lock = threading.Lock()
+
     def __init__(self):
         self.config_dir = Path.home() / ".freework_app"
         self.config_dir.mkdir(exist_ok=True)
         self.config_file = self.config_dir / "config.json"
         self.key_file = self.config_dir / "key.key"
         self.stats_file = self.config_dir / "statistics.json"
-        self._load_or_create_key()
+        self.accounts_file = self.config_dir / "accounts.json"
+        # Parsed JSON documents: path -> (stamp, data)
+        self._documents = {}
+        self._documents_lock = threading.Lock()
+        
+    @property
+    def cipher(self):
+        """Fernet cipher, loaded once per process and reloaded only if key.key changes"""
+        with self._ciphers_lock:
+            cached = self._ciphers.get(self.key_file)
+            if cached is None or cached[0] != file_stamp(self.key_file):
+                cached = self._load_or_create_key()
+                self._ciphers[self.key_file] = cached
+            self.key = cached[1]
+            return cached[2]
         
     def _load_or_create_key(self):
         """Load existing encryption key or create a new one"""
-        if self.key_file.exists():
-            with open(self.key_file, 'rb') as f:
-                self.key = f.read()
-        else:
-            self.key = Fernet.generate_key()
-            with open(self.key_file, 'wb') as f:
-                f.write(self.key)
-        self.cipher = Fernet(self.key)
+        from cryptography.fernet import Fernet
+        self.config_dir.mkdir(exist_ok=True)
+        # Locked so two processes starting together cannot create different keys
+        with file_lock(self.key_file):
+            if self.key_file.exists():
+                with open(self.key_file, 'rb') as f:
+                    key = f.read()
+            else:
+                key = Fernet.generate_key()
+                atomic_write(self.key_file, key)
+            return file_stamp(self.key_file), key, Fernet(key)
+
+    def _read_json(self, path, default=None):
+        """
+        Parse a JSON file, reusing the cached document while the file is unchanged.
+
+        The returned object is shared with the cache and must not be mutated.
+        """
+        try:
+            f = open(path, 'r')
+        except FileNotFoundError:
+            with self._documents_lock:
+                self._documents.pop(path, None)
+            return default
+        with f:
+            # Files are replaced atomically, so the open file matches its own stamp
+            st = os.fstat(f.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._documents_lock:
+                cached = self._documents.get(path)
+                if cached is not None and cached[0] == stamp:
+                    return cached[1]
+            data = json.load(f)
+        with self._documents_lock:
+            self._documents[path] = (stamp, data)
+        return data
+
+    def _write_json(self, path, data):
+        """Atomically write a JSON document under its file lock"""
+        self.config_dir.mkdir(exist_ok=True)
+        with file_lock(path):
+            self._replace_json(path, data)
+
+    def _replace_json(self, path, data):
+        """Atomically write a JSON document (caller holds the lock) and drop its cached copy"""
+        atomic_write_json(path, data)
+        with self._documents_lock:
+            self._documents.pop(path, None)
+
+    @contextmanager
+    def transaction(self, path):
+        """
+        Read-modify-write a JSON document under an exclusive lock.
+
+        Yields a freshly parsed dict (empty if the file does not exist) that
+        the caller may modify freely; it is written back atomically when the
+        block exits without an exception.
+        """
+        self.config_dir.mkdir(exist_ok=True)
+        with file_lock(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            yield data
+            self._replace_json(path, data)
     
     def _encrypt(self, data):
         """Encrypt sensitive data"""
@@ -34,22 +186,34 @@ class SecureConfig:
     
     def save_credentials(self, email, password):
         """Securely save user credentials"""
-        config = {
-            'email': self._encrypt(email),
-            'password': self._encrypt(password),
-            'created_at': str(Path().stat().st_mtime)
-        }
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        encrypted_email = self._encrypt(email)
+        encrypted_password = self._encrypt(password)
+        # Keep the search configuration stored in the same file
+        with self.transaction(self.config_file) as config:
+            config['email'] = encrypted_email
+            config['password'] = encrypted_password
+            config['created_at'] = str(Path().stat().st_mtime)
+    
+    def save_settings(self, email=None, password=None, search_config=None):
+        """Save credentials and/or search configuration in a single atomic write"""
+        encrypted = {}
+        if email is not None and password is not None:
+            encrypted = {
+                'email': self._encrypt(email),
+                'password': self._encrypt(password),
+                'created_at': str(Path().stat().st_mtime)
+            }
+        with self.transaction(self.config_file) as config:
+            config.update(encrypted)
+            if search_config is not None:
+                config['search_config'] = _keep_preserved(search_config, config.get('search_config'))
     
     def load_credentials(self):
         """Load and decrypt user credentials"""
-        if not self.config_file.exists():
+        config = self._read_json(self.config_file)
+        if config is None:
             return None, None
         
-        with open(self.config_file, 'r') as f:
-            config = json.load(f)
-        
         try:
             email = self._decrypt(config['email'])
             password = self._decrypt(config['password'])
@@ -60,27 +224,21 @@ class SecureConfig:
     
     def save_search_config(self, search_config):
         """Save search configuration"""
-        config = self.load_full_config()
-        config['search_config'] = search_config
-        self._save_full_config(config)
+        with self.transaction(self.config_file) as config:
+            config['search_config'] = _keep_preserved(search_config, config.get('search_config'))
     
     def load_search_config(self):
         """Load search configuration"""
-        config = self.load_full_config()
-        return config.get('search_config', self.get_default_search_config())
+        config = self._read_json(self.config_file, {})
+        return dict(config.get('search_config') or self.get_default_search_config())
     
     def load_full_config(self):
-        """Load full configuration"""
-        if not self.config_file.exists():
-            return {}
-        
-        with open(self.config_file, 'r') as f:
-            return json.load(f)
+        """Load full configuration (a private copy the caller may modify)"""
+        return dict(self._read_json(self.config_file, {}))
     
     def _save_full_config(self, config):
         """Save full configuration"""
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        self._write_json(self.config_file, config)
     
     def get_default_search_config(self):
         """Get default search configuration"""
@@ -95,34 +253,111 @@ class SecureConfig:
             'delay_between_applications': 2
         }
     
+    def save_account(self, account_id, email=None, password=None, search_config=None):
+        """Create or update a named account; omitted fields keep their stored value"""
+        encrypted = {}
+        if email is not None and password is not None:
+            encrypted = {'email': self._encrypt(email), 'password': self._encrypt(password)}
+        with self.transaction(self.accounts_file) as accounts:
+            account = accounts.setdefault(account_id, {'created_at': datetime.now().isoformat()})
+            account.update(encrypted)
+            if search_config is not None:
+                account['search_config'] = search_config
+    
+    def remove_account(self, account_id):
+        """Delete a named account; returns False if it did not exist"""
+        with self.transaction(self.accounts_file) as accounts:
+            return accounts.pop(account_id, None) is not None
+    
+    def list_accounts(self):
+        """Names of the stored accounts, sorted"""
+        return sorted(self._read_json(self.accounts_file, {}))
+    
+    def load_account(self, account_id):
+        """Decrypted (email, password, search_config) of a named account"""
+        account = self._read_json(self.accounts_file, {}).get(account_id)
+        if account is None:
+            raise KeyError(f"Unknown account: {account_id}")
+        try:
+            email = self._decrypt(account['email'])
+            password = self._decrypt(account['password'])
+        except Exception as e:
+            print(f"Error decrypting credentials of account {account_id}: {e}")
+            email = password = None
+        return email, password, dict(account.get('search_config') or self.get_default_search_config())
+    
     def save_statistics(self, user_email, stats):
-        """Save user statistics"""
-        if not self.stats_file.exists():
-            all_stats = {}
-        else:
-            with open(self.stats_file, 'r') as f:
-                all_stats = json.load(f)
-        
-        if user_email not in all_stats:
-            all_stats[user_email] = {
-                'total_applications': 0,
-                'successful_applications': 0,
-                'failed_applications': 0,
-                'sessions': [],
-                'last_session': None
-            }
-        
-        all_stats[user_email].update(stats)
-        
-        with open(self.stats_file, 'w') as f:
-            json.dump(all_stats, f, indent=2)
+        """Save user statistics and bump the user's statistics version"""
+        with self.transaction(self.stats_file) as all_stats:
+            if user_email not in all_stats:
+                all_stats[user_email] = {
+                    'total_applications': 0,
+                    'successful_applications': 0,
+                    'failed_applications': 0,
+                    'sessions': [],
+                    'last_session': None,
+                    # Generation of the entry, so its versions never repeat after the data is cleared
+                    'created': datetime.now().strftime('%Y%m%d%H%M%S%f')
+                }
+            
+            version = all_stats[user_email].get('version', 0) + 1
+            all_stats[user_email].update(stats)
+            all_stats[user_email]['version'] = version
+    
+    def statistics_version(self, user_email):
+        """Generation and counter of the user's statistics, changed on every save ('0' if none)"""
+        stats = self.load_statistics(user_email)
+        if not stats:
+            return '0'
+        return f"{stats.get('created', 0)}.{stats.get('version', 0)}"
     
     def load_statistics(self, user_email):
-        """Load user statistics"""
-        if not self.stats_file.exists():
+        """Load user statistics (shared with the cache, do not modify)"""
+        all_stats = self._read_json(self.stats_file)
+        if all_stats is None:
             return None
         
-        with open(self.stats_file, 'r') as f:
-            all_stats = json.load(f)
-        
-        return all_stats.get(user_email, None) 
\ No newline at end of file
+        return all_stats.get(user_email, None) 
+
+
+_shared_config = None
+_shared_config_lock = threading.Lock()
+
+
+def get_secure_config():
+    """Return the process-wide SecureConfig so caches and the cipher are shared"""
+    global _shared_config
+    with _shared_config_lock:
+        if _shared_config is None:
+            _shared_config = SecureConfig()
+        return _shared_config
+
+
+def validate_search_config(search_config):
+    """Return a list of problems found in a search configuration"""
+    errors = []
+    for field in ('search_terms', 'contract_types', 'remote_types', 'excluded_keywords'):
+        value = search_config.get(field, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            errors.append(f"'{field}' must be a list of strings")
+    if not search_config.get('search_terms'):
+        errors.append("'search_terms' must contain at least one term")
+    timeframes = search_config.get('publication_timeframes')
+    if isinstance(timeframes, str):
+        timeframes = [timeframes]
+    if not timeframes:
+        errors.append("'publication_timeframes' must not be empty")
+    if not isinstance(search_config.get('application_message', ''), str):
+        errors.append("'application_message' must be a string")
+    for field in ('max_applications_per_session', 'delay_between_applications', 'total_application_budget'):
+        value = search_config.get(field, 0)
+        if value is None and field == 'total_application_budget':
+            continue
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            errors.append(f"'{field}' must be a non-negative number")
+    from company_rules import validate_company_rules
+    errors.extend(validate_company_rules(search_config.get('company_rules')))
+    if isinstance(search_config.get('application_message', ''), str):
+        from message_templates import validate_message_templates
+        errors.extend(validate_message_templates(search_config))
+    return errors
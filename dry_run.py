@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+WOULD_APPLY = 'would_apply'
+EXCLUDED = 'excluded'
+ALREADY_APPLIED = 'already_applied'
+ERROR = 'error'
+
+# Settings that change which offers are found or how they are classified
+CLASSIFICATION_FIELDS = ('contract_types', 'remote_types', 'publication_timeframes', 'excluded_keywords', 'company_rules')
+
+
+def config_fingerprint(search_config):
+    """Short stable hash of the settings that drive classification"""
+    relevant = {field: search_config.get(field) for field in CLASSIFICATION_FIELDS}
+    encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def default_decisions_path():
+    """Decisions file under ~/.freework_app/dry_runs named after the current time"""
+    directory = Path.home() / ".freework_app" / "dry_runs"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"decisions_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+
+
+class DecisionLog:
+    """
+    Append-only JSON lines file of dry-run decisions.
+
+    Every record is written with a single O_APPEND write, so several
+    processes crawling different terms can share one file safely.
+    """
+
+    def __init__(self, path, search_config):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.config_id = config_fingerprint(search_config)
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+
+    def record(self, search_term, url, job_title, company, decision, keyword=None):
+        """Append one classification decision"""
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'config_id': self.config_id,
+            'search_term': search_term,
+            'url': url,
+            'job_title': job_title,
+            'company': company,
+            'decision': decision,
+            'keyword': keyword,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            os.write(self._fd, line)
+            self.counts[decision] = self.counts.get(decision, 0) + 1
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import zlib
+
+from history import row_to_application
+
+FORMATS = ('ndjson', 'csv')
+EXPORT_FIELDS = ('timestamp', 'job_title', 'company', 'status', 'search_term',
+                 'contract_type', 'remote_type', 'reason')
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Rows serialized into one chunk before it is handed to the writer or socket
+CHUNK_ROWS = 200
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ';'.join(value)
+    return '' if value is None else value
+
+
+def iter_ndjson(rows):
+    """Serialize stored rows as newline-delimited JSON chunks"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row_to_application(row), ensure_ascii=False))
+        if len(lines) >= CHUNK_ROWS:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def iter_csv(rows):
+    """Serialize stored rows as CSV chunks, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for row in rows:
+        application = row_to_application(row)
+        writer.writerow([_csv_value(application[field]) for field in EXPORT_FIELDS])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a chunk stream into a single gzip member as it goes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(store, user, export_format='ndjson', date_from=None, date_to=None, compress=False):
+    """Stream a user's history from the store as encoded (optionally gzipped) chunks"""
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    rows = store.iter_applications(user, date_from=date_from, date_to=date_to)
+    chunks = iter_ndjson(rows) if export_format == 'ndjson' else iter_csv(rows)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(user, export_format, compress=False):
+    """Download name for an export"""
+    safe_user = ''.join(c if c.isalnum() else '_' for c in user)
+    return f"applications_{safe_user}.{export_format}" + ('.gz' if compress else '')
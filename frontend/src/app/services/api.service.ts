@@ -1,7 +1,7 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpHeaders, HttpErrorResponse } from '@angular/common/http';
-import { Observable, throwError } from 'rxjs';
-import { catchError } from 'rxjs/operators';
+import { Observable, of, throwError } from 'rxjs';
+import { catchError, map } from 'rxjs/operators';
 import { environment } from '../../environments/environment';
 
 export interface Credentials {
@@ -52,6 +52,55 @@ export interface ApplicationDetail {
   reason?: string;
 }
 
+export interface ApplicationPage {
+  items: ApplicationDetail[];
+  next_cursor?: string;
+}
+
+export interface ApplicationQuery {
+  date_from?: string;
+  date_to?: string;
+  search_term?: string;
+  company?: string;
+  status?: string;
+  contract_type?: string;
+  remote_type?: string;
+  sort?: string;
+  order?: 'asc' | 'desc';
+  limit?: number;
+  cursor?: string;
+}
+
+export interface TimeSeries {
+  granularity: 'day' | 'week' | 'month';
+  group_by: string;
+  buckets: string[];
+  series: { [key: string]: number[] };
+  totals: number[];
+}
+
+export interface OfferSearchResult {
+  digest: string;
+  url?: string;
+  title?: string;
+  company?: string;
+  search_term?: string;
+  decision?: string;
+  reason?: string;
+  first_seen: string;
+  last_seen: string;
+  score: number;
+  snippet?: string;
+}
+
+export interface OfferSearchQuery {
+  decision?: string;
+  search_term?: string;
+  date_from?: string;
+  date_to?: string;
+  limit?: number;
+}
+
 export interface SessionStatistics {
   session_id: string;
   date: string;
@@ -73,6 +122,7 @@ export interface PerSearchTermStats {
   jobs_submitted: number;
   jobs_already_applied: number;
   jobs_excluded: number;
+  jobs_company_skipped?: number;
   jobs_failed: number;
 }
 
@@ -86,6 +136,7 @@ export interface GlobalStatistics {
   per_contract_type: { [key: string]: number };
   per_remote_type: { [key: string]: number };
   per_day: { [key: string]: number };
+  outcomes?: { [key: string]: number };
   last_session?: string;
 }
 
@@ -94,9 +145,40 @@ export interface GlobalStatistics {
 })
 export class ApiService {
   private apiUrl = environment.apiUrl;
+  // Last body and ETag per URL + params, revalidated with If-None-Match
+  private etagCache = new Map<string, { etag: string; body: any }>();
 
   constructor(private http: HttpClient) {}
 
+  private cacheKey(path: string, params: { [key: string]: string }): string {
+    return path + '?' + Object.keys(params).sort().map(key => `${key}=${params[key]}`).join('&');
+  }
+
+  // GET that answers from the cache when the server replies 304 Not Modified
+  private getWithEtag<T>(path: string, params: { [key: string]: string }): Observable<T> {
+    const key = this.cacheKey(path, params);
+    const cached = this.etagCache.get(key);
+    let headers = this.getHeaders();
+    if (cached) {
+      headers = headers.set('If-None-Match', cached.etag);
+    }
+    return this.http.get<T>(`${this.apiUrl}${path}`, { headers, params, observe: 'response' }).pipe(
+      map(response => {
+        const etag = response.headers.get('ETag');
+        if (etag && response.body !== null) {
+          this.etagCache.set(key, { etag, body: response.body });
+        }
+        return response.body as T;
+      }),
+      catchError((error: HttpErrorResponse) => {
+        if (error.status === 304 && cached) {
+          return of(cached.body as T);
+        }
+        return this.handleError(error);
+      })
+    );
+  }
+
   private getHeaders(): HttpHeaders {
     return new HttpHeaders({
       'Content-Type': 'application/json'
@@ -130,16 +212,48 @@ export class ApiService {
   }
 
   getStatistics(email: string, password: string): Observable<Statistics> {
-    return this.http.get<Statistics>(`${this.apiUrl}/statistics`, {
+    return this.getWithEtag<Statistics>('/statistics', { email, password });
+  }
+
+  getAdvancedStatistics(email: string, password: string): Observable<GlobalStatistics> {
+    return this.getWithEtag<GlobalStatistics>('/statistics/advanced', { email, password });
+  }
+
+  getTimeSeries(email: string, password: string, granularity: 'day' | 'week' | 'month' = 'day',
+                groupBy = 'status', dateFrom?: string, dateTo?: string): Observable<TimeSeries> {
+    const params: { [key: string]: string } = { email, password, granularity, group_by: groupBy };
+    if (dateFrom) {
+      params['date_from'] = dateFrom;
+    }
+    if (dateTo) {
+      params['date_to'] = dateTo;
+    }
+    return this.getWithEtag<TimeSeries>('/statistics/timeseries', params);
+  }
+
+  getApplications(email: string, password: string, query: ApplicationQuery = {}): Observable<ApplicationPage> {
+    const params: { [key: string]: string } = { email, password };
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        params[key] = String(value);
+      }
+    });
+    return this.http.get<ApplicationPage>(`${this.apiUrl}/applications`, {
       headers: this.getHeaders(),
-      params: { email, password }
+      params
     }).pipe(catchError(this.handleError));
   }
 
-  getAdvancedStatistics(email: string, password: string): Observable<GlobalStatistics> {
-    return this.http.get<GlobalStatistics>(`${this.apiUrl}/statistics/advanced`, {
+  searchOffers(email: string, password: string, q: string, query: OfferSearchQuery = {}): Observable<{ query: string; items: OfferSearchResult[] }> {
+    const params: { [key: string]: string } = { email, password, q };
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        params[key] = String(value);
+      }
+    });
+    return this.http.get<{ query: string; items: OfferSearchResult[] }>(`${this.apiUrl}/offers/search`, {
       headers: this.getHeaders(),
-      params: { email, password }
+      params
     }).pipe(catchError(this.handleError));
   }
 
@@ -149,6 +263,7 @@ export class ApiService {
   }
 
   clearData(email: string, password: string): Observable<any> {
+    this.etagCache.clear();
     return this.http.delete(`${this.apiUrl}/data`, {
       headers: this.getHeaders(),
       params: { email, password }
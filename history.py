@@ -0,0 +1,438 @@
+import base64
+import json
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from config import file_stamp
+from outcomes import LEGACY_STATUS, normalize_status
+
+# Columns /applications can filter and sort on; each leads a per-user index
+SORT_FIELDS = ('timestamp', 'company', 'job_title', 'search_term', 'status')
+GRANULARITIES = ('day', 'week', 'month')
+# Longest time series served (about 3 years of days)
+MAX_BUCKETS = 1000
+SERIES_DIMENSIONS = ('status', 'search_term', 'contract_type', 'remote_type')
+# Bumped when derived tables change; older databases are rebuilt on open
+SCHEMA_VERSION = 3
+# Weight kept by past sessions each time a term runs again, so yields follow recent sessions
+YIELD_DECAY = 0.8
+YIELD_FIELDS = ('jobs_found', 'jobs_submitted', 'jobs_excluded', 'jobs_already_applied', 'jobs_failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (user, session_id)
+);
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    job_title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    status TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    search_term TEXT NOT NULL,
+    contract_type TEXT NOT NULL,
+    remote_type TEXT NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_applications_timestamp ON applications (user, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_applications_company ON applications (user, company, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_applications_job_title ON applications (user, job_title, id);
+CREATE INDEX IF NOT EXISTS idx_applications_search_term ON applications (user, search_term, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications (user, status, timestamp, id);
+CREATE TABLE IF NOT EXISTS application_tags (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    application_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, value, application_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series_counts (
+    user TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user, granularity, dimension, bucket, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS term_yield (
+    user TEXT NOT NULL,
+    search_term TEXT NOT NULL,
+    sessions REAL NOT NULL,
+    jobs_found REAL NOT NULL,
+    jobs_submitted REAL NOT NULL,
+    jobs_excluded REAL NOT NULL,
+    jobs_already_applied REAL NOT NULL,
+    jobs_failed REAL NOT NULL,
+    last_session TEXT,
+    PRIMARY KEY (user, search_term)
+) WITHOUT ROWID;
+"""
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor could not be decoded"""
+
+
+class WindowTooLarge(ValueError):
+    """A time-series window spans more than MAX_BUCKETS buckets"""
+
+
+def encode_cursor(sort_value, row_id):
+    raw = json.dumps([sort_value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+
+def bucket_start(day, granularity):
+    """First day of the day/week/month bucket containing day"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def bucket_count(first, last, granularity):
+    """Number of buckets from the bucket starting at first to the one starting at last, both included"""
+    if granularity == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    days = (last - first).days
+    return (days // 7 if granularity == 'week' else days) + 1
+
+
+def as_list(value):
+    """Wrap a scalar contract/remote type in a list"""
+    if isinstance(value, list):
+        return value
+    if value is None:
+        return []
+    return [value]
+
+
+class ApplicationStore:
+    """
+    Indexed application history in ~/.freework_app/history.db.
+
+    statistics.json stays the source the automation writes. Sessions are
+    copied in once (keyed by session id), so queries only touch matching
+    rows through the indexes instead of scanning the whole history.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or Path.home() / ".freework_app" / "history.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._rebuild_series()
+        self._synced_stamp = None
+
+    def _rebuild_series(self):
+        """Recompute the time-series buckets from the stored applications"""
+        with self._lock, self._conn:
+            # Statuses are stored in the current vocabulary ('success' is now 'submitted')
+            for legacy, status in LEGACY_STATUS.items():
+                self._conn.execute("UPDATE applications SET status = ? WHERE status = ?", (status, legacy))
+            self._conn.execute("DELETE FROM series_counts")
+            rows = self._conn.execute(
+                "SELECT user, status, timestamp, search_term, contract_type, remote_type FROM applications"
+            )
+            for row in rows.fetchall():
+                self._count_in_series(row['user'], {
+                    'status': row['status'],
+                    'timestamp': row['timestamp'],
+                    'search_term': row['search_term'],
+                    'contract_type': json.loads(row['contract_type']),
+                    'remote_type': json.loads(row['remote_type']),
+                })
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _count_in_series(self, user, application):
+        """Add one application to its day, week and month buckets"""
+        try:
+            day = date.fromisoformat((application.get('timestamp') or '')[:10])
+        except ValueError:
+            return
+        keys = {
+            'status': [normalize_status(application.get('status')) or 'unknown'],
+            'search_term': [application.get('search_term') or 'unknown'],
+            'contract_type': as_list(application.get('contract_type')),
+            'remote_type': as_list(application.get('remote_type')),
+        }
+        self._conn.executemany(
+            "INSERT INTO series_counts (user, granularity, dimension, bucket, key, count) VALUES (?, ?, ?, ?, ?, 1)"
+            " ON CONFLICT (user, granularity, dimension, bucket, key) DO UPDATE SET count = count + 1",
+            [
+                (user, granularity, dimension, bucket_start(day, granularity).isoformat(), key)
+                for granularity in GRANULARITIES
+                for dimension in SERIES_DIMENSIONS
+                for key in keys[dimension]
+            ]
+        )
+
+    def record_session(self, user, session):
+        """Store one session record from statistics.json; ignored if already stored"""
+        session_id = session.get('session_id') or f"session_{session.get('date', '')}"
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (user, session_id, date) VALUES (?, ?, ?)",
+                (user, session_id, session.get('date'))
+            ).rowcount
+            if not inserted:
+                return 0
+            for application in session.get('applications', []):
+                self._insert_application(user, session_id, application)
+            for term_stats in session.get('per_search_term') or []:
+                self._update_term_yield(user, session.get('date'), term_stats)
+            return len(session.get('applications', []))
+
+    def _update_term_yield(self, user, session_date, term_stats):
+        """Fold one session's counters of a term into its decayed totals"""
+        if not term_stats.get('search_term'):
+            return
+        observed = [term_stats.get(field) or 0 for field in YIELD_FIELDS]
+        updates = ', '.join(f"{field} = {field} * {YIELD_DECAY} + excluded.{field}" for field in YIELD_FIELDS)
+        self._conn.execute(
+            f"INSERT INTO term_yield (user, search_term, sessions, {', '.join(YIELD_FIELDS)}, last_session)"
+            f" VALUES (?, ?, 1, {', '.join('?' for _ in YIELD_FIELDS)}, ?)"
+            f" ON CONFLICT (user, search_term) DO UPDATE SET sessions = sessions * {YIELD_DECAY} + 1, {updates},"
+            " last_session = excluded.last_session",
+            (user, term_stats['search_term'], *observed, session_date)
+        )
+
+    def term_yields(self, user):
+        """{search_term: decayed session count and counters} from past sessions"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM term_yield WHERE user = ?", (user,)).fetchall()
+        return {row['search_term']: {key: row[key] for key in row.keys() if key not in ('user', 'search_term')}
+                for row in rows}
+
+    def _insert_application(self, user, session_id, application):
+        contract_types = as_list(application.get('contract_type'))
+        remote_types = as_list(application.get('remote_type'))
+        cursor = self._conn.execute(
+            "INSERT INTO applications (user, session_id, job_title, company, status, timestamp,"
+            " search_term, contract_type, remote_type, reason) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                user,
+                session_id,
+                application.get('job_title') or 'Unknown',
+                application.get('company') or 'Unknown',
+                normalize_status(application.get('status')) or 'unknown',
+                application.get('timestamp') or '',
+                application.get('search_term') or 'unknown',
+                json.dumps(contract_types),
+                json.dumps(remote_types),
+                application.get('reason'),
+            )
+        )
+        row_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO application_tags (kind, value, application_id) VALUES (?, ?, ?)",
+            [('contract_type', value, row_id) for value in contract_types]
+            + [('remote_type', value, row_id) for value in remote_types]
+        )
+        self._count_in_series(user, application)
+        return row_id
+
+    def sync_statistics(self, config_manager):
+        """Import sessions from statistics.json that are not stored yet"""
+        stamp = file_stamp(config_manager.stats_file)
+        if stamp is None or stamp == self._synced_stamp:
+            return
+        all_stats = config_manager._read_json(config_manager.stats_file, {})
+        for user, stats in all_stats.items():
+            for session in (stats or {}).get('sessions', []):
+                self.record_session(user, session)
+        self._synced_stamp = stamp
+
+    def query_applications(self, user, date_from=None, date_to=None, search_term=None, company=None,
+                           status=None, contract_type=None, remote_type=None,
+                           sort='timestamp', order='desc', limit=50, cursor=None):
+        """
+        Return one page of applications and the cursor of the next page.
+
+        date_from is inclusive and date_to exclusive (ISO strings). The cursor
+        is opaque to callers and encodes the (sort value, id) of the last row.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}")
+        descending = order == 'desc'
+        where = ["a.user = ?"]
+        params = [user]
+        if date_from:
+            where.append("a.timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("a.timestamp < ?")
+            params.append(date_to)
+        for column, value in (('search_term', search_term), ('company', company), ('status', normalize_status(status))):
+            if value is not None:
+                where.append(f"a.{column} = ?")
+                params.append(value)
+        for kind, value in (('contract_type', contract_type), ('remote_type', remote_type)):
+            if value is not None:
+                where.append(
+                    "a.id IN (SELECT application_id FROM application_tags WHERE kind = ? AND value = ?)"
+                )
+                params.extend((kind, value))
+        if cursor:
+            sort_value, row_id = decode_cursor(cursor)
+            where.append(f"(a.{sort}, a.id) {'<' if descending else '>'} (?, ?)")
+            params.extend((sort_value, row_id))
+        direction = 'DESC' if descending else 'ASC'
+        sql = (
+            f"SELECT a.* FROM applications a WHERE {' AND '.join(where)}"
+            f" ORDER BY a.{sort} {direction}, a.id {direction} LIMIT ?"
+        )
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][sort], rows[-1]['id'])
+        return [row_to_application(row) for row in rows], next_cursor
+
+    def time_series(self, user, granularity='day', group_by='status', date_from=None, date_to=None):
+        """
+        Bucketed application counts for a window, one series per group key.
+
+        Reads only the precomputed buckets inside the window, so the cost
+        depends on the window and not on the size of the history. Dates are
+        datetime.date objects, both inclusive; without them the window spans
+        the stored buckets. Empty buckets are filled with zeros. Windows of
+        more than MAX_BUCKETS buckets raise WindowTooLarge.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if group_by not in SERIES_DIMENSIONS:
+            raise ValueError(f"Cannot group by {group_by}")
+        window = []
+        params = []
+        if date_from:
+            window.append(" AND bucket >= ?")
+            params.append(bucket_start(date_from, granularity).isoformat())
+        if date_to:
+            window.append(" AND bucket <= ?")
+            params.append(date_to.isoformat())
+        sql = (
+            "SELECT dimension, bucket, key, count FROM series_counts"
+            " WHERE user = ? AND granularity = ? AND dimension IN (?, 'status')" + ''.join(window)
+            + " ORDER BY bucket"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, [user, granularity, group_by] + params).fetchall()
+        result = {'granularity': granularity, 'group_by': group_by, 'buckets': [], 'series': {}, 'totals': []}
+        if not rows and not (date_from and date_to):
+            return result
+
+        first = bucket_start(date_from, granularity) if date_from else date.fromisoformat(rows[0]['bucket'])
+        last = bucket_start(date_to, granularity) if date_to else date.fromisoformat(rows[-1]['bucket'])
+        count = bucket_count(first, last, granularity)
+        if count > MAX_BUCKETS:
+            raise WindowTooLarge(f"Window spans {count} {granularity} buckets; at most {MAX_BUCKETS} are allowed")
+        current = first
+        for position in range(count):
+            result['buckets'].append(current.isoformat())
+            # No step past the last bucket, which may be the last representable date
+            if position < count - 1:
+                current = next_bucket(current, granularity)
+        index = {bucket: position for position, bucket in enumerate(result['buckets'])}
+
+        # Statuses are single-valued, so they also give the number of applications per bucket
+        totals = result['totals'] = [0] * len(index)
+        for row in rows:
+            position = index[row['bucket']]
+            if row['dimension'] == group_by:
+                result['series'].setdefault(row['key'], [0] * len(index))[position] += row['count']
+            if row['dimension'] == 'status':
+                totals[position] += row['count']
+        return result
+
+    def iter_applications(self, user, date_from=None, date_to=None, batch_size=500):
+        """
+        Yield a user's applications oldest first, batch_size rows at a time.
+
+        Each batch is a separate keyset query, so memory stays flat and the
+        store lock is never held while the caller consumes rows.
+        """
+        where = ["user = ?"]
+        params = [user]
+        if date_from:
+            where.append("timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("timestamp < ?")
+            params.append(date_to)
+        sql = f"SELECT * FROM applications WHERE {' AND '.join(where)}"
+        last = None
+        while True:
+            if last is None:
+                batch_sql, batch_params = sql, params
+            else:
+                batch_sql = sql + " AND (timestamp, id) > (?, ?)"
+                batch_params = params + list(last)
+            with self._lock:
+                rows = self._conn.execute(
+                    batch_sql + " ORDER BY timestamp, id LIMIT ?", batch_params + [batch_size]
+                ).fetchall()
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1]['timestamp'], rows[-1]['id'])
+
+
+def row_to_application(row):
+    """Convert a stored row to the ApplicationDetail layout"""
+    return {
+        'job_title': row['job_title'],
+        'company': row['company'],
+        'status': row['status'],
+        'timestamp': row['timestamp'],
+        'search_term': row['search_term'],
+        'contract_type': json.loads(row['contract_type']),
+        'remote_type': json.loads(row['remote_type']),
+        'reason': row['reason'],
+    }
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide application store"""
+    global _shared_store
+    with _shared_lock:
+        # Reopen if the data directory was cleared underneath us
+        if _shared_store is None or not _shared_store.db_path.exists():
+            _shared_store = ApplicationStore()
+        return _shared_store
@@ -1,17 +1,76 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import json
-from config import SecureConfig
+import hashlib
+import queue
+from config import get_secure_config
 from logger import SecureLogger
+from session_control import SessionControl
 import threading
 import time
 
+
+class AutoSaveWriter:
+    """Background thread that encrypts and writes form state off the Tk main thread"""
+
+    def __init__(self, config):
+        self.config = config
+        self.results = queue.Queue()
+        self._pending = None
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="auto-save-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, state_hash, email, password, search_config):
+        """Queue a state to save; replaces any state not yet written"""
+        with self._condition:
+            if email is None and self._pending is not None:
+                # Keep credentials from the state being replaced
+                email, password = self._pending[1], self._pending[2]
+            self._pending = (state_hash, email, password, search_config)
+            self._condition.notify_all()
+
+    def idle(self):
+        with self._condition:
+            return self._pending is None and not self._busy
+
+    def flush(self, timeout=10):
+        """Block until every submitted state has been written"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                state_hash, email, password, search_config = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                # One atomic write for credentials and search configuration
+                self.config.save_settings(email, password, search_config)
+                self.results.put((state_hash, None))
+            except Exception as e:
+                self.results.put((state_hash, e))
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+
 class FreeWorkInterface:
     def __init__(self):
-        self.config = SecureConfig()
+        self.config = get_secure_config()
         self.logger = SecureLogger()
         self.auto_save_timer = None
         self.changes_pending = False
+        self.auto_save_writer = AutoSaveWriter(self.config)
+        # Hashes of the last state handed to the writer, to skip unchanged saves
+        self.submitted_state_hash = None
+        self.submitted_credentials_hash = None
+        self.session_control = None
+        self.session_thread = None
         
         self.root = tk.Tk()
         self.root.title("FreeWork Job Application Assistant")
@@ -36,6 +95,7 @@ class FreeWorkInterface:
         
         self.setup_ui()
         self.load_existing_config()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Auto-save status label
         self.status_label = ttk.Label(self.root, text="✅ Configuration saved", foreground="green")
@@ -160,13 +220,16 @@ class FreeWorkInterface:
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=5, column=0, columnspan=2, pady=20)
         
-        ttk.Button(button_frame, text="🚀 Start Application Session", 
-                  command=self.start_session).grid(row=0, column=0, padx=5)
+        self.start_button = ttk.Button(button_frame, text="🚀 Start Application Session", 
+                                       command=self.start_session)
+        self.start_button.grid(row=0, column=0, padx=5)
         ttk.Button(button_frame, text="📊 View Statistics", 
                   command=self.show_statistics).grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="🗑️  Clear All Data", 
                   command=self.clear_data).grid(row=0, column=2, padx=5)
         
+        self.setup_progress_pane(main_frame)
+        
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -178,6 +241,35 @@ class FreeWorkInterface:
         # Set up auto-save triggers
         self.setup_auto_save_triggers()
     
+    def setup_progress_pane(self, main_frame):
+        """Live view of the running session with pause/stop controls"""
+        progress_frame = ttk.LabelFrame(main_frame, text="📈 Session Progress", padding="10")
+        progress_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 20))
+        
+        self.progress_vars = {}
+        progress_fields = [
+            ('status', 'Status:', 'Idle'),
+            ('term', 'Current term:', '-'),
+            ('jobs_found', 'Jobs found:', '0'),
+            ('jobs_submitted', '✅ Applied:', '0'),
+            ('jobs_excluded', '🚫 Excluded:', '0'),
+            ('jobs_already_applied', '↩️  Already applied:', '0'),
+            ('jobs_failed', '❌ Failed:', '0'),
+            ('throughput', 'Throughput:', '-'),
+        ]
+        for i, (key, label, initial) in enumerate(progress_fields):
+            ttk.Label(progress_frame, text=label).grid(row=i // 2, column=(i % 2) * 2, sticky=tk.W, padx=(0, 10), pady=2)
+            var = tk.StringVar(value=initial)
+            self.progress_vars[key] = var
+            ttk.Label(progress_frame, textvariable=var).grid(row=i // 2, column=(i % 2) * 2 + 1, sticky=tk.W, padx=(0, 20), pady=2)
+        
+        controls = ttk.Frame(progress_frame)
+        controls.grid(row=4, column=0, columnspan=4, pady=(10, 0))
+        self.pause_button = ttk.Button(controls, text="⏸️  Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=0, column=0, padx=5)
+        self.stop_button = ttk.Button(controls, text="⏹️  Stop", command=self.stop_session, state=tk.DISABLED)
+        self.stop_button.grid(row=0, column=1, padx=5)
+    
     def setup_auto_save_triggers(self):
         """Set up triggers for auto-save functionality"""
         # Bind text changes to auto-save
@@ -211,47 +303,94 @@ class FreeWorkInterface:
         # Show "saving..." status
         self.show_status("⏳ Saving...", "blue")
     
+    def collect_form_state(self):
+        """Read the credentials and search configuration currently in the form"""
+        email = self.email_var.get().strip()
+        password = self.password_var.get().strip()
+        
+        # Prepare search configuration
+        search_terms = [term.strip() for term in self.search_terms_text.get(1.0, tk.END).strip().split('\n') if term.strip()]
+        
+        contract_types = [value for value, var in self.contract_vars.items() if var.get()]
+        remote_types = [value for value, var in self.remote_vars.items() if var.get()]
+        
+        excluded_keywords = [kw.strip() for kw in self.excluded_keywords_var.get().split(',') if kw.strip()]
+        
+        search_config = {
+            'search_terms': search_terms,
+            'contract_types': contract_types,
+            'remote_types': remote_types,
+            'publication_timeframes': [self.timeframe_var.get()],
+            'excluded_keywords': excluded_keywords,
+            'application_message': self.message_text.get(1.0, tk.END).strip(),
+            'max_applications_per_session': int(self.max_apps_var.get()) if self.max_apps_var.get().isdigit() else 50,
+            'delay_between_applications': 2
+        }
+        return email, password, search_config
+    
+    @staticmethod
+    def _content_hash(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+    
     def perform_auto_save(self):
-        """Perform the actual auto-save operation"""
+        """Hand changed form state to the background writer"""
+        self.auto_save_timer = None
         if not self.changes_pending:
             return
+        self.changes_pending = False
         
-        try:
-            # Save credentials
-            email = self.email_var.get().strip()
-            password = self.password_var.get().strip()
-            
-            if email and password:
-                self.config.save_credentials(email, password)
-            
-            # Prepare search configuration
-            search_terms = [term.strip() for term in self.search_terms_text.get(1.0, tk.END).strip().split('\n') if term.strip()]
-            
-            contract_types = [value for value, var in self.contract_vars.items() if var.get()]
-            remote_types = [value for value, var in self.remote_vars.items() if var.get()]
-            
-            excluded_keywords = [kw.strip() for kw in self.excluded_keywords_var.get().split(',') if kw.strip()]
-            
-            search_config = {
-                'search_terms': search_terms,
-                'contract_types': contract_types,
-                'remote_types': remote_types,
-                'publication_timeframes': [self.timeframe_var.get()],
-                'excluded_keywords': excluded_keywords,
-                'application_message': self.message_text.get(1.0, tk.END).strip(),
-                'max_applications_per_session': int(self.max_apps_var.get()) if self.max_apps_var.get().isdigit() else 50,
-                'delay_between_applications': 2
-            }
-            
-            self.config.save_search_config(search_config)
-            
-            self.changes_pending = False
-            self.show_status("✅ Configuration saved automatically", "green")
-            self.logger.success("Configuration auto-saved successfully")
-            
-        except Exception as e:
-            self.show_status("❌ Auto-save failed", "red")
-            self.logger.error(f"Auto-save failed: {str(e)}")
+        email, password, search_config = self.collect_form_state()
+        state_hash = self._content_hash(email, password, search_config)
+        if state_hash == self.submitted_state_hash:
+            self.hide_status()
+            return
+        
+        # Only re-encrypt credentials when they actually changed
+        credentials_hash = self._content_hash(email, password)
+        if not (email and password) or credentials_hash == self.submitted_credentials_hash:
+            email = password = None
+        else:
+            self.submitted_credentials_hash = credentials_hash
+        
+        self.submitted_state_hash = state_hash
+        self.auto_save_writer.submit(state_hash, email, password, search_config)
+        self.poll_auto_save()
+    
+    def poll_auto_save(self):
+        """Report background save results on the Tk main thread"""
+        while True:
+            try:
+                state_hash, error = self.auto_save_writer.results.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                # Forget what was submitted so the next change retries the full save
+                self.submitted_state_hash = None
+                self.submitted_credentials_hash = None
+                self.show_status("❌ Auto-save failed", "red")
+                self.logger.error(f"Auto-save failed: {str(error)}")
+            elif state_hash == self.submitted_state_hash:
+                self.show_status("✅ Configuration saved automatically", "green")
+                self.logger.success("Configuration auto-saved successfully")
+        if not self.auto_save_writer.idle():
+            self.root.after(100, self.poll_auto_save)
+    
+    def flush_auto_save(self):
+        """Save any pending change now and wait for the writer to finish"""
+        if self.auto_save_timer:
+            self.root.after_cancel(self.auto_save_timer)
+            self.perform_auto_save()
+        self.auto_save_writer.flush()
+    
+    def on_close(self):
+        """Make sure the last edits are on disk before closing"""
+        if self.session_thread is not None and self.session_thread.is_alive():
+            if not messagebox.askyesno("Confirm", "A session is still running. Stop it and quit?"):
+                return
+            self.session_control.stop()
+            self.session_thread.join(timeout=30)
+        self.flush_auto_save()
+        self.root.destroy()
     
     def show_status(self, message, color):
         """Show status message at the bottom of the window"""
@@ -299,6 +438,11 @@ class FreeWorkInterface:
         
         # Load max applications
         self.max_apps_var.set(str(search_config['max_applications_per_session']))
+        
+        # The form now mirrors what is stored, so only real edits trigger a save
+        email, password, search_config = self.collect_form_state()
+        self.submitted_state_hash = self._content_hash(email, password, search_config)
+        self.submitted_credentials_hash = self._content_hash(email, password)
     
     def start_session(self):
         """Start the application session"""
@@ -316,18 +460,111 @@ class FreeWorkInterface:
             messagebox.showerror("Error", "Please enter at least one search term.\n\nYour configuration is saved automatically as you make changes.")
             return
         
-        # Load the current configuration (which should be auto-saved)
+        # Load the current configuration once pending auto-saves are on disk
+        self.flush_auto_save()
         search_config = self.config.load_search_config()
         if not search_config['search_terms']:
             messagebox.showerror("Error", "Please configure at least one search term.\n\nYour configuration is saved automatically as you make changes.")
             return
         
-        # Close the interface and start the main application
-        self.root.destroy()
+        if self.session_thread is not None and self.session_thread.is_alive():
+            messagebox.showinfo("Session", "A session is already running.")
+            return
         
-        # Import and run the main application
-        from main import main
-        main(email, password, search_config, self.config, self.logger)
+        # Run the session on a worker thread; the window stays responsive
+        self.session_control = SessionControl()
+        self.session_counts = {key: 0 for key in ('jobs_found', 'jobs_submitted', 'jobs_excluded', 'jobs_already_applied', 'jobs_failed')}
+        self.session_started_at = time.time()
+        self.progress_vars['status'].set("Starting browser...")
+        self.progress_vars['term'].set('-')
+        self.progress_vars['throughput'].set('-')
+        for key in self.session_counts:
+            self.progress_vars[key].set('0')
+        self.start_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.NORMAL, text="⏸️  Pause")
+        self.stop_button.config(state=tk.NORMAL)
+        
+        self.session_thread = threading.Thread(
+            target=self._run_session, args=(email, password, search_config, self.session_control),
+            name="application-session", daemon=True
+        )
+        self.session_thread.start()
+        self.root.after(200, self.poll_session_events)
+    
+    def _run_session(self, email, password, search_config, control):
+        """Worker thread body: run the automation and report how it ended"""
+        try:
+            from main import main
+            outcome = main(email, password, search_config, self.config, self.logger, control=control)
+        except Exception as e:
+            self.logger.error(f"Session crashed: {str(e)}")
+            outcome = 'error'
+        control.emit('session_finished', outcome=outcome)
+    
+    def poll_session_events(self):
+        """Drain progress events from the worker thread (runs on the Tk thread)"""
+        control = self.session_control
+        finished = False
+        while True:
+            try:
+                event = control.events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event['type']
+            if kind == 'session_started':
+                self.progress_vars['status'].set(f"Running ({event['terms']} search terms)")
+            elif kind == 'term_started':
+                self.progress_vars['term'].set(event['term'])
+            elif kind == 'job':
+                self.session_counts['jobs_found'] += 1
+                key = {
+                    'submitted': 'jobs_submitted',
+                    'would_apply': 'jobs_submitted',
+                    'excluded': 'jobs_excluded',
+                    'company_skipped': 'jobs_excluded',
+                    'already_applied': 'jobs_already_applied',
+                }.get(event['outcome'], 'jobs_failed')
+                self.session_counts[key] += 1
+            elif kind == 'paused':
+                self.progress_vars['status'].set("Paused")
+            elif kind == 'resumed':
+                self.progress_vars['status'].set("Running")
+            elif kind == 'session_finished':
+                finished = True
+                self.progress_vars['status'].set(f"Finished ({event['outcome']})")
+        
+        for key, count in self.session_counts.items():
+            self.progress_vars[key].set(str(count))
+        elapsed_minutes = (time.time() - self.session_started_at) / 60
+        if elapsed_minutes > 0 and self.session_counts['jobs_found']:
+            self.progress_vars['throughput'].set(f"{self.session_counts['jobs_found'] / elapsed_minutes:.1f} jobs/min")
+        
+        if finished:
+            self.start_button.config(state=tk.NORMAL)
+            self.pause_button.config(state=tk.DISABLED, text="⏸️  Pause")
+            self.stop_button.config(state=tk.DISABLED)
+        else:
+            self.root.after(200, self.poll_session_events)
+    
+    def toggle_pause(self):
+        """Pause or resume the running session at its next checkpoint"""
+        if self.session_control is None:
+            return
+        if self.session_control.paused:
+            self.session_control.resume()
+            self.pause_button.config(text="⏸️  Pause")
+        else:
+            self.session_control.pause()
+            self.pause_button.config(text="▶️  Resume")
+    
+    def stop_session(self):
+        """Ask the running session to stop at its next checkpoint"""
+        if self.session_control is None:
+            return
+        self.session_control.stop()
+        self.progress_vars['status'].set("Stopping...")
+        self.pause_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.DISABLED)
     
     def show_statistics(self):
         """Show user statistics"""
@@ -0,0 +1,237 @@
+import threading
+import time
+
+from timeouts import get_adaptive_timeouts
+
+# Selenium locator strategies (the values of selenium.webdriver.common.by.By)
+CSS = 'css selector'
+XPATH = 'xpath'
+
+# Logical elements of the site, each an ordered chain of candidates. Where a
+# button is picked by its text, the original text-matching XPath comes first
+# and the looser CSS selector is only a fallback for when the markup changes;
+# elsewhere the CSS selector is an exact equivalent. {placeholders} are
+# filled from the keyword arguments of find()/wait().
+SITE_LOCATORS = {
+    'login_button': [(XPATH, "//a[contains(@class, 'btn--light') and contains(., 'Connexion')]"),
+                     (CSS, "a.btn--light[href*='connexion']")],
+    'user_menu': [(CSS, "#user-menu"), (CSS, ".user-profile-indicator")],
+    'email_field': [(CSS, "#email")],
+    'password_field': [(CSS, "#password")],
+    'login_submit': [(XPATH, "//button[@type='submit' and contains(., 'Se connecter')]"),
+                     (CSS, "form button[type='submit']")],
+    'login_error': [(XPATH, "//*[contains(text(), 'incorrect') or contains(text(), 'Identifiants') "
+                            "or contains(text(), 'erreur') or contains(text(), 'invalide')]")],
+    'page_body': [(CSS, "body")],
+    'search_field': [(CSS, "#query")],
+    'filter_button': [(CSS, "#{filter_id}")],
+    'filter_popup': [(CSS, "div.tippy-box[data-state='visible']"),
+                     (XPATH, "//div[contains(@class, 'tippy-box') and @data-state='visible']")],
+    'filter_reset': [(XPATH, ".//button[@type='reset' and contains(., 'Réinitialiser')]"),
+                     (CSS, "button[type='reset']")],
+    'filter_radios': [(CSS, "input[type='radio']")],
+    'filter_option': [(CSS, "input[type='{option_type}'][value='{value}']"),
+                      (XPATH, ".//input[@type='{option_type}' and @value='{value}']")],
+    'filter_apply': [(XPATH, ".//button[contains(., 'Appliquer')]")],
+    'listing_links': [(CSS, "h2.font-semibold a[href*='/fr/tech-it/']"),
+                      (XPATH, "//h2[contains(@class, 'font-semibold')]//a[contains(@href, '/fr/tech-it/')]")],
+    # Relative to a listing link: the company shown on the same card
+    'listing_company': [(XPATH, "./ancestor::div[.//span[contains(@class, 'company')]][1]//span[contains(@class, 'company')]"),
+                        (XPATH, "./ancestor::div[.//img[@alt]][1]//img[@alt]")],
+    'next_page': [(XPATH, "//button[contains(., 'Suivant')]"), (CSS, "button[aria-label*='uivant']")],
+    'already_applied': [(XPATH, "//h3[contains(text(), 'Vous avez postulé')]")],
+    'job_content': [(CSS, ".prose-content")],
+    'job_title': [(CSS, "h1")],
+    'job_company': [(CSS, "span[class*='company']"), (XPATH, "//span[contains(@class, 'company')]")],
+    'application_message': [(CSS, "#job-application-message")],
+    'apply_button': [(XPATH, "//button[contains(., 'Je postule')]")],
+    'confirm_button': [(XPATH, "//button[contains(., 'Confirmer candidature')]")],
+}
+
+
+class LocatorMiss(LookupError):
+    """No candidate of a locator matched"""
+
+
+def _present(element):
+    return True
+
+
+def _visible(element):
+    return element.is_displayed()
+
+
+def _clickable(element):
+    return element.is_displayed() and element.is_enabled()
+
+
+CONDITIONS = {'present': _present, 'visible': _visible, 'clickable': _clickable}
+
+
+class LocatorStats:
+    """Hits, misses and lookup latency of one logical element"""
+
+    def __init__(self, candidates):
+        self.hits = 0
+        self.misses = 0
+        self.total_latency = 0.0
+        self.candidate_hits = [0] * candidates
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'avg_latency_ms': round(self.total_latency / lookups * 1000, 1) if lookups else 0.0,
+            'candidate_hits': list(self.candidate_hits),
+        }
+
+
+class LocatorRegistry:
+    """
+    Named element locators with fallback chains.
+
+    Each name maps to an ordered list of (strategy, selector) candidates.
+    Lookups try the candidate that last succeeded first, then the others in
+    order, so a site change costs one slow lookup and later calls go straight
+    to the candidate that works. Per-name hit/miss counts and latency are
+    kept for diagnostics. With an AdaptiveTimeouts, waits feed it their
+    latency and use the timeout it derives instead of the fixed one.
+    """
+
+    def __init__(self, locators=None, timeouts=None):
+        self.timeouts = timeouts
+        self._candidates = {}
+        self._preferred = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        for name, candidates in (locators or {}).items():
+            self.register(name, *candidates)
+
+    def register(self, name, *candidates):
+        with self._lock:
+            self._candidates[name] = list(candidates)
+            self._preferred[name] = 0
+            self._stats[name] = LocatorStats(len(candidates))
+
+    def _ordered(self, name, params):
+        candidates = self._candidates[name]
+        preferred = self._preferred[name]
+        order = [preferred] + [index for index in range(len(candidates)) if index != preferred]
+        for index in order:
+            strategy, selector = candidates[index]
+            yield index, strategy, selector.format(**params) if params else selector
+
+    def _record(self, name, started, index=None):
+        with self._lock:
+            stats = self._stats[name]
+            stats.total_latency += time.monotonic() - started
+            if index is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+                stats.candidate_hits[index] += 1
+                self._preferred[name] = index
+
+    def _match(self, context, name, params, condition, many=False):
+        """(candidate index, element or elements) of the first candidate that matches, or (None, None)"""
+        for index, strategy, selector in self._ordered(name, params):
+            elements = [element for element in context.find_elements(strategy, selector) if condition(element)]
+            if elements:
+                return index, elements if many else elements[0]
+        return None, None
+
+    def find(self, context, name, **params):
+        """First matching element inside context (driver or element); raises LocatorMiss"""
+        started = time.monotonic()
+        index, element = self._match(context, name, params, _present)
+        self._record(name, started, index)
+        if element is None:
+            raise LocatorMiss(f"No element found for '{name}'")
+        return element
+
+    def find_all(self, context, name, **params):
+        """All elements matched by the first candidate that matches anything (may be empty)"""
+        started = time.monotonic()
+        index, elements = self._match(context, name, params, _present, many=True)
+        self._record(name, started, index)
+        return elements or []
+
+    def exists(self, context, name, **params):
+        """Whether any candidate currently matches, without waiting (absence is not counted as a miss)"""
+        started = time.monotonic()
+        index, _ = self._match(context, name, params, _present, many=True)
+        if index is not None:
+            self._record(name, started, index)
+        return index is not None
+
+    def wait(self, driver, name, until='present', timeout=10, context=None, optional=False, **params):
+        """
+        Wait until a candidate matches in the given state; raises TimeoutException.
+
+        For an optional element (one that may never appear) a timeout is
+        neither a locator miss nor fed to the adaptive timeouts, which then
+        follow the latency of the times it did appear.
+        """
+        from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+        from selenium.webdriver.support.wait import WebDriverWait
+        condition = CONDITIONS[until]
+        if self.timeouts is not None:
+            timeout = self.timeouts.timeout(name, timeout)
+        scope = context if context is not None else driver
+        found = {}
+
+        def probe(_):
+            try:
+                index, element = self._match(scope, name, params, condition)
+            except StaleElementReferenceException:
+                return False
+            if element is None:
+                return False
+            found['index'] = index
+            return element
+
+        started = time.monotonic()
+        try:
+            element = WebDriverWait(driver, timeout).until(probe)
+        except TimeoutException:
+            if not optional:
+                self._record(name, started)
+                if self.timeouts is not None:
+                    self.timeouts.record(name, timeout)
+            raise
+        self._record(name, started, found['index'])
+        if self.timeouts is not None:
+            self.timeouts.record(name, time.monotonic() - started)
+        return element
+
+    def probe(self, driver, name, until='present', timeout=10, context=None, **params):
+        """
+        Optional element: None at once if it is not in the DOM, otherwise wait
+        for it to reach the given state (None if it never does).
+        """
+        from selenium.common.exceptions import TimeoutException
+        if not self.exists(context if context is not None else driver, name, **params):
+            return None
+        try:
+            return self.wait(driver, name, until, timeout, context, **params)
+        except TimeoutException:
+            return None
+
+    def stats(self):
+        """Snapshot of per-locator statistics"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_locator_registry():
+    """Return the process-wide registry of site locators"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = LocatorRegistry(SITE_LOCATORS, get_adaptive_timeouts())
+        return _shared_registry
@@ -1,77 +1,218 @@
+import atexit
+import contextvars
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
 import json
 
+SENSITIVE_PATTERN = re.compile(r'password|email|credential|token|key', re.IGNORECASE)
+CONTEXT_FIELDS = ('session', 'account', 'term', 'job')
+REDACT = {'redact': True}
+
+_log_context = contextvars.ContextVar('freework_log_context', default={})
+_pipeline_lock = threading.Lock()
+_listener = None
+
+
+def redact(message):
+    """Remove sensitive information from a log message in a single pass"""
+    return SENSITIVE_PATTERN.sub('[REDACTED]', message)
+
+
+class ContextFilter(logging.Filter):
+    """Attach the caller's session/term/job context to each record"""
+
+    def filter(self, record):
+        record.context = _log_context.get()
+        return True
+
+
+class RedactingFilter(logging.Filter):
+    """Redact sensitive words on the listener thread, off the hot path"""
+
+    def filter(self, record):
+        if getattr(record, 'redact', False):
+            record.msg = redact(record.getMessage())
+            record.args = None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        context = getattr(record, 'context', None) or {}
+        for field in CONTEXT_FIELDS:
+            entry[field] = context.get(field)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Size-rotating file handler that also starts a new file every day.
+
+    Files are named <prefix>_YYYYMMDD.log, rotated to .1, .2, ... when they
+    exceed max_bytes, and daily files older than retention_days are removed.
+    """
+
+    def __init__(self, directory, prefix, max_bytes=10 * 1024 * 1024, backup_count=5, retention_days=30):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.retention_days = retention_days
+        self.current_date = datetime.now().strftime('%Y%m%d')
+        super().__init__(self._path_for(self.current_date), maxBytes=max_bytes,
+                         backupCount=backup_count, encoding='utf-8')
+
+    def _path_for(self, date):
+        return self.directory / f"{self.prefix}_{date}.log"
+
+    def shouldRollover(self, record):
+        if datetime.now().strftime('%Y%m%d') != self.current_date:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        today = datetime.now().strftime('%Y%m%d')
+        if today == self.current_date:
+            super().doRollover()
+            return
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.current_date = today
+        self.baseFilename = os.path.abspath(self._path_for(today))
+        self.stream = self._open()
+        self._remove_expired()
+
+    def _remove_expired(self):
+        cutoff = datetime.now().timestamp() - self.retention_days * 86400
+        for path in self.directory.glob(f"{self.prefix}_*.log*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+class ApplicationRecordHandler(logging.Handler):
+    """Append application events to applications.jsonl"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.addFilter(lambda record: getattr(record, 'fields', {}).get('event') == 'application')
+
+    def emit(self, record):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record.application, ensure_ascii=False) + '\n')
+        except Exception:
+            self.handleError(record)
+
+
+class _RedactingDispatcher(logging.Handler):
+    """Redact once on the listener thread, then fan out to the real handlers"""
+
+    def __init__(self, *handlers):
+        super().__init__()
+        self.handlers = handlers
+        self.addFilter(RedactingFilter())
+
+    def handle(self, record):
+        if not self.filter(record):
+            return False
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+def _start_pipeline(logger, log_dir):
+    """Route the logger through a queue drained by a background listener"""
+    global _listener
+    file_handler = DailyRotatingFileHandler(log_dir, 'freework')
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    # Console handler for user-friendly messages
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    application_handler = ApplicationRecordHandler(log_dir / "applications.jsonl")
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, _RedactingDispatcher(file_handler, console_handler, application_handler),
+        respect_handler_level=False
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
 class SecureLogger:
     def __init__(self, user_email=None):
         self.user_email = user_email
         self.log_dir = Path.home() / ".freework_app" / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        
+
         # Create logger
         self.logger = logging.getLogger('FreeWorkApp')
         self.logger.setLevel(logging.INFO)
-        
-        # Prevent duplicate handlers
-        if not self.logger.handlers:
-            self._setup_handlers()
-    
-    def _setup_handlers(self):
-        """Setup logging handlers"""
-        # File handler for all logs
-        log_file = self.log_dir / f"freework_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler for user-friendly messages
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Create formatters
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_formatter = logging.Formatter('%(message)s')
-        
-        file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
-        
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-    
-    def _sanitize_message(self, message):
-        """Remove sensitive information from log messages"""
-        sensitive_words = ['password', 'email', 'credential', 'token', 'key']
-        sanitized = message
-        
-        for word in sensitive_words:
-            if word in message.lower():
-                sanitized = sanitized.replace(word, '[REDACTED]')
-        
-        return sanitized
-    
+
+        # One pipeline per process, however many SecureLogger instances exist
+        with _pipeline_lock:
+            if _listener is None:
+                _start_pipeline(self.logger, self.log_dir)
+
+    def set_context(self, **fields):
+        """Merge session/term/job fields into the context of later log records"""
+        context = dict(_log_context.get())
+        context.update(fields)
+        _log_context.set(context)
+
+    def clear_context(self):
+        """Drop all context fields"""
+        _log_context.set({})
+
     def info(self, message):
         """Log info message"""
-        sanitized_message = self._sanitize_message(message)
-        self.logger.info(sanitized_message)
-    
+        self.logger.info(message, extra=REDACT)
+
     def warning(self, message):
         """Log warning message"""
-        sanitized_message = self._sanitize_message(message)
-        self.logger.warning(sanitized_message)
-    
+        self.logger.warning(message, extra=REDACT)
+
     def error(self, message):
         """Log error message"""
-        sanitized_message = self._sanitize_message(message)
-        self.logger.error(sanitized_message)
-    
+        self.logger.error(message, extra=REDACT)
+
     def success(self, message):
         """Log success message with special formatting"""
-        sanitized_message = self._sanitize_message(message)
-        self.logger.info(f"✅ {sanitized_message}")
-    
+        self.logger.info(f"✅ {message}", extra=REDACT)
+
     def application_log(self, job_title, company, status, search_term):
         """Log application attempt with details"""
         log_entry = {
@@ -82,31 +223,21 @@ class SecureLogger:
             'status': status,
             'search_term': search_term
         }
-        
-        # Save to application log file
-        app_log_file = self.log_dir / "applications.json"
-        applications = []
-        
-        if app_log_file.exists():
-            with open(app_log_file, 'r') as f:
-                applications = json.load(f)
-        
-        applications.append(log_entry)
-        
-        with open(app_log_file, 'w') as f:
-            json.dump(applications, f, indent=2)
-        
-        # Log to main log
-        status_emoji = "✅" if status == "success" else "❌"
-        self.logger.info(f"{status_emoji} Application: {job_title} at {company} ({search_term})")
-    
+
+        # Written to applications.jsonl by the listener thread
+        status_emoji = "✅" if status in ("submitted", "success") else "❌"
+        self.logger.info(
+            f"{status_emoji} Application: {job_title} at {company} ({search_term})",
+            extra={'fields': {'event': 'application', 'status': status}, 'application': log_entry}
+        )
+
     def session_start(self, search_config):
         """Log session start"""
         self.logger.info("🚀 Starting new application session")
         self.logger.info(f"📋 Search terms: {', '.join(search_config['search_terms'])}")
         self.logger.info(f"📄 Contract types: {', '.join(search_config['contract_types'])}")
         self.logger.info(f"🏠 Remote types: {', '.join(search_config['remote_types'])}")
-    
+
     def session_end(self, stats):
         """Log session end with statistics"""
         self.logger.info("🏁 Session completed")
@@ -117,4 +248,4 @@ class SecureLogger:
             success_rate = (stats['successful_applications'] / total) * 100
         else:
             success_rate = 0
-        self.logger.info(f"📈 Success rate: {success_rate:.1f}%") 
\ No newline at end of file
+        self.logger.info(f"📈 Success rate: {success_rate:.1f}%")
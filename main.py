@@ -1,41 +1,88 @@
 import time
-import random
+from collections import Counter
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver import Keys
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchWindowException, TimeoutException, WebDriverException
+from rate_limiter import get_rate_limiter
+from retry import retryable, SessionAbort, SiteError
+from session_control import SessionStopped
+from accounts import get_browser_slots
+from locators import get_locator_registry
+from timeouts import get_adaptive_timeouts
+from snapshots import get_snapshot_store
+from offer_index import get_offer_index
+from company_rules import CompanyRules
+from message_templates import MessageTemplates, TemplateError
+from budget import plan_budget
+import outcomes
+from dry_run import DecisionLog, default_decisions_path, WOULD_APPLY, EXCLUDED, ALREADY_APPLIED, ERROR
+
+HOME_URL = "https://www.free-work.com/fr/tech-it"
+ERROR_PAGE_MARKERS = ('502 bad gateway', '503 service', '504 gateway', 'too many requests', 'erreur 500', 'page introuvable')
+
+
+def is_error_page(driver):
+    """Detect server error or throttling pages from the page title"""
+    try:
+        title = (driver.title or '').lower()
+    except Exception:
+        return False
+    return any(marker in title for marker in ERROR_PAGE_MARKERS)
+
+
+def wait_for_navigation(driver, previous_url, timeout=10):
+    """Wait for the URL to change and the new document to finish loading"""
+    timeouts = get_adaptive_timeouts()
+    timeout = timeouts.timeout('navigation', timeout)
+    started = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout).until(EC.url_changes(previous_url))
+    except TimeoutException:
+        timeouts.record('navigation', timeout)
+        return False
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+    timeouts.record('navigation', time.monotonic() - started)
+    return True
+
 
+def navigate(driver, url):
+    """Load a page through the shared rate limiter"""
+    with get_rate_limiter().throttle('page_load') as operation:
+        driver.get(url)
+        if is_error_page(driver):
+            operation.mark_error()
+    return not operation.error
 
 
-def initialize_browser(headless=False, logger=None):
-    """Initialize browser with options"""
+def initialize_browser(headless=False, logger=None, profile=None):
+    """Initialize browser with options, in the given Firefox profile directory if any"""
     if logger:
         logger.info("Initializing browser")
     options = webdriver.FirefoxOptions()
     if headless:
         options.add_argument('--headless')
+    if profile is not None:
+        options.add_argument('-profile')
+        options.add_argument(str(profile))
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     
     driver = webdriver.Firefox(options=options)
-    driver.get("https://www.free-work.com/fr/tech-it")
+    navigate(driver, HOME_URL)
     return driver
 
 
 def check_and_click_login(driver, logger):
     """Check if already logged in and click login if needed"""
+    locators = get_locator_registry()
     try:
-        login_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((
-                By.XPATH,
-                "//a[contains(@class, 'btn--light') and contains(., 'Connexion')]"
-            ))
-        )
-        logged_in_elements = driver.find_elements(By.CSS_SELECTOR, ".user-profile-indicator")
-        if not logged_in_elements:
+        login_button = locators.wait(driver, 'login_button')
+        if not locators.exists(driver, 'user_menu'):
             login_button.click()
             logger.info("Login button clicked")
         else:
@@ -48,29 +95,27 @@ def check_and_click_login(driver, logger):
 
 def perform_login(driver, email, password, logger):
     """Perform login with credentials and check for error messages"""
+    locators = get_locator_registry()
     try:
-        email_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "email"))
-        )
+        email_field = locators.wait(driver, 'email_field')
         email_field.send_keys(email)
-        password_field = driver.find_element(By.ID, "password")
+        password_field = locators.find(driver, 'password_field')
         password_field.send_keys(password)
-        submit_button = driver.find_element(By.XPATH, "//button[@type='submit' and contains(., 'Se connecter')]")
+        submit_button = locators.find(driver, 'login_submit')
         submit_button.click()
         time.sleep(5)
 
         # Check for login error message
         try:
-            error_element = driver.find_element(By.XPATH, "//*[contains(text(), 'incorrect') or contains(text(), 'Identifiants') or contains(text(), 'erreur') or contains(text(), 'invalide')]")
-            if error_element.is_displayed():
+            error_elements = locators.find_all(driver, 'login_error')
+            if error_elements and error_elements[0].is_displayed():
                 logger.error("Login failed: Incorrect credentials or error message detected on page.")
                 return False
         except Exception:
             pass  # No error message found
 
         # Check if user profile indicator is present (logged in)
-        logged_in_elements = driver.find_elements(By.CSS_SELECTOR, "#user-menu")
-        if logged_in_elements:
+        if locators.exists(driver, 'user_menu'):
             logger.success("Login successful")
             return True
         else:
@@ -81,21 +126,107 @@ def perform_login(driver, email, password, logger):
         return False
 
 
+def _refresh_page(driver, *args, **kwargs):
+    """Reload the current page before retrying an operation on it"""
+    driver.refresh()
+
+
+def _dismiss_popups(driver, *args, **kwargs):
+    """Close any open pop-up before retrying an operation"""
+    get_locator_registry().find(driver, 'page_body').send_keys(Keys.ESCAPE)
+
+
+@retryable('search')
+def _submit_search(driver, search_term, logger):
+    """Type the search term and wait for the results page"""
+    search_field = get_locator_registry().wait(driver, 'search_field')
+    search_field.clear()
+    search_field.send_keys(search_term)
+    with get_rate_limiter().throttle('page_load'):
+        previous_url = driver.current_url
+        search_field.send_keys(Keys.RETURN)
+        if not wait_for_navigation(driver, previous_url):
+            raise TimeoutException(f"Results page did not load after searching for {search_term}")
+        if is_error_page(driver):
+            raise SiteError(f"Error page after searching for {search_term}")
+
+
 def perform_search(driver, search_term, logger):
     """Perform search with given term"""
     try:
-        search_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "query")))
-        search_field.clear()
-        search_field.send_keys(search_term)
-        search_field.send_keys(Keys.RETURN)
-        time.sleep(3)
+        _submit_search(driver, search_term, logger)
         logger.info(f"Search performed for: {search_term}")
         return True
+    except SessionAbort:
+        raise
     except Exception as e:
         logger.error(f"Search failed for {search_term}: {e}")
         return False
 
 
+@retryable('filter', before_retry=_dismiss_popups)
+def _open_and_apply_filter(driver, logger, filter_id, option_type, option_values):
+    """Open a filter pop-up, select the options and apply them"""
+    locators = get_locator_registry()
+    # 1. Click on the main filter button to open the pop-up
+    filter_button = locators.wait(driver, 'filter_button', until='clickable', filter_id=filter_id)
+    filter_button.click()
+    logger.info(f"Opened '{filter_id}' filter pop-up.")
+    time.sleep(1)  # Wait for animation
+
+    # 2. Find the filter pop-up that is now visible
+    filter_popup = locators.wait(driver, 'filter_popup', until='visible')
+
+    # 3. Click "Réinitialiser" INSIDE the pop-up (if it exists)
+    reset_button = locators.probe(driver, 'filter_reset', until='clickable', context=filter_popup)
+    if reset_button is None:
+        logger.info(f"No 'Réinitialiser' button for '{filter_id}'.")
+    else:
+        reset_button.click()
+        logger.info(f"Reset '{filter_id}' filters.")
+        time.sleep(0.5)  # Wait for reset to apply
+
+        # After reset, the pop-up closes, so we need to click the filter button again
+        filter_button = locators.wait(driver, 'filter_button', until='clickable', filter_id=filter_id)
+        filter_button.click()
+        logger.info(f"Reopened '{filter_id}' filter pop-up after reset.")
+        time.sleep(1)  # Wait for animation
+
+        # Re-find the pop-up to avoid stale element reference after reset
+        filter_popup = locators.wait(driver, 'filter_popup', until='visible')
+        logger.info("Refreshed filter pop-up context after reset.")
+
+    # 4. Select the desired options INSIDE the pop-up
+    for value in option_values:
+        try:
+            # Debug: List all available radio buttons for publication date filter
+            if filter_id == "freshness":
+                all_radio_buttons = locators.find_all(filter_popup, 'filter_radios')
+                logger.info(f"Available radio button values in '{filter_id}' filter:")
+                for radio in all_radio_buttons:
+                    radio_value = radio.get_attribute('value')
+                    radio_id = radio.get_attribute('id')
+                    logger.info(f"  - value: '{radio_value}', id: '{radio_id}'")
+            
+            # Find the input element (checkbox or radio) by its name and value
+            input_element = locators.find(filter_popup, 'filter_option', option_type=option_type, value=value)
+            if not input_element.is_selected():
+                # Use JS click for reliability
+                driver.execute_script("arguments[0].click();", input_element)
+                logger.info(f"Selected '{value}' in '{filter_id}' filter.")
+        except Exception as e:
+            logger.warning(f"Option '{value}' for '{filter_id}' not found or clickable: {e}")
+    
+    # 5. Click the "Appliquer" button INSIDE the pop-up
+    apply_button = locators.find(filter_popup, 'filter_apply')
+    with get_rate_limiter().throttle('page_load') as operation:
+        apply_button.click()
+        operation.sleep(2)
+        if is_error_page(driver):
+            raise SiteError(f"Error page after applying '{filter_id}' filter")
+    logger.info(f"Applied '{filter_id}' filter.")
+
+
 def _apply_filter(driver, logger, filter_id, option_type, option_values):
     """
     A generic function to apply a filter.
@@ -107,78 +238,18 @@ def _apply_filter(driver, logger, filter_id, option_type, option_values):
     :param option_values: A list of values to select.
     """
     try:
-        # 1. Click on the main filter button to open the pop-up
-        filter_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, filter_id))
-        )
-        filter_button.click()
-        logger.info(f"Opened '{filter_id}' filter pop-up.")
-        time.sleep(1)  # Wait for animation
-
-        # 2. Find the filter pop-up that is now visible
-        filter_popup = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'tippy-box') and @data-state='visible']"))
-        )
-
-        # 3. Click "Réinitialiser" INSIDE the pop-up (if it exists)
-        try:
-            reset_button = filter_popup.find_element(By.XPATH, ".//button[@type='reset' and contains(., 'Réinitialiser')]")
-            reset_button.click()
-            logger.info(f"Reset '{filter_id}' filters.")
-            time.sleep(0.5)  # Wait for reset to apply
-
-            # After reset, the pop-up closes, so we need to click the filter button again
-            filter_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.ID, filter_id))
-            )
-            filter_button.click()
-            logger.info(f"Reopened '{filter_id}' filter pop-up after reset.")
-            time.sleep(1)  # Wait for animation
-
-            # Re-find the pop-up to avoid stale element reference after reset
-            filter_popup = WebDriverWait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'tippy-box') and @data-state='visible']"))
-            )
-            logger.info("Refreshed filter pop-up context after reset.")
-
-        except Exception:
-            logger.warning(f"No 'Réinitialiser' button found for '{filter_id}'.")
-        
-        # 4. Select the desired options INSIDE the pop-up
-        for value in option_values:
-            try:
-                # Debug: List all available radio buttons for publication date filter
-                if filter_id == "freshness":
-                    all_radio_buttons = filter_popup.find_elements(By.XPATH, ".//input[@type='radio']")
-                    logger.info(f"Available radio button values in '{filter_id}' filter:")
-                    for radio in all_radio_buttons:
-                        radio_value = radio.get_attribute('value')
-                        radio_id = radio.get_attribute('id')
-                        logger.info(f"  - value: '{radio_value}', id: '{radio_id}'")
-                
-                # Find the input element (checkbox or radio) by its name and value
-                input_element = filter_popup.find_element(
-                    By.XPATH, f".//input[@type='{option_type}' and @value='{value}']"
-                )
-                if not input_element.is_selected():
-                    # Use JS click for reliability
-                    driver.execute_script("arguments[0].click();", input_element)
-                    logger.info(f"Selected '{value}' in '{filter_id}' filter.")
-            except Exception as e:
-                logger.warning(f"Option '{value}' for '{filter_id}' not found or clickable: {e}")
-        
-        # 5. Click the "Appliquer" button INSIDE the pop-up
-        apply_button = filter_popup.find_element(By.XPATH, ".//button[contains(., 'Appliquer')]")
-        apply_button.click()
-        logger.info(f"Applied '{filter_id}' filter.")
-        time.sleep(2)
+        _open_and_apply_filter(driver, logger, filter_id, option_type, option_values)
         return True
+    except SessionAbort:
+        raise
     except Exception as e:
         logger.error(f"Filter operation failed for '{filter_id}': {e}")
-        # Save the page source for debugging
-        with open(f"{filter_id}_filter_debug.html", "w", encoding="utf-8") as f:
-            f.write(driver.page_source)
-        logger.info(f"Saved current page to {filter_id}_filter_debug.html for inspection.")
+        # Keep the page source for debugging
+        try:
+            digest = get_snapshot_store().save_debug_page(f"{filter_id}_filter", driver.page_source, driver.current_url)
+            logger.info(f"Saved current page as debug snapshot {digest[:12]} for inspection.")
+        except Exception as dump_error:
+            logger.warning(f"Could not save debug page: {dump_error}")
         return False
 
 
@@ -210,33 +281,48 @@ def filter_publication_date(driver, timeframe, logger):
 def check_if_already_applied(driver):
     """Check if already applied to this job"""
     try:
-        return len(driver.find_elements(By.XPATH, "//h3[contains(text(), 'Vous avez postulé')]")) > 0
+        return get_locator_registry().exists(driver, 'already_applied')
     except:
         return False
 
 
-def submit_application(driver, message, logger):
-    """Submit application with custom message"""
+def submit_application(driver, message, logger, operation=None):
+    """
+    Submit application with custom message; returns its outcome.
+
+    With a rate limiter operation, the fixed UI waits and a confirmation
+    dialog that never shows up are left out of the measured latency.
+    """
+    locators = get_locator_registry()
+    pause = operation.sleep if operation is not None else time.sleep
     try:
-        textarea = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "job-application-message")))
+        textarea = locators.wait(driver, 'application_message')
         textarea.clear()
         textarea.send_keys(message)
-        submit = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Je postule')]")))
+        submit = locators.wait(driver, 'apply_button', until='clickable')
         driver.execute_script("arguments[0].click();", submit)
-        time.sleep(2)
+        pause(2)
         
+        # Confirmation dialog, only shown for some offers; rendered after the click
+        started = time.monotonic()
         try:
-            confirm = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Confirmer candidature')]")))
-            confirm.click()
-            time.sleep(2)
-        except:
-            pass
+            confirm = locators.wait(driver, 'confirm_button', until='clickable', timeout=5, optional=True)
+        except TimeoutException:
+            if operation is not None:
+                operation.exclude(time.monotonic() - started)
+            logger.success("Application submitted (no confirmation dialog)")
+            return outcomes.CONFIRM_MISSING
+        confirm.click()
+        pause(2)
         
         logger.success("Application submitted successfully")
-        return True
+        return outcomes.SUBMITTED
+    except TimeoutException:
+        logger.error("Application failed: the application form did not become ready in time")
+        return outcomes.SUBMIT_TIMEOUT
     except Exception as e:
-        logger.error(f"Application failed: {e}")
-        return False
+        logger.error(f"Application failed: {_error_detail(e)}")
+        return outcomes.SUBMIT_FAILED
 
 
 def ensure_list(val):
@@ -247,15 +333,132 @@ def ensure_list(val):
     return [val]
 
 
-def check_job_content(driver, excluded_keywords, logger, search_term, search_config, stats_counters=None, counters=None):
-    """Check job content and apply if suitable"""
+@retryable('content', before_retry=_refresh_page)
+def _load_job_content(driver, logger):
+    """Wait for the job description and return its text"""
+    limiter = get_rate_limiter()
+    started = time.monotonic()
+    try:
+        content = get_locator_registry().wait(driver, 'job_content')
+    except TimeoutException:
+        limiter.record('job_open', time.monotonic() - started, error=True)
+        if is_error_page(driver):
+            raise SiteError("Error page while loading job content")
+        raise
+    limiter.record('job_open', time.monotonic() - started)
+    return content.text
+
+
+def _card_company(locators, link):
+    """Company shown on the listing card of a link, None if the card does not show one"""
+    try:
+        element = locators.find(link, 'listing_company')
+    except Exception:
+        return None
+    return (element.text or element.get_attribute('alt') or '').strip() or None
+
+
+@retryable('listing')
+def _scrape_listing_cards(driver, logger, with_company=False):
+    """Return (url, title, company) of the jobs listed on the current results page"""
+    locators = get_locator_registry()
+    links = locators.find_all(driver, 'listing_links')
+    return [
+        (link.get_attribute("href"), link.text, _card_company(locators, link) if with_company else None)
+        for link in links
+    ]
+
+
+def _error_detail(error):
+    """First line of an error message (WebDriver messages carry a stack trace)"""
+    text = getattr(error, 'msg', None) or str(error) or type(error).__name__
+    return text.strip().splitlines()[0][:200]
+
+
+def _record_outcome(stats_counters, outcome):
+    """Count what happened to a job against its search term"""
+    if stats_counters is not None:
+        stats_counters['outcomes'][outcome] += 1
+
+
+def _job_record(job_title, company, search_term, search_config, outcome, detail=None):
+    """Application entry for a job page, its status and reason derived from the outcome"""
+    return {
+        'job_title': job_title,
+        'company': company,
+        'status': outcomes.OUTCOME_STATUS[outcome],
+        'reason': outcomes.format_reason(outcome, detail),
+        'timestamp': datetime.now().isoformat(),
+        'search_term': search_term,
+        'contract_type': ensure_list(search_config.get('contract_types', [])),
+        'remote_type': ensure_list(search_config.get('remote_types', []))
+    }
+
+
+def _skip_company(logger, rule, search_term, search_config, url, job_title, company, stats_counters, counters, decision_log, control):
+    """Count and report a job skipped by a company rule; returns its application entry"""
+    logger.info(f"Skipping job at '{company}' ({rule})")
+    _record_outcome(stats_counters, outcomes.EXCLUDED_COMPANY)
+    if stats_counters is not None:
+        stats_counters['skipped_company'] += 1
+    if counters is not None:
+        counters['jobs_company_skipped'] += 1
+    if decision_log is not None:
+        decision_log.record(search_term, url, job_title, company, EXCLUDED, f"company {rule}")
+    if control is not None:
+        control.emit('job', term=search_term, outcome='company_skipped')
+    return _job_record(job_title, company, search_term, search_config, outcomes.EXCLUDED_COMPANY, rule)
+
+
+def _extract_job_header(driver):
+    """Return the job title and company of the open job page"""
+    locators = get_locator_registry()
+    try:
+        job_title = locators.find(driver, 'job_title').text
+        company = locators.find(driver, 'job_company').text
+    except:
+        job_title = "Unknown"
+        company = "Unknown"
+    return job_title, company
+
+
+def _archive_job(logger, content, url, job_title, company, search_term, decision, reason=None):
+    """Keep the job description and the decision taken on it for later audits and searches"""
+    try:
+        digest = get_snapshot_store().save_job(content, url, job_title, company, search_term, decision, reason,
+                                               user=logger.user_email)
+        get_offer_index().add(logger.user_email, digest, content, url, job_title, company, search_term,
+                              decision, reason)
+    except Exception as e:
+        logger.warning(f"Could not archive job snapshot: {e}")
+
+
+def check_job_content(driver, excluded_keywords, logger, search_term, search_config, stats_counters=None, counters=None, decision_log=None, control=None, work=None, company_rules=None, templates=None):
+    """
+    Check job content and apply if suitable.
+
+    When decision_log is given the jobs are only classified: every decision
+    is written to the log and nothing is submitted. When control (a
+    SessionControl) is given, each job is a pause/stop checkpoint and its
+    outcome is emitted as a 'job' event. A shared crawl (work_queue.QueueCrawl)
+    passed as work gates every submit on its cross-worker budget. Company
+    rules are checked again on the job page for cards that showed no company.
+    Messages are rendered per job from the session's compiled templates.
+    Every job gets an entry whose status and reason record its outcome.
+    """
+    if templates is None:
+        templates = MessageTemplates(search_config)
     main = driver.current_window_handle
     windows = driver.window_handles
     applications_data = []
+    limiter = get_rate_limiter()
     try:
         for window in windows[1:]:  # Skip main window
-            driver.switch_to.window(window)
+            if control is not None:
+                control.checkpoint()
             try:
+                driver.switch_to.window(window)
+                logger.set_context(job=driver.current_url)
                 # Track jobs_found
                 if counters is not None:
                     counters['jobs_found'] += 1
@@ -265,47 +468,86 @@ def check_job_content(driver, excluded_keywords, logger, search_term, search_con
                 # Check if already applied
                 if check_if_already_applied(driver):
                     logger.info("Already applied to this job - skipping")
+                    job_title, company = _extract_job_header(driver)
+                    _record_outcome(stats_counters, outcomes.ALREADY_APPLIED)
+                    applications_data.append(_job_record(job_title, company, search_term, search_config,
+                                                         outcomes.ALREADY_APPLIED))
                     if stats_counters is not None:
                         stats_counters['skipped_already_applied'] += 1
                     if counters is not None:
                         counters['jobs_already_applied'] += 1
+                    if decision_log is not None:
+                        decision_log.record(search_term, driver.current_url, job_title, company, ALREADY_APPLIED)
+                    if control is not None:
+                        control.emit('job', term=search_term, outcome='already_applied')
                     driver.close()
                     continue
                 # Get job content
-                content = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "prose-content"))
-                )
+                content = _load_job_content(driver, logger)
+                content_text = content.lower()
+                # Get job title and company for logging
+                job_title, company = _extract_job_header(driver)
+                job_url = driver.current_url
+                rule = company_rules.check(company) if company_rules and company != "Unknown" else None
+                if rule is not None:
+                    applications_data.append(_skip_company(
+                        logger, rule, search_term, search_config, job_url, job_title, company,
+                        stats_counters, counters, decision_log, control))
+                    driver.close()
+                    continue
                 # Check for excluded keywords
-                content_text = content.text.lower()
-                if any(keyword in content_text for keyword in excluded_keywords):
-                    logger.info(f"Job contains excluded keyword - skipping")
+                matched_keyword = next((keyword for keyword in excluded_keywords if keyword in content_text), None)
+                if matched_keyword is not None:
+                    logger.info(f"Job contains excluded keyword '{matched_keyword}' - skipping")
+                    _record_outcome(stats_counters, outcomes.EXCLUDED_KEYWORD)
+                    applications_data.append(_job_record(job_title, company, search_term, search_config,
+                                                         outcomes.EXCLUDED_KEYWORD, matched_keyword))
                     if stats_counters is not None:
                         stats_counters['skipped_excluded_keyword'] += 1
                     if counters is not None:
                         counters['jobs_excluded'] += 1
+                    if decision_log is not None:
+                        decision_log.record(search_term, job_url, job_title, company, EXCLUDED, matched_keyword)
+                    _archive_job(logger, content, job_url, job_title, company, search_term, EXCLUDED, matched_keyword)
+                    if control is not None:
+                        control.emit('job', term=search_term, outcome='excluded')
                     driver.close()
                     continue
-                # Get job title and company for logging
-                try:
-                    job_title = driver.find_element(By.XPATH, "//h1").text
-                    company = driver.find_element(By.XPATH, "//span[contains(@class, 'company')]").text
-                except:
-                    job_title = "Unknown"
-                    company = "Unknown"
-                # Submit application
-                success = submit_application(driver, search_config['application_message'], logger)
+                if decision_log is not None:
+                    # Dry run: record the decision instead of submitting
+                    decision_log.record(search_term, job_url, job_title, company, WOULD_APPLY)
+                    _archive_job(logger, content, job_url, job_title, company, search_term, WOULD_APPLY)
+                    _record_outcome(stats_counters, outcomes.WOULD_APPLY)
+                    applications_data.append(_job_record(job_title, company, search_term, search_config,
+                                                         outcomes.WOULD_APPLY))
+                    if control is not None:
+                        control.emit('job', term=search_term, outcome=WOULD_APPLY, job_title=job_title)
+                    driver.close()
+                    continue
+                if work is not None and not work.take_application():
+                    logger.info("Shared application budget exhausted - skipping")
+                    _record_outcome(stats_counters, outcomes.BUDGET_EXHAUSTED)
+                    applications_data.append(_job_record(job_title, company, search_term, search_config,
+                                                         outcomes.BUDGET_EXHAUSTED, f"crawl {work.crawl}"))
+                    driver.close()
+                    continue
+                # Submit application, paced by the account's application bucket
+                template, message = templates.render(search_term, job_title, company, content)
+                with limiter.throttle('application') as operation:
+                    outcome = submit_application(driver, message, logger, operation)
+                    status = outcomes.OUTCOME_STATUS[outcome]
+                    success = status == 'submitted'
+                    if not success:
+                        operation.mark_error()
+                templates.record(template, success)
+                if work is not None and not success:
+                    work.application_failed()
                 # Log application attempt
-                logger.application_log(job_title, company, "success" if success else "failed", search_term)
+                logger.application_log(job_title, company, status, search_term)
+                _archive_job(logger, content, job_url, job_title, company, search_term, status, outcome)
                 # Add application data for statistics
-                applications_data.append({
-                    'job_title': job_title,
-                    'company': company,
-                    'status': "success" if success else "failed",
-                    'timestamp': datetime.now().isoformat(),
-                    'search_term': search_term,
-                    'contract_type': ensure_list(search_config.get('contract_types', [])),
-                    'remote_type': ensure_list(search_config.get('remote_types', []))
-                })
+                _record_outcome(stats_counters, outcome)
+                applications_data.append(_job_record(job_title, company, search_term, search_config, outcome))
                 if stats_counters is not None:
                     stats_counters['total_attempted_applications'] += 1
                     if success:
@@ -317,63 +559,126 @@ def check_job_content(driver, excluded_keywords, logger, search_term, search_con
                         counters['jobs_submitted'] += 1
                     else:
                         counters['jobs_failed'] += 1
+                if control is not None:
+                    control.emit('job', term=search_term, outcome='submitted' if success else 'failed', job_title=job_title)
                 driver.close()
+            except SessionAbort:
+                raise
+            except NoSuchWindowException:
+                # Closed by the site or the user: skip the job, keep the session
+                logger.warning("Job tab was closed before it was processed - skipping")
+                _record_outcome(stats_counters, outcomes.WINDOW_CLOSED)
+                driver.switch_to.window(main)
             except Exception as e:
                 logger.error(f"Error processing job: {e}")
+                if isinstance(e, TimeoutException):
+                    outcome = outcomes.LOAD_TIMEOUT
+                elif isinstance(e, WebDriverException):
+                    outcome = outcomes.DRIVER_ERROR
+                else:
+                    outcome = outcomes.FAILED
+                _record_outcome(stats_counters, outcome)
+                applications_data.append(_job_record("Unknown", "Unknown", search_term, search_config,
+                                                     outcome, _error_detail(e)))
                 if stats_counters is not None:
                     stats_counters['failed_other'] += 1
                 if counters is not None:
                     counters['jobs_failed'] += 1
+                if decision_log is not None:
+                    decision_log.record(search_term, driver.current_url, "Unknown", "Unknown", ERROR, str(e))
+                if control is not None:
+                    control.emit('job', term=search_term, outcome='failed')
                 driver.close()
         driver.switch_to.window(main)
+        logger.set_context(job=None)
         return applications_data
+    except SessionAbort:
+        raise
     except Exception as e:
         logger.error(f"Error checking job content: {e}")
         return applications_data
 
 
-def open_search_results_with_pagination(driver, max_applications, excluded_keywords, logger, search_term, search_config, stats_counters=None, counters=None):
-    """Open search results with pagination and apply to jobs"""
+def open_search_results_with_pagination(driver, max_applications, excluded_keywords, logger, search_term, search_config, stats_counters=None, counters=None, decision_log=None, control=None, work=None, company_rules=None, templates=None):
+    """
+    Open search results with pagination and apply to jobs.
+
+    Offers another worker claimed are skipped, and so are cards whose
+    company is excluded by company_rules, before any tab is opened. Offers
+    listed again (on a later page or twice on one) are only opened once.
+    Only submit attempts count toward max_applications.
+    """
     applications_count = 0
     applications_data = []
+    opened = set()
+    limiter = get_rate_limiter()
     try:
         while True and applications_count < max_applications:
-            links = driver.find_elements(By.XPATH, "//h2[contains(@class, 'font-semibold')]//a[contains(@href, '/fr/tech-it/')]")
+            if control is not None:
+                control.checkpoint()
+            cards = _scrape_listing_cards(driver, logger, with_company=bool(company_rules))
+            urls = []
+            for url, job_title, company in cards:
+                if url in opened:
+                    _record_outcome(stats_counters, outcomes.SKIPPED_DUPLICATE)
+                    continue
+                opened.add(url)
+                rule = company_rules.check(company) if company_rules else None
+                if rule is None:
+                    urls.append(url)
+                else:
+                    applications_data.append(_skip_company(
+                        logger, rule, search_term, search_config, url, job_title, company,
+                        stats_counters, counters, decision_log, control))
             # Calculate how many links to process on this page
-            remaining_applications = max_applications - applications_count
-            links_to_process = min(len(links), remaining_applications, 16)  # Max 16 per page
-            for i, link in enumerate(links[:links_to_process]):
-                if applications_count >= max_applications:
+            links_to_process = min(max_applications - applications_count, 16)  # Max 16 per page
+            links_opened = 0
+            for url in urls:
+                if links_opened >= links_to_process:
                     break
-                url = link.get_attribute("href")
+                # Claimed only when opened, so offers past the cut stay free for other workers
+                if work is not None and not work.claim_job(url):
+                    _record_outcome(stats_counters, outcomes.SKIPPED_SEEN)
+                    continue
+                limiter.acquire('job_open')
                 driver.execute_script(f"window.open('{url}', '_blank');")
-                time.sleep(1)
+                links_opened += 1
             # Process applications and collect data
-            page_applications = check_job_content(driver, excluded_keywords, logger, search_term, search_config, stats_counters, counters)
+            page_applications = check_job_content(driver, excluded_keywords, logger, search_term, search_config, stats_counters, counters, decision_log, control, work, company_rules, templates)
             if page_applications:
                 applications_data.extend(page_applications)
-                applications_count += len(page_applications)
+                applications_count += sum(1 for application in page_applications if outcomes.is_attempt(application))
             # Check if we've reached the limit
             if applications_count >= max_applications:
                 logger.info(f"Reached maximum applications limit ({max_applications})")
                 break
             # Try to go to next page
-            try:
-                next_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Suivant')]")))
-                next_button.click()
-                time.sleep(3)
-            except TimeoutException:
+            next_button = get_locator_registry().probe(driver, 'next_page', until='clickable', timeout=5)
+            if next_button is None:
                 logger.info("No more pages to process")
                 break
+            with limiter.throttle('page_load') as operation:
+                next_button.click()
+                operation.sleep(3)
+                if is_error_page(driver):
+                    operation.mark_error()
         return applications_data
+    except SessionAbort:
+        raise
     except Exception as e:
         logger.error(f"Pagination failed: {e}")
         return applications_data
 
 
-def run_search_session(driver, search_term, search_config, logger, config_manager, stats_counters=None, counters=None):
-    """Run a complete search session for one search term"""
+def run_search_session(driver, search_term, search_config, logger, config_manager, stats_counters=None, counters=None, decision_log=None, control=None, work=None, company_rules=None, templates=None, max_applications=None):
+    """
+    Run a complete search session for one search term.
+
+    Passing a DecisionLog turns the session into a dry run: search, filters,
+    pagination and classification run as usual but nothing is submitted.
+    max_applications is the term's share of the session budget (by default
+    search_config['max_applications_per_session']).
+    """
     logger.info(f"Starting search session for: {search_term}")
     # Perform search
     if not perform_search(driver, search_term, logger):
@@ -392,23 +697,60 @@ def run_search_session(driver, search_term, search_config, logger, config_manage
     # Process results and collect statistics
     session_applications = open_search_results_with_pagination(
         driver, 
-        search_config['max_applications_per_session'],
+        search_config['max_applications_per_session'] if max_applications is None else max_applications,
         search_config['excluded_keywords'],
         logger,
         search_term,
         search_config,
         stats_counters,
-        counters
+        counters,
+        decision_log,
+        control,
+        work,
+        company_rules,
+        templates
     )
     return True, session_applications
 
 
-def main(email=None, password=None, search_config=None, config_manager=None, logger=None):
-    """Main function with enhanced parameters"""
+def _load_term_yields(config_manager, email, logger):
+    """Decayed per-term counters of past sessions ({} if the history is unavailable)"""
+    try:
+        from history import get_history_store
+        store = get_history_store()
+        store.sync_statistics(config_manager)
+        return store.term_yields(email)
+    except Exception as e:
+        logger.warning(f"Could not load search term yields, splitting the budget evenly: {e}")
+        return {}
+
+
+SESSION_COMPLETED = 'completed'
+SESSION_NO_CREDENTIALS = 'no_credentials'
+SESSION_LOGIN_FAILED = 'login_failed'
+SESSION_ABORTED = 'aborted'
+SESSION_STOPPED = 'stopped'
+SESSION_ERROR = 'error'
+
+
+def main(email=None, password=None, search_config=None, config_manager=None, logger=None, headless=False,
+         dry_run=False, decisions_file=None, control=None, account=None, profile=None, work=None):
+    """
+    Main function with enhanced parameters; returns one of the SESSION_* outcomes.
+
+    With dry_run=True offers are crawled and classified but never submitted;
+    the would-apply decisions go to decisions_file (a JSON lines file under
+    ~/.freework_app/dry_runs by default) and statistics are left untouched.
+    A SessionControl passed as control can pause or stop the session and
+    receives progress events. account names the session in the logs and
+    profile is the Firefox profile directory to run in (see accounts.py).
+    With a shared crawl (work_queue.QueueCrawl) as work, search terms are
+    claimed from the work queue instead of search_config['search_terms'].
+    """
     # Initialize components if not provided
     if config_manager is None:
-        from config import SecureConfig
-        config_manager = SecureConfig()
+        from config import get_secure_config
+        config_manager = get_secure_config()
     if logger is None:
         from logger import SecureLogger
         logger = SecureLogger(email)
@@ -416,11 +758,12 @@ def main(email=None, password=None, search_config=None, config_manager=None, log
         email, password = config_manager.load_credentials()
         if not email or not password:
             logger.error("No credentials found. Please run the interface first.")
-            return
+            return SESSION_NO_CREDENTIALS
     if search_config is None:
         search_config = config_manager.load_search_config()
     # Initialize statistics
     all_applications = []
+    session_outcomes = {}
     session_stats = {
         'total_applications': 0,
         'successful_applications': 0,
@@ -429,51 +772,106 @@ def main(email=None, password=None, search_config=None, config_manager=None, log
         'last_session': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'per_search_term': []
     }
+    # Pace every navigation and submit through the shared rate limiter (submits per account)
+    get_rate_limiter().configure(search_config, account)
+    # Compiled once per session; skips are counted per rule
+    company_rules = CompanyRules.from_config(search_config)
+    try:
+        templates = MessageTemplates(search_config)
+    except TemplateError as e:
+        logger.error(f"Invalid application message: {e}")
+        return SESSION_ERROR
+    # Opened after the early returns above, so the finally block below always closes it
+    decision_log = None
+    if dry_run:
+        decision_log = DecisionLog(decisions_file or default_decisions_path(), search_config)
+        logger.info(f"Dry run: decisions will be written to {decision_log.path}")
+    session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    logger.set_context(session=session_id, account=account, term=None, job=None)
     # Log session start
     logger.session_start(search_config)
+    outcome = SESSION_COMPLETED
+    # Released in the finally block once the browser is gone
+    browser_slots = get_browser_slots()
+    browser_slots.acquire(logger)
     try:
-        driver = initialize_browser()
+        driver = initialize_browser(headless=headless, profile=profile)
         # Login
         if not check_and_click_login(driver, logger):
             logger.error("Could not find or click the login button. Stopping application.")
             driver.quit()
-            return
+            return SESSION_LOGIN_FAILED
         if not perform_login(driver, email, password, logger):
             logger.error("Login failed. Please check your credentials. Stopping application.")
             driver.quit()
-            return
+            return SESSION_LOGIN_FAILED
         # Per-search-term stats
         per_search_term_stats = []
-        # Process each search term
-        for search_term in search_config['search_terms']:
-            logger.info(f"Processing search term: {search_term}")
+        # Process each search term: highest-yield terms first, each with its
+        # share of the session budget (a shared crawl has its own budget)
+        budget = None
+        if work is None:
+            budget = plan_budget(search_config, _load_term_yields(config_manager, email, logger))
+            logger.info("Budget plan: " + ', '.join(
+                f"{term} ({info['score']:.2f})" for term, info in budget.summary().items())
+                + f" - {budget.total} applications")
+        if control is not None:
+            control.emit('session_started', terms=len(search_config['search_terms']) if work is None else None)
+        for search_term in (budget if work is None else work):
+            logger.set_context(term=search_term, job=None)
+            max_applications = None
+            if budget is not None:
+                max_applications = budget.start(search_term)
+                if max_applications <= 0:
+                    logger.info(f"Session budget spent - skipping search term: {search_term}")
+                    continue
+            logger.info(f"Processing search term: {search_term}" + (
+                f" (budget {max_applications})" if max_applications is not None else ''))
             # Per-term counters
             counters = {
                 'jobs_found': 0,
                 'jobs_submitted': 0,
                 'jobs_already_applied': 0,
                 'jobs_excluded': 0,
+                'jobs_company_skipped': 0,
                 'jobs_failed': 0
             }
             # Navigate back to main page for each search
-            driver.get("https://www.free-work.com/fr/tech-it")
-            time.sleep(2)
+            navigate(driver, HOME_URL)
             # Custom stats_counters for this term
             stats_counters = {
                 'skipped_excluded_keyword': 0,
                 'skipped_already_applied': 0,
+                'skipped_company': 0,
                 'failed_other': 0,
                 'total_jobs_seen': 0,
                 'total_attempted_applications': 0,
-                'successful_applications': 0
+                'successful_applications': 0,
+                'outcomes': Counter()
             }
             # Run search session
-            success, session_applications = run_search_session(driver, search_term, search_config, logger, config_manager, stats_counters, counters)
+            if control is not None:
+                control.emit('term_started', term=search_term)
+            try:
+                if control is not None:
+                    control.checkpoint()
+                success, session_applications = run_search_session(driver, search_term, search_config, logger, config_manager, stats_counters, counters, decision_log, control, work, company_rules, templates, max_applications)
+            except SessionStopped:
+                logger.info(f"Session stopped at search term '{search_term}'")
+                outcome = SESSION_STOPPED
+                break
+            except SessionAbort as e:
+                logger.error(f"Stopping session at search term '{search_term}': {e}")
+                outcome = SESSION_ABORTED
+                break
+            if budget is not None:
+                budget.finish(search_term, sum(1 for application in session_applications if outcomes.is_attempt(application)))
             if success:
                 all_applications.extend(session_applications)
                 counters['jobs_submitted'] = stats_counters['successful_applications']
                 counters['jobs_already_applied'] = stats_counters['skipped_already_applied']
                 counters['jobs_excluded'] = stats_counters['skipped_excluded_keyword']
+                counters['jobs_company_skipped'] = stats_counters['skipped_company']
                 counters['jobs_failed'] = stats_counters['failed_other']
                 logger.success(f"Completed search session for: {search_term}")
             else:
@@ -484,42 +882,81 @@ def main(email=None, password=None, search_config=None, config_manager=None, log
             print(f"CV envoyés : {counters['jobs_submitted']}")
             print(f"Déjà postulé : {counters['jobs_already_applied']}")
             print(f"Exclu (mot-clé) : {counters['jobs_excluded']}")
+            print(f"Exclu (entreprise) : {counters['jobs_company_skipped']}")
             print(f"Échec : {counters['jobs_failed']}")
             per_search_term_stats.append({
                 'search_term': search_term,
-                **counters
+                **counters,
+                'outcomes': dict(stats_counters['outcomes'])
             })
-            # Add random delay between search terms
-            time.sleep(random.uniform(3, 7))
+            outcomes.merge_outcomes(session_outcomes, stats_counters['outcomes'])
+            if control is not None:
+                control.emit('term_finished', term=search_term, **counters)
+            if work is not None:
+                if success:
+                    work.task_done(search_term, counters)
+                else:
+                    work.task_failed(search_term, "search or filters failed")
+        if decision_log is not None:
+            summary = ', '.join(f"{decision}: {count}" for decision, count in sorted(decision_log.counts.items()))
+            logger.success(f"Dry run completed ({summary or 'no jobs found'}) - decisions saved to {decision_log.path}")
+            return outcome
         # Calculate final statistics
-        session_stats['total_applications'] = len(all_applications)
+        session_stats['total_applications'] = sum(1 for application in all_applications if outcomes.is_attempt(application))
         session_stats['successful_applications'] = sum(t['jobs_submitted'] for t in per_search_term_stats)
         session_stats['failed_applications'] = sum(t['jobs_failed'] for t in per_search_term_stats)
         session_stats['per_search_term'] = per_search_term_stats
         # Create session record
         session_record = {
-            'session_id': f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'session_id': session_id,
             'date': datetime.now().isoformat(),
             'applications': all_applications,
             'total': session_stats['total_applications'],
             'successful': session_stats['successful_applications'],
             'failed': session_stats['failed_applications'],
             'success_rate': (session_stats['successful_applications'] / session_stats['total_applications'] * 100) if session_stats['total_applications'] > 0 else 0.0,
-            'per_search_term': per_search_term_stats
+            'per_search_term': per_search_term_stats,
+            'outcomes': session_outcomes
         }
+        if company_rules:
+            session_record['company_rule_skips'] = dict(company_rules.skips)
+        session_record['template_stats'] = templates.stats()
+        if budget is not None:
+            session_record['budget'] = budget.summary()
         session_stats['sessions'] = [session_record]
         # Save statistics
         config_manager.save_statistics(email, session_stats)
+        try:
+            from history import get_history_store
+            get_history_store().record_session(email, session_record)
+        except Exception as e:
+            logger.warning(f"Could not index session history: {e}")
         # Log session end
         logger.session_end(session_stats)
+        if session_outcomes:
+            logger.info("Outcomes: " + ', '.join(
+                f"{name} {count}" for name, count in sorted(session_outcomes.items(), key=lambda item: -item[1])))
+        missed = {name: stats for name, stats in get_locator_registry().stats().items() if stats['misses']}
+        if missed:
+            logger.info("Locator misses: " + ', '.join(
+                f"{name} {stats['misses']}/{stats['hits'] + stats['misses']}" for name, stats in sorted(missed.items())))
+        adapted = {target: info for target, info in get_adaptive_timeouts().snapshot().items() if info['timeout']}
+        if adapted:
+            logger.info("Adaptive timeouts: " + ', '.join(
+                f"{target} {info['timeout']:.1f}s (p99 {info['p99']:.2f}s)" for target, info in sorted(adapted.items())))
         logger.success("All search sessions completed successfully!")
     except Exception as e:
         logger.error(f"Main execution failed: {e}")
+        outcome = SESSION_ERROR
     finally:
         try:
             driver.quit()
         except:
             pass
+        browser_slots.release()
+        if decision_log is not None:
+            decision_log.close()
+    return outcome
 
 
 if __name__ == "__main__":
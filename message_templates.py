@@ -0,0 +1,151 @@
+import re
+import threading
+from string import Formatter
+
+# Placeholders a template may use, filled from the job being applied to
+PLACEHOLDERS = ('title', 'company', 'term', 'skills')
+DEFAULT_TEMPLATE = 'default'
+
+
+class TemplateError(ValueError):
+    """A message template is malformed"""
+
+
+def compile_template(text):
+    """
+    Split a template into (literal, placeholder) pieces once.
+
+    Placeholders are written {title}, {company}, {term} and {skills};
+    literal braces are doubled ({{ and }}).
+    """
+    if not isinstance(text, str):
+        raise TemplateError("Message template must be a string")
+    pieces = []
+    try:
+        for literal, field, format_spec, conversion in Formatter().parse(text):
+            if field is not None and (field not in PLACEHOLDERS or format_spec or conversion):
+                raise TemplateError(
+                    f"Unknown placeholder {{{field}}} in message template. Allowed: "
+                    + ', '.join(f'{{{name}}}' for name in PLACEHOLDERS)
+                )
+            pieces.append((literal, field))
+    except ValueError as e:
+        if isinstance(e, TemplateError):
+            raise
+        raise TemplateError(f"Invalid message template: {e}")
+    return tuple(pieces)
+
+
+class MessageTemplate:
+    """A compiled template and its success counts"""
+
+    def __init__(self, name, text, terms=None):
+        self.name = name
+        self.pieces = compile_template(text)
+        if isinstance(terms, str):
+            terms = [terms]
+        self.terms = frozenset(term.lower() for term in terms or ())
+        self.used = 0
+        self.submitted = 0
+        self.failed = 0
+
+    def render(self, values):
+        return ''.join(literal + (values[field] if field else '') for literal, field in self.pieces)
+
+
+class MessageTemplates:
+    """
+    The application messages of a session, compiled once.
+
+    search_config['message_templates'] is an optional list of
+    {'name', 'template', 'terms'}; the first template whose terms include
+    the search term (or that has no terms) is used, and
+    search_config['application_message'] is the fallback. {skills} lists
+    the configured skills (search_config['skills'], else the search terms)
+    found in the job description, or the search term if none is.
+    """
+
+    def __init__(self, search_config):
+        self.templates = []
+        for index, entry in enumerate(search_config.get('message_templates') or []):
+            name = entry.get('name') or f"template_{index + 1}"
+            try:
+                self.templates.append(MessageTemplate(name, entry.get('template'), entry.get('terms')))
+            except TemplateError as e:
+                raise TemplateError(f"Template '{name}': {e}")
+        self.default = MessageTemplate(DEFAULT_TEMPLATE, search_config.get('application_message', ''))
+        skills = search_config.get('skills') or search_config.get('search_terms') or []
+        # Longest first, so 'java ee' wins over 'java'
+        skills = sorted({skill.strip() for skill in skills if skill.strip()}, key=len, reverse=True)
+        self._skills = {skill.lower(): skill for skill in skills}
+        self._skill_pattern = re.compile(
+            r'(?<!\w)(' + '|'.join(re.escape(skill) for skill in skills) + r')(?!\w)', re.IGNORECASE
+        ) if skills else None
+        self._lock = threading.Lock()
+
+    def select(self, search_term):
+        term = (search_term or '').lower()
+        for template in self.templates:
+            if not template.terms or term in template.terms:
+                return template
+        return self.default
+
+    def matched_skills(self, content):
+        """Configured skills mentioned in a job description, in order of first mention"""
+        if self._skill_pattern is None or not content:
+            return []
+        found = {}
+        for match in self._skill_pattern.finditer(content):
+            found.setdefault(match.group(1).lower(), None)
+        return [self._skills[skill] for skill in found]
+
+    def render(self, search_term, job_title, company, content):
+        """(template, message) for one job"""
+        template = self.select(search_term)
+        skills = self.matched_skills(content)
+        message = template.render({
+            'title': job_title or '',
+            'company': company or '',
+            'term': search_term or '',
+            'skills': ', '.join(skills) if skills else (search_term or ''),
+        })
+        with self._lock:
+            template.used += 1
+        return template, message
+
+    def record(self, template, success):
+        with self._lock:
+            if success:
+                template.submitted += 1
+            else:
+                template.failed += 1
+
+    def stats(self):
+        """{name: {'used', 'submitted', 'failed', 'success_rate'}} of the templates used"""
+        with self._lock:
+            return {
+                template.name: {
+                    'used': template.used,
+                    'submitted': template.submitted,
+                    'failed': template.failed,
+                    'success_rate': template.submitted / template.used * 100 if template.used else 0.0,
+                }
+                for template in self.templates + [self.default]
+                if template.used
+            }
+
+
+def validate_message_templates(search_config):
+    """Problems found in the application message and the message templates"""
+    templates = search_config.get('message_templates')
+    if templates is not None and (not isinstance(templates, list)
+                                  or not all(isinstance(entry, dict) for entry in templates)):
+        return ["'message_templates' must be a list of {'name', 'template', 'terms'} mappings"]
+    skills = search_config.get('skills')
+    if skills is not None and (not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills)):
+        return ["'skills' must be a list of strings"]
+    try:
+        MessageTemplates(search_config)
+    except TemplateError as e:
+        return [str(e)]
+    return []
@@ -0,0 +1,204 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+# bm25 weights of the title, company and body columns
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+SNIPPET_WIDTH = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    company TEXT,
+    search_term TEXT,
+    decision TEXT,
+    reason TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (user, digest)
+);
+CREATE INDEX IF NOT EXISTS idx_offers_last_seen ON offers (user, last_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+    title, company, body, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+_QUERY_TOKEN = re.compile(r'(\w+)(\*?)')
+
+
+def _fold(text):
+    """Lowercase, accent-free copy of text with the same length (one character per character)"""
+    return ''.join(unicodedata.normalize('NFD', char)[0].lower()[0] for char in text)
+
+
+def parse_query(text):
+    """
+    Turn free text into an FTS5 query and the folded terms to highlight.
+
+    Every word must match (AND); a trailing * makes it a prefix. Anything
+    else is ignored, so user input can never be an FTS5 syntax error.
+    """
+    tokens = _QUERY_TOKEN.findall(text or '')
+    if not tokens:
+        raise ValueError("Search query needs at least one word")
+    match = ' '.join(f'"{word}"{star}' for word, star in tokens)
+    return match, [(_fold(word), bool(star)) for word, star in tokens]
+
+
+def make_snippet(text, terms, width=SNIPPET_WIDTH, mark=('<mark>', '</mark>')):
+    """Excerpt of text around the first matching term, with every match in it marked"""
+    folded = _fold(text)
+    pattern = re.compile('|'.join(
+        r'\b' + re.escape(term) + (r'\w*' if prefix else r'\b') for term, prefix in terms
+    ))
+    first = pattern.search(folded)
+    start = max(0, (first.start() if first else 0) - width // 4)
+    end = min(len(text), start + width)
+    parts = ['…' if start > 0 else '']
+    position = start
+    for found in pattern.finditer(folded, start, end):
+        parts.append(text[position:found.start()])
+        parts.append(mark[0] + text[found.start():found.end()] + mark[1])
+        position = found.end()
+    parts.append(text[position:end])
+    parts.append('…' if end < len(text) else '')
+    return ' '.join(''.join(parts).split())
+
+
+class OfferIndex:
+    """
+    Full-text index over archived offers in ~/.freework_app/search.db.
+
+    One entry per account and job snapshot (reposts share it), updated as
+    check_job_content archives offers. The FTS5 table is contentless, so the
+    index holds only postings; snippets of the top results are cut from the
+    compressed texts in the snapshot store.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or Path.home() / ".freework_app" / "search.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _upsert(self, user, digest, text, fields):
+        """Insert or refresh one offer; the text is only indexed the first time"""
+        row = self._conn.execute(
+            "SELECT id FROM offers WHERE user = ? AND digest = ?", (user, digest)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute(
+                "UPDATE offers SET url = ?, title = ?, company = ?, search_term = ?, decision = ?, reason = ?, "
+                "last_seen = ? WHERE id = ?",
+                (fields['url'], fields['title'], fields['company'], fields['search_term'],
+                 fields['decision'], fields['reason'], fields['seen_at'], row['id'])
+            )
+            return
+        offer_id = self._conn.execute(
+            "INSERT INTO offers (user, digest, url, title, company, search_term, decision, reason, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user, digest, fields['url'], fields['title'], fields['company'], fields['search_term'],
+             fields['decision'], fields['reason'], fields['seen_at'], fields['seen_at'])
+        ).lastrowid
+        self._conn.execute(
+            "INSERT INTO offers_fts (rowid, title, company, body) VALUES (?, ?, ?, ?)",
+            (offer_id, fields['title'] or '', fields['company'] or '', text)
+        )
+
+    def add(self, user, digest, text, url=None, title=None, company=None, search_term=None,
+            decision=None, reason=None, seen_at=None):
+        """Index an offer sighting (the latest decision and metadata win)"""
+        fields = {
+            'url': url, 'title': title, 'company': company, 'search_term': search_term,
+            'decision': decision, 'reason': reason,
+            'seen_at': seen_at or datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock, self._conn:
+            self._upsert(user or '', digest, text, fields)
+
+    def rebuild(self, snapshot_store):
+        """Re-index every job sighting of the snapshot store; returns the number of offers"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM offers")
+            self._conn.execute("INSERT INTO offers_fts (offers_fts) VALUES ('delete-all')")
+            indexed = {}
+            for sighting in snapshot_store.iter_sightings():
+                key = (sighting['user'] or '', sighting['digest'])
+                if key not in indexed:
+                    indexed[key] = snapshot_store.load(sighting['digest'])
+                self._upsert(key[0], key[1], indexed[key], sighting)
+                # Texts are only needed for the first sighting of each offer
+                indexed[key] = ''
+            return len(indexed)
+
+    def search(self, user, query, decision=None, search_term=None, date_from=None, date_to=None,
+               limit=20, snapshot_store=None, mark=('<mark>', '</mark>')):
+        """
+        Best-ranked offers matching every word of query, newest first on ties.
+
+        date_from/date_to bound the last time an offer was seen (ISO strings,
+        to exclusive). With a snapshot store each result gets a snippet.
+        """
+        match, terms = parse_query(query)
+        conditions = ["offers_fts MATCH ?", "o.user = ?"]
+        params = [match, user or '']
+        for column, value in (('decision', decision), ('search_term', search_term)):
+            if value:
+                conditions.append(f"o.{column} = ?")
+                params.append(value)
+        if date_from:
+            conditions.append("o.last_seen >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("o.last_seen < ?")
+            params.append(date_to)
+        sql = (
+            f"SELECT o.*, bm25(offers_fts, {', '.join(map(str, RANK_WEIGHTS))}) AS score "
+            "FROM offers_fts JOIN offers o ON o.id = offers_fts.rowid "
+            f"WHERE {' AND '.join(conditions)} ORDER BY score, o.last_seen DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            del result['id']
+            # bm25 is lower-is-better; expose higher-is-better
+            result['score'] = round(-result['score'], 4)
+            if snapshot_store is not None:
+                try:
+                    result['snippet'] = make_snippet(snapshot_store.load(row['digest']), terms, mark=mark)
+                except (KeyError, OSError):
+                    result['snippet'] = None
+            results.append(result)
+        return results
+
+    def count(self, user=None):
+        with self._lock:
+            if user is None:
+                return self._conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM offers WHERE user = ?", (user,)).fetchone()[0]
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_offer_index():
+    """Return the process-wide offer index"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = OfferIndex()
+        return _shared_index
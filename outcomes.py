@@ -0,0 +1,72 @@
+# What happened to a job the session came across
+SUBMITTED = 'submitted'
+# Dry run: the job passed every check and would have been submitted
+WOULD_APPLY = 'would_apply'
+CONFIRM_MISSING = 'confirm_missing'
+ALREADY_APPLIED = 'already_applied'
+EXCLUDED_KEYWORD = 'excluded_keyword'
+EXCLUDED_COMPANY = 'excluded_company'
+SKIPPED_DUPLICATE = 'skipped_duplicate'
+SKIPPED_SEEN = 'skipped_seen'
+BUDGET_EXHAUSTED = 'budget_exhausted'
+SUBMIT_TIMEOUT = 'submit_timeout'
+SUBMIT_FAILED = 'submit_failed'
+LOAD_TIMEOUT = 'load_timeout'
+DRIVER_ERROR = 'driver_error'
+WINDOW_CLOSED = 'window_closed'
+FAILED = 'failed'
+
+# Application status each outcome is reported under. Outcomes without one
+# happen before a job page is opened (or once its tab is gone) and are only counted.
+OUTCOME_STATUS = {
+    SUBMITTED: 'submitted',
+    CONFIRM_MISSING: 'submitted',
+    WOULD_APPLY: 'would_apply',
+    ALREADY_APPLIED: 'already_applied',
+    EXCLUDED_KEYWORD: 'excluded',
+    EXCLUDED_COMPANY: 'excluded',
+    BUDGET_EXHAUSTED: 'skipped',
+    SUBMIT_TIMEOUT: 'failed',
+    SUBMIT_FAILED: 'failed',
+    LOAD_TIMEOUT: 'failed',
+    DRIVER_ERROR: 'failed',
+    FAILED: 'failed',
+}
+OUTCOMES = tuple(OUTCOME_STATUS) + (SKIPPED_DUPLICATE, SKIPPED_SEEN, WINDOW_CLOSED)
+# Outcomes of a submit attempt (or a dry run's stand-in), the only ones that use up an application budget
+SUBMIT_OUTCOMES = (SUBMITTED, CONFIRM_MISSING, WOULD_APPLY, SUBMIT_TIMEOUT, SUBMIT_FAILED)
+# Statuses of entries without an outcome (dry runs, and sessions saved before
+# outcomes were recorded, which only stored submits) that count as attempts
+ATTEMPT_STATUSES = ('submitted', 'failed', 'would_apply')
+# Statuses written before outcomes were recorded
+LEGACY_STATUS = {'success': 'submitted'}
+
+
+def format_reason(outcome, detail=None):
+    """Stored reason of an application: the outcome, then ':' and its detail if any"""
+    return f"{outcome}:{detail}" if detail else outcome
+
+
+def normalize_status(status):
+    return LEGACY_STATUS.get(status, status)
+
+
+def outcome_of(application):
+    """Outcome recorded in an application entry's reason, None if it has none"""
+    outcome = (application.get('reason') or '').partition(':')[0]
+    return outcome if outcome in OUTCOMES else None
+
+
+def is_attempt(application):
+    """True for an entry of a submit attempt (or of a dry-run job that would have been submitted)"""
+    outcome = outcome_of(application)
+    if outcome is not None:
+        return outcome in SUBMIT_OUTCOMES
+    return normalize_status(application.get('status')) in ATTEMPT_STATUSES
+
+
+def merge_outcomes(total, counts):
+    """Add one term's outcome counts into a running total; returns the total"""
+    for outcome, count in (counts or {}).items():
+        total[outcome] = total.get(outcome, 0) + count
+    return total
@@ -0,0 +1,196 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Application bucket of the session running in this thread (each account runs in its own)
+_application_kind = contextvars.ContextVar('application_kind', default='application')
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a fixed rate (tokens per second)"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, rate):
+        """Change the refill rate, keeping tokens already earned"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def try_acquire(self, tokens=1):
+        """Take tokens without blocking; return the seconds to wait if unavailable"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until tokens are available and return the time spent waiting"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class _Operation:
+    """Outcome holder yielded by RateLimiter.throttle"""
+
+    def __init__(self):
+        self.error = False
+        self.paused = 0.0
+
+    def mark_error(self):
+        self.error = True
+
+    def sleep(self, seconds):
+        """Fixed UI wait inside the operation, left out of its measured latency"""
+        time.sleep(seconds)
+        self.paused += seconds
+
+    def exclude(self, seconds):
+        """Leave time already spent (e.g. waiting for an optional element) out of the latency"""
+        self.paused += seconds
+
+
+class RateLimiter:
+    """
+    Central pacing for every site operation.
+
+    Each kind of operation (page loads, job opens, applications) has its own
+    token bucket. Page loads and job opens are shared by every session in
+    the process; applications are paced per account, each with its own
+    configured delay. The effective rate of a bucket is its base rate times an
+    adaptive factor: slow responses and error pages halve the factor, fast
+    responses raise it slowly back up to the bucket's ceiling.
+    """
+
+    # kind: (base rate per second, burst capacity, max adaptive factor)
+    DEFAULT_BUCKETS = {
+        'page_load': (0.5, 2, 2.0),
+        'job_open': (1.0, 4, 2.0),
+        'application': (0.5, 1, 1.0),
+    }
+
+    def __init__(self, buckets=None, slow_threshold=4.0, fast_threshold=1.5,
+                 min_factor=0.1, backoff=0.5, speedup=1.1, jitter=0.3):
+        self.slow_threshold = slow_threshold
+        self.fast_threshold = fast_threshold
+        self.min_factor = min_factor
+        self.backoff = backoff
+        self.speedup = speedup
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._specs = {}
+        self._buckets = {}
+        self._factors = {}
+        for kind, spec in (buckets or self.DEFAULT_BUCKETS).items():
+            self.set_bucket(kind, *spec)
+
+    def set_bucket(self, kind, rate, capacity=1, max_factor=1.0):
+        """Create or reconfigure the bucket for an operation kind"""
+        with self._lock:
+            self._specs[kind] = (float(rate), capacity, float(max_factor))
+            factor = min(self._factors.get(kind, 1.0), max_factor)
+            self._factors[kind] = factor
+            if kind in self._buckets:
+                self._buckets[kind].capacity = float(capacity)
+                self._buckets[kind].set_rate(rate * factor)
+            else:
+                self._buckets[kind] = TokenBucket(rate * factor, capacity)
+
+    def configure(self, search_config, account=None):
+        """
+        Apply a session's pacing settings to its account's application bucket.
+
+        Called from the thread that runs the session: its 'application'
+        operations then use that bucket. Without a delay the bucket goes
+        back to the default pacing.
+        """
+        kind = 'application' if account is None else f"application:{account}"
+        delay = search_config.get('delay_between_applications') or 0
+        try:
+            delay = float(delay)
+        except (TypeError, ValueError):
+            delay = 0
+        if delay > 0:
+            # The configured delay is a floor: the bucket never runs faster
+            self.set_bucket(kind, 1.0 / delay, 1, 1.0)
+        else:
+            self.set_bucket(kind, *self.DEFAULT_BUCKETS['application'])
+        _application_kind.set(kind)
+
+    @staticmethod
+    def _resolve(kind):
+        return _application_kind.get() if kind == 'application' else kind
+
+    def acquire(self, kind):
+        """Wait for a token of the given kind and return the time spent waiting"""
+        waited = self._buckets[self._resolve(kind)].acquire()
+        if self.jitter:
+            pause = random.uniform(0, self.jitter)
+            time.sleep(pause)
+            waited += pause
+        return waited
+
+    def record(self, kind, elapsed, error=False):
+        """Adapt the bucket rate from an observed response time"""
+        kind = self._resolve(kind)
+        with self._lock:
+            rate, _, max_factor = self._specs[kind]
+            factor = self._factors[kind]
+            if error or elapsed >= self.slow_threshold:
+                factor = max(self.min_factor, factor * self.backoff)
+            elif elapsed <= self.fast_threshold:
+                factor = min(max_factor, factor * self.speedup)
+            else:
+                return
+            self._factors[kind] = factor
+            self._buckets[kind].set_rate(rate * factor)
+
+    def current_rate(self, kind):
+        """Return the effective rate (operations per second) of a bucket"""
+        return self._buckets[self._resolve(kind)].rate
+
+    @contextmanager
+    def throttle(self, kind):
+        """Acquire a token, time the wrapped operation (less its operation.sleep waits) and feed it back"""
+        self.acquire(kind)
+        operation = _Operation()
+        started = time.monotonic()
+        try:
+            yield operation
+        except Exception:
+            self.record(kind, time.monotonic() - started - operation.paused, error=True)
+            raise
+        self.record(kind, time.monotonic() - started - operation.paused, error=operation.error)
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter shared by all workers"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
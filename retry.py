@@ -0,0 +1,215 @@
+import functools
+import inspect
+import random
+import threading
+import time
+
+TIMEOUT = 'timeout'
+STALE_ELEMENT = 'stale_element'
+DRIVER_DEAD = 'driver_dead'
+SITE_ERROR = 'site_error'
+WINDOW_CLOSED = 'window_closed'
+OTHER = 'other'
+
+DRIVER_DEAD_MARKERS = (
+    'invalid session id',
+    'tried to run command without establishing a connection',
+    'failed to establish a new connection',
+    'connection refused',
+    'browsing context has been discarded',
+    'failed to decode response from marionette',
+)
+
+
+class SiteError(Exception):
+    """The site answered with an error or throttling page"""
+
+
+class SessionAbort(Exception):
+    """Base class for errors that must stop the whole session"""
+
+
+class DriverDeadError(SessionAbort):
+    """The browser or its driver is gone and cannot be recovered"""
+
+
+class CircuitOpenError(SessionAbort):
+    """The site kept failing after the circuit breaker paused the session"""
+
+
+def classify_error(error):
+    """Map an exception raised by a site operation to an error class"""
+    # Imported here so the exception types above stay usable without selenium
+    from selenium.common.exceptions import (
+        InvalidSessionIdException,
+        NoSuchWindowException,
+        StaleElementReferenceException,
+        TimeoutException,
+        WebDriverException,
+    )
+    if isinstance(error, DriverDeadError):
+        return DRIVER_DEAD
+    if isinstance(error, SiteError):
+        return SITE_ERROR
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    if isinstance(error, StaleElementReferenceException):
+        return STALE_ELEMENT
+    if isinstance(error, NoSuchWindowException):
+        # One tab closed by the site or the user: the caller skips what ran in it
+        return WINDOW_CLOSED
+    if isinstance(error, InvalidSessionIdException):
+        return DRIVER_DEAD
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        if any(marker in message for marker in DRIVER_DEAD_MARKERS):
+            return DRIVER_DEAD
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return DRIVER_DEAD if isinstance(error, ConnectionRefusedError) else TIMEOUT
+    return OTHER
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent site operations"""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=20.0,
+                 retry_on=(TIMEOUT, STALE_ELEMENT, SITE_ERROR)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = frozenset(retry_on)
+
+    def should_retry(self, error_class, attempt):
+        return error_class in self.retry_on and attempt < self.max_attempts
+
+    def delay(self, attempt):
+        """Full-jitter backoff delay before the next attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Pauses the session when the site looks down.
+
+    Consecutive site-level failures open the circuit. While open, callers
+    wait for the cool-down, then a single trial call is let through
+    (half-open). If the circuit trips again more than max_trips times in a
+    row, CircuitOpenError stops the session instead of burning the term list.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, max_trips=3,
+                 counted=(TIMEOUT, SITE_ERROR)):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_trips = max_trips
+        self.counted = frozenset(counted)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self, logger=None):
+        """Block while the circuit is open; raise once it has tripped too often"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return
+            if self.trips > self.max_trips:
+                raise CircuitOpenError(f"Site unavailable after {self.trips} circuit breaker pauses")
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        if remaining > 0:
+            if logger:
+                logger.warning(f"Circuit breaker open - pausing session for {remaining:.0f}s")
+            time.sleep(remaining)
+        with self._lock:
+            if self.state == self.OPEN:
+                self.state = self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trips = 0
+
+    def record_failure(self, error_class):
+        with self._lock:
+            if error_class not in self.counted:
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.failures = 0
+                self.trips += 1
+
+
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """Return the process-wide circuit breaker for the site"""
+    global _shared_breaker
+    with _shared_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
+
+
+DEFAULT_POLICIES = {
+    'search': RetryPolicy(max_attempts=3, base_delay=2.0),
+    'filter': RetryPolicy(max_attempts=3, base_delay=1.0),
+    'listing': RetryPolicy(max_attempts=3, base_delay=1.0),
+    'content': RetryPolicy(max_attempts=2, base_delay=1.0),
+}
+
+
+def retryable(operation, policy=None, before_retry=None):
+    """
+    Declare an idempotent site operation as retryable.
+
+    The decorated function must raise on failure. Retryable errors are
+    retried with the operation's policy, driver failures are raised as
+    DriverDeadError, and every outcome is reported to the circuit breaker.
+    before_retry, if given, is called with the same arguments before each
+    new attempt (for example to refresh the page). A ``logger`` argument of
+    the decorated function is used to report retries.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            retry_policy = policy or DEFAULT_POLICIES.get(operation) or RetryPolicy()
+            breaker = get_circuit_breaker()
+            logger = signature.bind_partial(*args, **kwargs).arguments.get('logger')
+            attempt = 1
+            while True:
+                breaker.before_call(logger)
+                try:
+                    if attempt > 1 and before_retry:
+                        before_retry(*args, **kwargs)
+                    result = func(*args, **kwargs)
+                except SessionAbort:
+                    raise
+                except Exception as e:
+                    error_class = classify_error(e)
+                    breaker.record_failure(error_class)
+                    if error_class == DRIVER_DEAD:
+                        raise DriverDeadError(str(e)) from e
+                    if not retry_policy.should_retry(error_class, attempt):
+                        raise
+                    delay = retry_policy.delay(attempt)
+                    if logger:
+                        logger.warning(f"{operation} failed ({error_class}), retry {attempt}/{retry_policy.max_attempts - 1} in {delay:.1f}s")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                breaker.record_success()
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,256 @@
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config import atomic_write_json, file_lock
+
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+# (minimum, maximum) of each cron field; weekday 7 is Sunday again
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class ScheduleError(ValueError):
+    """A schedule or cron expression is invalid"""
+
+
+def _parse_field(text, minimum, maximum):
+    """Set of values matched by one cron field (lists, ranges and steps)"""
+    values = set()
+    for part in text.split(','):
+        expression, _, step = part.partition('/')
+        try:
+            step = int(step) if step else 1
+            if expression == '*':
+                start, end = minimum, maximum
+            elif '-' in expression:
+                start, end = (int(value) for value in expression.split('-', 1))
+            else:
+                start = int(expression)
+                end = maximum if step > 1 else start
+        except ValueError:
+            raise ValueError(part)
+        if step < 1 or start < minimum or end > maximum or start > end:
+            raise ValueError(part)
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """Standard five-field cron expression (minute hour day month weekday, 0 = Sunday)"""
+
+    def __init__(self, expression):
+        self.expression = ALIASES.get(expression.strip(), expression.strip())
+        fields = self.expression.split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression needs 5 fields: {expression}")
+        try:
+            parsed = [_parse_field(field, *bounds) for field, bounds in zip(fields, FIELD_RANGES)]
+        except ValueError as e:
+            raise ScheduleError(f"Invalid cron field '{e}' in: {expression}")
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Sunday may be written 7
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Like cron: if both day fields are restricted, either one matching is enough
+        self.any_day = fields[2] != '*' and fields[4] != '*'
+
+    def _day_matches(self, moment):
+        in_month = moment.day in self.days
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        return (in_month or in_week) if self.any_day else (in_month and in_week)
+
+    def next_after(self, moment):
+        """First matching minute strictly after moment"""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ScheduleError(f"Cron expression never matches: {self.expression}")
+
+
+class ScheduleStore:
+    """
+    Schedules and their next run times in ~/.freework_app/schedules.json.
+
+    Next run times are persisted, so a restarted scheduler neither skips
+    nor repeats a run.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or Path.home() / ".freework_app" / "schedules.json")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def update(self, name, create=True, **fields):
+        """Merge fields into one schedule under the file lock (None if missing and not create)"""
+        with file_lock(self.path):
+            schedules = self.load()
+            if name not in schedules and not create:
+                return None
+            schedules.setdefault(name, {}).update(fields)
+            atomic_write_json(self.path, schedules)
+            return schedules[name]
+
+    def claim_due(self, name, now, next_run):
+        """
+        Move a due schedule to next_run; False if it is not due (anymore).
+
+        Checked and written under the file lock, so when the API server and a
+        CLI scheduler share the file only one of them starts each run.
+        """
+        with file_lock(self.path):
+            schedules = self.load()
+            schedule = schedules.get(name)
+            if not schedule or not schedule.get('next_run') or datetime.fromisoformat(schedule['next_run']) > now:
+                return False
+            schedule['next_run'] = next_run.isoformat(timespec='seconds')
+            atomic_write_json(self.path, schedules)
+            return True
+
+    def remove(self, name):
+        with file_lock(self.path):
+            schedules = self.load()
+            removed = schedules.pop(name, None) is not None
+            atomic_write_json(self.path, schedules)
+            return removed
+
+
+def add_schedule(store, name, cron, account=None, search_config=None, jitter=300, headless=True, now=None):
+    """Create or replace a schedule; search_config None means the account's (or saved) one"""
+    expression = CronExpression(cron)
+    next_run = expression.next_after(now or datetime.now()) + timedelta(seconds=random.uniform(0, jitter))
+    return store.update(
+        name, cron=expression.expression, account=account, search_config=search_config, jitter=jitter,
+        headless=headless, next_run=next_run.isoformat(timespec='seconds')
+    )
+
+
+def run_scheduled_session(schedule, config_manager):
+    """Default runner: one session for the schedule's account (or the stored credentials)"""
+    import main as automation
+    search_config = schedule.get('search_config')
+    if schedule.get('account'):
+        from accounts import run_account
+        return run_account(schedule['account'], config_manager, headless=schedule.get('headless', True),
+                           search_config=search_config)
+    return automation.main(search_config=search_config, config_manager=config_manager,
+                           headless=schedule.get('headless', True))
+
+
+class Scheduler:
+    """
+    In-process scheduler for recurring sessions.
+
+    A background thread wakes up every poll_interval seconds and starts each
+    due schedule on its own thread. Sessions of the same account never
+    overlap: a schedule that comes due while its account is still running is
+    skipped to its next slot. Each next run time gets a random delay of up to
+    the schedule's jitter seconds so runs do not hit the site on the minute.
+    """
+
+    def __init__(self, config_manager, store=None, runner=None, poll_interval=30, logger=None):
+        self.config_manager = config_manager
+        self.store = store or ScheduleStore()
+        self.runner = runner or run_scheduled_session
+        self.poll_interval = poll_interval
+        if logger is None:
+            from logger import SecureLogger
+            logger = SecureLogger()
+        self.logger = logger
+        self.running = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                self.logger.error(f"Scheduler error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def run_due(self, now=None):
+        """Start every schedule whose next run time has passed; returns their names"""
+        now = now or datetime.now()
+        started = []
+        for name, schedule in self.store.load().items():
+            if not schedule.get('next_run') or datetime.fromisoformat(schedule['next_run']) > now:
+                continue
+            account_key = schedule.get('account') or ''
+            cron = CronExpression(schedule['cron'])
+            next_run = cron.next_after(now) + timedelta(seconds=random.uniform(0, schedule.get('jitter', 0)))
+            if not self.store.claim_due(name, now, next_run):
+                continue
+            with self._lock:
+                if account_key in self.running:
+                    self.logger.warning(f"Skipping schedule '{name}': account still running '{self.running[account_key]}'")
+                    continue
+                self.running[account_key] = name
+            thread = threading.Thread(target=self._run, args=(name, schedule, account_key),
+                                      name=f"schedule-{name}", daemon=True)
+            thread.start()
+            started.append(name)
+        return started
+
+    def _run(self, name, schedule, account_key):
+        self.logger.info(f"Starting scheduled session '{name}'")
+        outcome = 'error'
+        try:
+            outcome = self.runner(schedule, self.config_manager)
+        except Exception as e:
+            self.logger.error(f"Scheduled session '{name}' failed: {e}")
+        finally:
+            with self._lock:
+                self.running.pop(account_key, None)
+            # create=False: the schedule may have been removed while it ran
+            self.store.update(name, create=False, last_run=datetime.now().isoformat(timespec='seconds'), last_outcome=outcome)
+            self.logger.info(f"Scheduled session '{name}' finished: {outcome}")
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler(config_manager=None):
+    """Return the process-wide scheduler (not started)"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            if config_manager is None:
+                from config import get_secure_config
+                config_manager = get_secure_config()
+            _shared_scheduler = Scheduler(config_manager)
+        return _shared_scheduler
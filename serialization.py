@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are sent as is: compressing them costs more than it saves
+COMPRESSION_THRESHOLD = 1024
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def dumps(data):
+    """Encode plain dicts/lists to compact JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for data that is already plain and validated.
+
+    Skips FastAPI's jsonable_encoder and per-item model construction; the
+    content goes straight to the encoder.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content):
+        return dumps(content)
+
+
+def parse_fields(fields, allowed):
+    """Split a ?fields= value into a tuple of names, or None when absent"""
+    if not fields:
+        return None
+    selected = tuple(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    unknown = [name for name in selected if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return selected
+
+
+def select_fields(record, fields):
+    """Keep only the selected keys of a record"""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+def make_etag(version, *variant):
+    """Strong ETag for one representation of a versioned resource"""
+    digest = hashlib.sha1(json.dumps(variant, default=str).encode('utf-8')).hexdigest()[:12]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header covers the given ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    if '*' in candidates:
+        return True
+    for candidate in candidates:
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+        candidate = candidate.removeprefix('W/')
+        for encoding in CONTENT_CODINGS:
+            candidate = candidate.replace(f'-{encoding}"', '"')
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag):
+    """Empty 304 answer for a conditional GET"""
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name.lower()] = quality
+    for encoding in CONTENT_CODINGS if brotli is not None else CONTENT_CODINGS[1:]:
+        if offered.get(encoding, offered.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip compression for complete responses above a size threshold.
+
+    Streaming responses (exports) are passed through untouched: they are
+    either already gzipped on request or meant to be consumed incrementally.
+    Brotli is used when the optional brotli package is installed and the
+    client accepts it, gzip otherwise.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_THRESHOLD):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message['type'] == 'http.response.start':
+                start_message = message
+                if message['status'] == 304:
+                    self._echo_encoded_etag(message, request_headers.get('if-none-match', ''), encoding)
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+            headers = MutableHeaders(raw=start_message['headers'])
+            body = message.get('body', b'')
+            content_type = headers.get('content-type', '')
+            if (message.get('more_body', False)
+                    or 'content-encoding' in headers
+                    or len(body) < self.minimum_size
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers['Content-Encoding'] = encoding
+            etag = headers.get('etag')
+            if etag and etag.endswith('"'):
+                # A compressed body is a different representation: keep strong ETags distinct
+                headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+            headers['Content-Length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _echo_encoded_etag(message, if_none_match, encoding):
+        """A 304 names the representation the client holds, compressed or not"""
+        headers = MutableHeaders(raw=message['headers'])
+        etag = headers.get('etag')
+        if etag and etag.endswith('"') and f'{etag[:-1]}-{encoding}"' in if_none_match:
+            headers['ETag'] = f'{etag[:-1]}-{encoding}"'
@@ -0,0 +1,60 @@
+import queue
+import threading
+import time
+
+from retry import SessionAbort
+
+
+class SessionStopped(SessionAbort):
+    """The user asked the running session to stop"""
+
+
+class SessionControl:
+    """
+    Thread-safe link between a running session and whoever started it.
+
+    The automation thread calls checkpoint() at safe points, which blocks
+    while paused and raises SessionStopped once stop() was requested, and
+    reports progress with emit(). The caller reads those events from the
+    events queue without ever touching the browser.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self._stop = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def pause(self):
+        self._running.clear()
+        self.emit('paused')
+
+    def resume(self):
+        self._running.set()
+        self.emit('resumed')
+
+    def stop(self):
+        self._stop.set()
+        # Wake a paused session so it can notice the stop request
+        self._running.set()
+
+    def checkpoint(self):
+        """Wait while paused; raise SessionStopped if a stop was requested"""
+        while not self._running.wait(0.5):
+            pass
+        if self._stop.is_set():
+            raise SessionStopped("Session stopped by user")
+
+    def emit(self, kind, **data):
+        """Publish a progress event"""
+        data['type'] = kind
+        data['time'] = time.time()
+        self.events.put(data)
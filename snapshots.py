@@ -0,0 +1,229 @@
+import hashlib
+import lzma
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+JOB = 'job'
+DEBUG_PAGE = 'debug'
+CODECS = {
+    'zlib': ('.z', lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': ('.xz', lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+# Debug page dumps kept: the most recent ones, and none older than the age limit
+MAX_DEBUG_PAGES = 20
+MAX_DEBUG_AGE_DAYS = 14
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sightings (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    user TEXT,
+    url TEXT,
+    title TEXT,
+    company TEXT,
+    search_term TEXT,
+    decision TEXT,
+    reason TEXT,
+    seen_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sightings_digest ON sightings (digest, seen_at);
+CREATE INDEX IF NOT EXISTS idx_sightings_url ON sightings (url, seen_at);
+CREATE INDEX IF NOT EXISTS idx_sightings_kind ON sightings (kind, seen_at);
+"""
+
+_WHITESPACE = re.compile(r'[ \t\r\f\v\u00a0]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+def normalize_text(text):
+    """Canonical form of a job description: NFC, single spaces, no blank-line runs"""
+    text = unicodedata.normalize('NFC', text or '')
+    text = _WHITESPACE.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Content-addressed archive of job descriptions in ~/.freework_app/snapshots.
+
+    Each distinct normalized text is stored once, compressed, under its
+    SHA-256; every time an offer is seen (a repost under another URL
+    included) only a small sighting row with its metadata and decision is
+    added to the index. Debug page dumps go through the same store but are
+    pruned to the most recent MAX_DEBUG_PAGES within MAX_DEBUG_AGE_DAYS.
+    """
+
+    def __init__(self, root=None, codec='zlib'):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}'. Supported: {', '.join(CODECS)}")
+        self.root = Path(root or Path.home() / ".freework_app" / "snapshots")
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _path(self, digest, codec):
+        return self.objects / digest[:2] / (digest + CODECS[codec][0])
+
+    def put(self, data, kind):
+        """Store bytes once under their digest; returns the digest"""
+        digest = content_digest(data)
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                return digest
+            compressed = CODECS[self.codec][1](data)
+            path = self._path(digest, self.codec)
+            path.parent.mkdir(exist_ok=True)
+            temp_path = path.with_name(path.name + '.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(temp_path, path)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO blobs (digest, kind, codec, size, stored_size, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, kind, self.codec, len(data), len(compressed), datetime.now().isoformat(timespec='seconds'))
+                )
+        return digest
+
+    def _add_sighting(self, digest, kind, **fields):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sightings (digest, kind, user, url, title, company, search_term, decision, reason, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, kind, fields.get('user'), fields.get('url'), fields.get('title'), fields.get('company'),
+                 fields.get('search_term'), fields.get('decision'), fields.get('reason'),
+                 fields.get('seen_at') or datetime.now().isoformat(timespec='seconds'))
+            )
+
+    def save_job(self, text, url=None, title=None, company=None, search_term=None,
+                 decision=None, reason=None, user=None):
+        """Archive a job description and the decision taken on it; returns its digest"""
+        digest = self.put(normalize_text(text).encode('utf-8'), JOB)
+        self._add_sighting(digest, JOB, user=user, url=url, title=title, company=company,
+                           search_term=search_term, decision=decision, reason=reason)
+        return digest
+
+    def save_debug_page(self, name, html, url=None):
+        """Archive a page dump taken for debugging, then apply the retention limits"""
+        digest = self.put(html.encode('utf-8'), DEBUG_PAGE)
+        self._add_sighting(digest, DEBUG_PAGE, url=url, title=name)
+        self.prune_debug_pages()
+        return digest
+
+    def load(self, digest):
+        """Decompressed text of a stored blob"""
+        with self._lock:
+            row = self._conn.execute("SELECT codec FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        with open(self._path(digest, row['codec']), 'rb') as f:
+            return CODECS[row['codec']][2](f.read()).decode('utf-8')
+
+    def resolve(self, key):
+        """Digest for a full digest, a unique digest prefix of 6+ characters, or the latest snapshot of a URL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM sightings WHERE url = ? ORDER BY seen_at DESC, id DESC LIMIT 1", (key,)
+            ).fetchone()
+            if row is None and len(key) >= 6:
+                rows = self._conn.execute(
+                    "SELECT digest FROM blobs WHERE digest >= ? AND digest < ? LIMIT 2", (key, key + 'g')
+                ).fetchall()
+                row = rows[0] if len(rows) == 1 else None
+        return row['digest'] if row else None
+
+    def sightings(self, digest):
+        """Every time a snapshot was seen, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM sightings WHERE digest = ? ORDER BY seen_at, id", (digest,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_sightings(self, kind=JOB, batch_size=500):
+        """Every sighting of a kind in insertion order, read in batches"""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM sightings WHERE kind = ? AND id > ? ORDER BY id LIMIT ?", (kind, last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]['id']
+
+    def prune_debug_pages(self, max_pages=MAX_DEBUG_PAGES, max_age_days=MAX_DEBUG_AGE_DAYS):
+        """Drop debug dumps beyond the retention limits; returns the number of blobs deleted"""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM sightings WHERE kind = ? AND (seen_at < ? OR id NOT IN "
+                "(SELECT id FROM sightings WHERE kind = ? ORDER BY seen_at DESC, id DESC LIMIT ?))",
+                (DEBUG_PAGE, cutoff, DEBUG_PAGE, max_pages)
+            )
+            orphans = self._conn.execute(
+                "SELECT digest, codec FROM blobs WHERE kind = ? AND digest NOT IN (SELECT digest FROM sightings)",
+                (DEBUG_PAGE,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM blobs WHERE digest = ?", [(row['digest'],) for row in orphans])
+        for row in orphans:
+            self._path(row['digest'], row['codec']).unlink(missing_ok=True)
+        return len(orphans)
+
+    def stats(self):
+        """Blob and sighting counts with raw and stored sizes per kind"""
+        with self._lock:
+            blobs = self._conn.execute(
+                "SELECT kind, COUNT(*) AS blobs, SUM(size) AS size, SUM(stored_size) AS stored_size "
+                "FROM blobs GROUP BY kind"
+            ).fetchall()
+            sightings = dict(self._conn.execute("SELECT kind, COUNT(*) FROM sightings GROUP BY kind").fetchall())
+        return {
+            row['kind']: {
+                'blobs': row['blobs'],
+                'sightings': sightings.get(row['kind'], 0),
+                'size': row['size'],
+                'stored_size': row['stored_size'],
+            }
+            for row in blobs
+        }
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Return the process-wide snapshot store (FREEWORK_SNAPSHOT_CODEC picks zlib or lzma)"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = SnapshotStore(codec=os.environ.get('FREEWORK_SNAPSHOT_CODEC', 'zlib'))
+        return _shared_store
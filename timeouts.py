@@ -0,0 +1,81 @@
+import math
+import os
+import threading
+from collections import deque
+
+# Timeout multiple of the recent p99 latency of a wait target
+DEFAULT_MULTIPLIER = 3.0
+
+
+class AdaptiveTimeouts:
+    """
+    Per-target wait timeouts derived from observed latency.
+
+    Every successful wait records how long the element took to show up.
+    Once a target has min_samples observations its timeout becomes
+    multiplier x the p99 of the last window waits, kept between
+    min_timeout and max_timeout; until then the caller's default applies.
+    A wait that times out is recorded at its full timeout, so a site that
+    slows down pushes the timeout back up instead of failing repeatedly.
+    """
+
+    def __init__(self, multiplier=DEFAULT_MULTIPLIER, window=200, min_samples=20,
+                 min_timeout=1.0, max_timeout=30.0):
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, target, seconds):
+        with self._lock:
+            samples = self._samples.get(target)
+            if samples is None:
+                samples = self._samples[target] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, target, percent=99):
+        """Nearest-rank percentile of the recent latencies of a target (None without samples)"""
+        with self._lock:
+            samples = sorted(self._samples.get(target, ()))
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(percent / 100 * len(samples)) - 1)]
+
+    def timeout(self, target, default):
+        """Timeout to use for the next wait on a target"""
+        with self._lock:
+            count = len(self._samples.get(target, ()))
+        if count < self.min_samples:
+            return default
+        timeout = self.multiplier * self.percentile(target)
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def snapshot(self):
+        """{target: {'samples', 'p99', 'timeout'}} for diagnostics"""
+        with self._lock:
+            targets = list(self._samples)
+        return {
+            target: {
+                'samples': len(self._samples[target]),
+                'p99': round(self.percentile(target), 3),
+                'timeout': round(self.timeout(target, None) or 0.0, 3),
+            }
+            for target in targets
+        }
+
+
+_shared_timeouts = None
+_shared_lock = threading.Lock()
+
+
+def get_adaptive_timeouts():
+    """Return the process-wide timeouts (FREEWORK_TIMEOUT_MULTIPLIER overrides the multiple)"""
+    global _shared_timeouts
+    with _shared_lock:
+        if _shared_timeouts is None:
+            _shared_timeouts = AdaptiveTimeouts(
+                float(os.environ.get('FREEWORK_TIMEOUT_MULTIPLIER', DEFAULT_MULTIPLIER)))
+        return _shared_timeouts
@@ -0,0 +1,547 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+STATES = (PENDING, LEASED, DONE, FAILED)
+
+DEFAULT_LEASE = 300.0
+MAX_ATTEMPTS = 3
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Task:
+    """A claimed unit of work: one search term of a crawl"""
+
+    def __init__(self, task_id, crawl, payload, attempts):
+        self.id = task_id
+        self.crawl = crawl
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.payload!r})"
+
+
+class WorkQueue(ABC):
+    """
+    Backend interface shared by the SQLite and Redis queues.
+
+    Tasks are leased, not popped: a worker that stops heartbeating loses
+    its lease and the task goes back to pending for another worker, up to
+    MAX_ATTEMPTS times. Each crawl also has a seen-offer set and an
+    application budget that every worker draws from atomically.
+    """
+
+    @abstractmethod
+    def enqueue(self, crawl, payload, task_id=None):
+        """
+        Queue a task; True if it was queued.
+
+        A finished (done or failed) task with the same id is queued again
+        from scratch; one still pending or leased is left alone (False).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, crawl, worker_id, lease=DEFAULT_LEASE):
+        """Lease the oldest available task, or return None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, task, worker_id, lease=DEFAULT_LEASE):
+        """Extend a lease; False if the worker no longer holds it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, task, worker_id, result, refund=0):
+        """Store a task's result and give back unused budget in one step"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, task, worker_id, error, refund=0):
+        """Give a task back after a failure (failed for good after MAX_ATTEMPTS), refunding unused budget"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_seen(self, crawl, key):
+        """Add an offer to the crawl's seen set; True only for the first caller"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_budget(self, crawl, amount):
+        raise NotImplementedError
+
+    @abstractmethod
+    def take_budget(self, crawl, amount=1):
+        """Atomically draw from the crawl's budget; False when exhausted"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_seen(self, crawl):
+        """Forget the offers a crawl has seen, so a new run opens them again"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self, crawl):
+        """Number of tasks in each state (all four, zero included), plus the remaining budget"""
+        raise NotImplementedError
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    crawl TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (crawl, state, created);
+CREATE TABLE IF NOT EXISTS seen (
+    crawl TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (crawl, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS budgets (
+    crawl TEXT PRIMARY KEY,
+    remaining INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Default backend: a SQLite file shared by every worker on the host.
+
+    Claims run in BEGIN IMMEDIATE transactions, so two processes can never
+    lease the same task. Workers on other hosts need a shared backend such
+    as RedisWorkQueue.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or Path.home() / ".freework_app" / "queue.db")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn, self._lock)
+
+    def enqueue(self, crawl, payload, task_id=None):
+        task_id = task_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            queued = conn.execute(
+                "INSERT OR IGNORE INTO tasks (id, crawl, payload, state, created) VALUES (?, ?, ?, ?, ?)",
+                (task_id, crawl, json.dumps(payload), PENDING, time.time())
+            ).rowcount
+            if not queued:
+                queued = conn.execute(
+                    "UPDATE tasks SET payload = ?, state = ?, worker = NULL, lease_until = NULL, attempts = 0,"
+                    " result = NULL, error = NULL, created = ? WHERE id = ? AND state IN (?, ?)",
+                    (json.dumps(payload), PENDING, time.time(), task_id, DONE, FAILED)
+                ).rowcount
+        return queued == 1
+
+    def claim(self, crawl, worker_id, lease=DEFAULT_LEASE):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET state = ?, error = 'lease expired too many times'"
+                " WHERE crawl = ? AND state = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, crawl, LEASED, now, MAX_ATTEMPTS)
+            )
+            # Expired leases are claimable again
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM tasks WHERE crawl = ?"
+                " AND (state = ? OR (state = ? AND lease_until < ?)) ORDER BY created LIMIT 1",
+                (crawl, PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker_id, now + lease, row[0])
+            )
+        return Task(row[0], crawl, json.loads(row[1]), row[2] + 1)
+
+    def heartbeat(self, task, worker_id, lease=DEFAULT_LEASE):
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND state = ? AND worker = ?",
+                (time.time() + lease, task.id, LEASED, worker_id)
+            ).rowcount == 1
+
+    def complete(self, task, worker_id, result, refund=0):
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET state = ?, result = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                (DONE, json.dumps(result), task.id, worker_id)
+            ).rowcount
+            if updated and refund:
+                conn.execute("UPDATE budgets SET remaining = remaining + ? WHERE crawl = ?", (refund, task.crawl))
+            return updated == 1
+
+    def release(self, task, worker_id, error, refund=0):
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+                " worker = NULL, lease_until = NULL, error = ? WHERE id = ? AND worker = ?",
+                (MAX_ATTEMPTS, FAILED, PENDING, str(error), task.id, worker_id)
+            ).rowcount
+            if updated and refund:
+                conn.execute("UPDATE budgets SET remaining = remaining + ? WHERE crawl = ?", (refund, task.crawl))
+
+    def mark_seen(self, crawl, key):
+        with self._transaction() as conn:
+            return conn.execute(
+                "INSERT OR IGNORE INTO seen (crawl, key) VALUES (?, ?)", (crawl, key)
+            ).rowcount == 1
+
+    def set_budget(self, crawl, amount):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO budgets (crawl, remaining) VALUES (?, ?)"
+                " ON CONFLICT (crawl) DO UPDATE SET remaining = excluded.remaining",
+                (crawl, amount)
+            )
+
+    def take_budget(self, crawl, amount=1):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT remaining FROM budgets WHERE crawl = ?", (crawl,)).fetchone()
+            if row is None:
+                # No budget set: unlimited
+                return True
+            if row[0] < amount:
+                return False
+            conn.execute("UPDATE budgets SET remaining = remaining - ? WHERE crawl = ?", (amount, crawl))
+            return True
+
+    def clear_seen(self, crawl):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM seen WHERE crawl = ?", (crawl,))
+
+    def counts(self, crawl):
+        with self._lock:
+            counts = dict.fromkeys(STATES, 0)
+            counts.update(self._conn.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE crawl = ? GROUP BY state", (crawl,)
+            ).fetchall())
+            row = self._conn.execute("SELECT remaining FROM budgets WHERE crawl = ?", (crawl,)).fetchone()
+        counts['budget'] = row[0] if row else None
+        return counts
+
+
+class _ImmediateTransaction:
+    """Serialize writers across threads and processes with BEGIN IMMEDIATE"""
+
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Shared backend for workers on several hosts.
+
+    Works with any client exposing the redis-py API (redis.Redis, or a
+    local stand-in such as fakeredis/redislite for development). Leases
+    live in a sorted set scored by expiry; claiming and budget draws are
+    atomic server-side scripts.
+    """
+
+    CLAIM_SCRIPT = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+    for _, id in ipairs(expired) do
+        redis.call('ZREM', KEYS[2], id)
+        redis.call('RPUSH', KEYS[1], id)
+    end
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then return nil end
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+    local task = KEYS[3] .. id
+    redis.call('HSET', task, 'state', 'leased', 'worker', ARGV[3])
+    local attempts = redis.call('HINCRBY', task, 'attempts', 1)
+    return {id, redis.call('HGET', task, 'payload'), attempts}
+    """
+
+    TAKE_BUDGET_SCRIPT = """
+    local remaining = redis.call('GET', KEYS[1])
+    if not remaining then return 1 end
+    if tonumber(remaining) < tonumber(ARGV[1]) then return 0 end
+    redis.call('DECRBY', KEYS[1], ARGV[1])
+    return 1
+    """
+
+    def __init__(self, client, prefix='freework'):
+        self.client = client
+        self.prefix = prefix
+        self._claim = client.register_script(self.CLAIM_SCRIPT)
+        self._take_budget = client.register_script(self.TAKE_BUDGET_SCRIPT)
+
+    def _key(self, crawl, name):
+        return f"{self.prefix}:{crawl}:{name}"
+
+    def enqueue(self, crawl, payload, task_id=None):
+        task_id = task_id or uuid.uuid4().hex
+        task_key = self._key(crawl, f"task:{task_id}")
+        if not self.client.hsetnx(task_key, 'payload', json.dumps(payload)):
+            if _text(self.client.hget(task_key, 'state')) not in (DONE, FAILED):
+                return False
+            self.client.hdel(task_key, 'result', 'error', 'worker')
+        self.client.hset(task_key, mapping={'payload': json.dumps(payload), 'state': PENDING, 'attempts': 0})
+        self.client.rpush(self._key(crawl, 'pending'), task_id)
+        return True
+
+    def claim(self, crawl, worker_id, lease=DEFAULT_LEASE):
+        now = time.time()
+        claimed = self._claim(
+            keys=[self._key(crawl, 'pending'), self._key(crawl, 'leases'), self._key(crawl, 'task:')],
+            args=[now, now + lease, worker_id]
+        )
+        if not claimed:
+            return None
+        task_id, payload, attempts = (_text(value) for value in claimed)
+        task = Task(task_id, crawl, json.loads(payload), int(attempts))
+        if task.attempts > MAX_ATTEMPTS:
+            self._finish(task, FAILED, error='lease expired too many times')
+            return self.claim(crawl, worker_id, lease)
+        return task
+
+    def _owns(self, task, worker_id):
+        return _text(self.client.hget(self._key(task.crawl, f"task:{task.id}"), 'worker')) == worker_id
+
+    def heartbeat(self, task, worker_id, lease=DEFAULT_LEASE):
+        if not self._owns(task, worker_id):
+            return False
+        # XX: only refresh a lease that still exists
+        self.client.zadd(self._key(task.crawl, 'leases'), {task.id: time.time() + lease}, xx=True)
+        return True
+
+    def _finish(self, task, state, result=None, error=None, refund=0):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self._key(task.crawl, 'leases'), task.id)
+        fields = {'state': state}
+        if result is not None:
+            fields['result'] = json.dumps(result)
+        if error is not None:
+            fields['error'] = str(error)
+        pipe.hset(self._key(task.crawl, f"task:{task.id}"), mapping=fields)
+        if refund and self.client.exists(self._key(task.crawl, 'budget')):
+            pipe.incrby(self._key(task.crawl, 'budget'), refund)
+        pipe.execute()
+
+    def complete(self, task, worker_id, result, refund=0):
+        if not self._owns(task, worker_id):
+            return False
+        self._finish(task, DONE, result=result, refund=refund)
+        return True
+
+    def release(self, task, worker_id, error, refund=0):
+        if not self._owns(task, worker_id):
+            return
+        if task.attempts >= MAX_ATTEMPTS:
+            self._finish(task, FAILED, error=error, refund=refund)
+            return
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self._key(task.crawl, 'leases'), task.id)
+        pipe.hset(self._key(task.crawl, f"task:{task.id}"), mapping={'state': PENDING, 'worker': '', 'error': str(error)})
+        pipe.rpush(self._key(task.crawl, 'pending'), task.id)
+        if refund and self.client.exists(self._key(task.crawl, 'budget')):
+            pipe.incrby(self._key(task.crawl, 'budget'), refund)
+        pipe.execute()
+
+    def mark_seen(self, crawl, key):
+        return self.client.sadd(self._key(crawl, 'seen'), key) == 1
+
+    def set_budget(self, crawl, amount):
+        self.client.set(self._key(crawl, 'budget'), amount)
+
+    def take_budget(self, crawl, amount=1):
+        return bool(self._take_budget(keys=[self._key(crawl, 'budget')], args=[amount]))
+
+    def clear_seen(self, crawl):
+        self.client.delete(self._key(crawl, 'seen'))
+
+    def counts(self, crawl):
+        counts = dict.fromkeys(STATES, 0)
+        counts[PENDING] = self.client.llen(self._key(crawl, 'pending'))
+        counts[LEASED] = self.client.zcard(self._key(crawl, 'leases'))
+        # Finished tasks are only recorded in their hashes
+        for task_key in self.client.scan_iter(match=self._key(crawl, 'task:*')):
+            state = _text(self.client.hget(task_key, 'state'))
+            if state in (DONE, FAILED):
+                counts[state] += 1
+        budget = self.client.get(self._key(crawl, 'budget'))
+        counts['budget'] = int(budget) if budget is not None else None
+        return counts
+
+
+def _text(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def open_work_queue(url=None):
+    """
+    Open the queue named by url or FREEWORK_QUEUE_URL.
+
+    sqlite:///path/to/queue.db (default: ~/.freework_app/queue.db) or
+    redis://host:port/db, which needs the optional redis package.
+    """
+    url = url or os.environ.get('FREEWORK_QUEUE_URL', '')
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for a Redis work queue (pip install redis)")
+        return RedisWorkQueue(redis.Redis.from_url(url))
+    if url.startswith('sqlite:///'):
+        return SQLiteWorkQueue(url[len('sqlite:///'):])
+    if url:
+        raise ValueError(f"Unsupported work queue URL: {url}")
+    return SQLiteWorkQueue()
+
+
+class Heartbeat:
+    """Keep a task's lease alive from a background thread while it runs"""
+
+    def __init__(self, queue, task, worker_id, lease=DEFAULT_LEASE):
+        self.queue = queue
+        self.task = task
+        self.worker_id = worker_id
+        self.lease = lease
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                if not self.queue.heartbeat(self.task, self.worker_id, self.lease):
+                    self.lost = True
+                    return
+            except Exception:
+                # A missed beat is retried; the lease only lapses after lease seconds
+                pass
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class QueueCrawl:
+    """
+    A worker's view of one shared crawl.
+
+    Iterating yields search terms claimed from the queue; main() reports
+    each finished term with task_done(). claim_job() and take_application()
+    are consulted per offer, so two workers never open or apply to the same
+    offer and the crawl's application budget is shared.
+    """
+
+    def __init__(self, queue, crawl='default', worker_id=None, lease=DEFAULT_LEASE):
+        self.queue = queue
+        self.crawl = crawl
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = lease
+        self.completed = 0
+        self._current = None
+        self._refund = 0
+
+    def __iter__(self):
+        while True:
+            task = self.queue.claim(self.crawl, self.worker_id, self.lease)
+            if task is None:
+                return
+            self._current = task
+            self._refund = 0
+            try:
+                with Heartbeat(self.queue, task, self.worker_id, self.lease):
+                    yield task.payload['search_term']
+            finally:
+                # Not reported done (session stopped or aborted): hand it back
+                if self._current is task:
+                    self._current = None
+                    self.queue.release(task, self.worker_id, 'worker stopped before finishing', refund=self._refund)
+
+    def task_done(self, search_term, counters):
+        """Record the finished term's counters and refund failed submits, atomically"""
+        task = self._current
+        if task is None or task.payload['search_term'] != search_term:
+            return
+        self._current = None
+        self.queue.complete(task, self.worker_id, counters, refund=self._refund)
+        self.completed += 1
+
+    def claim_job(self, url):
+        """True if this worker is the first to see the offer"""
+        return self.queue.mark_seen(self.crawl, url)
+
+    def take_application(self):
+        """Draw one application from the shared budget"""
+        return self.queue.take_budget(self.crawl)
+
+    def task_failed(self, search_term, error):
+        """Hand a term whose search failed back to the queue for another attempt, refunding failed submits"""
+        task = self._current
+        if task is None or task.payload['search_term'] != search_term:
+            return
+        self._current = None
+        refund, self._refund = self._refund, 0
+        self.queue.release(task, self.worker_id, error, refund=refund)
+
+    def application_failed(self):
+        """A drawn application was not submitted; refunded when the term completes"""
+        self._refund += 1
+
+
+def enqueue_search_terms(queue, search_terms, crawl='default', budget=None):
+    """
+    Queue one task per search term; returns how many were queued.
+
+    An optional budget caps applications across all workers. Ids are
+    deterministic: a term still pending or running in the crawl is not
+    queued twice, while a finished one runs again. When the crawl has
+    nothing left in flight this starts a new run, so its seen offers are
+    forgotten too.
+    """
+    counts = queue.counts(crawl)
+    if not counts[PENDING] and not counts[LEASED]:
+        queue.clear_seen(crawl)
+    if budget is not None:
+        queue.set_budget(crawl, budget)
+    return sum(queue.enqueue(crawl, {'search_term': term}, task_id=f"{crawl}:{term}")
+               for term in dict.fromkeys(search_terms))